@@ -2,11 +2,25 @@
 API URL Configuration
 Routes for all REST API endpoints
 """
+from django.conf import settings
 from django.urls import path
-from jobs import api_views
+from jobs import api_views, async_views
 
 app_name = 'api'
 
+# Under ASGI the most-polled reads are served by async views on the event
+# loop; under WSGI the DRF views serve them (and everything else)
+if settings.SERVER_MODE == 'asgi':
+    resume_list = async_views.resume_list
+    resume_status = async_views.resume_status
+    job_list = async_views.job_list
+    application_list = async_views.application_list
+else:
+    resume_list = api_views.ResumeListCreateAPIView.as_view()
+    resume_status = api_views.ResumeStatusAPIView.as_view()
+    job_list = api_views.JobListAPIView.as_view()
+    application_list = api_views.ApplicationListCreateAPIView.as_view()
+
 urlpatterns = [
     # Authentication endpoints
     path('auth/register/', api_views.RegisterAPIView.as_view(), name='register'),
@@ -15,14 +29,26 @@ urlpatterns = [
     path('auth/me/', api_views.CurrentUserAPIView.as_view(), name='current-user'),
     
     # Resume endpoints
-    path('resumes/', api_views.ResumeListCreateAPIView.as_view(), name='resume-list-create'),
+    path('resumes/', resume_list, name='resume-list-create'),
     path('resumes/<int:pk>/', api_views.ResumeDetailAPIView.as_view(), name='resume-detail'),
+    path('resumes/<int:pk>/status/', resume_status, name='resume-status'),
+    path('resumes/<int:pk>/events/', api_views.ResumeEventsAPIView.as_view(), name='resume-events'),
+    
+    # Chunked, resumable resume uploads
+    path('uploads/', api_views.UploadCreateAPIView.as_view(), name='upload-create'),
+    path('uploads/<uuid:pk>/', api_views.UploadDetailAPIView.as_view(), name='upload-detail'),
+    path('uploads/<uuid:pk>/complete/', api_views.UploadCompleteAPIView.as_view(), name='upload-complete'),
     
     # Job endpoints
-    path('jobs/', api_views.JobListAPIView.as_view(), name='job-list'),
+    path('jobs/', job_list, name='job-list'),
+    path('jobs/export/', api_views.JobExportAPIView.as_view(), name='job-export'),
     path('jobs/<int:pk>/', api_views.JobDetailAPIView.as_view(), name='job-detail'),
     
     # Application endpoints
-    path('applications/', api_views.ApplicationListCreateAPIView.as_view(), name='application-list-create'),
+    path('applications/', application_list, name='application-list-create'),
+    path('applications/export/', api_views.ApplicationExportAPIView.as_view(), name='application-export'),
     path('applications/<int:pk>/', api_views.ApplicationUpdateAPIView.as_view(), name='application-update'),
+    
+    # Operations endpoints
+    path('scrapers/health/', api_views.ScraperHealthAPIView.as_view(), name='scraper-health'),
 ]
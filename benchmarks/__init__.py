@@ -0,0 +1,12 @@
+"""
+Benchmarks
+Offline performance checks, run from the project root:
+
+    python -m benchmarks.scrapers    # scraper hot path against recorded pages
+    python -m benchmarks.pipeline    # resumes/min through scrape_jobs_for_resume
+    python -m benchmarks.startup     # cold start time and RSS of web and worker processes
+    python -m benchmarks.serving     # API req/s and memory, gunicorn (WSGI) vs uvicorn (ASGI)
+
+Nothing here touches the real job sites; pages are served from fixtures/
+by a local stand-in server (standin.py).
+"""
@@ -0,0 +1,342 @@
+"""
+Pipeline Load Test
+Pushes synthetic resumes through scrape_jobs_for_resume, end to end, to see
+how many resumes per minute a worker handles:
+
+- resumes are generated PDF and DOCX files with varied skill sets, stored
+  through the normal storage API (in a temporary MEDIA_ROOT)
+- the platforms are the local stand-in server, with configurable latency
+  and error rate
+- tasks run in --workers threads, like a worker with that --concurrency,
+  against a throwaway test database
+
+It reports throughput, task latency percentiles, database queries per task
+and the process's memory, as text and optionally JSON. Throughput is only
+reported when every task succeeded; otherwise the run exits with 1.
+
+    python -m benchmarks.pipeline --resumes 50 --workers 4 --latency 200
+    python -m benchmarks.pipeline --error-rate 0.2 --output pipeline.json
+
+The tasks need the Redis at REDIS_URL (cache, result backend, progress
+events, scrape locks). Without one, --without-redis runs them against an
+in-process cache and result backend; progress events, locks and scraper
+health are then skipped, so the figure is somewhat optimistic.
+
+The match/enrich tasks a scrape queues are counted, not run: they belong
+to other queues. With SQLite, concurrent writes are serialized; set
+DATABASE_URL to a Postgres database to measure the production setup.
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+import django
+
+from .standin import StandInServer
+from .stats import summarize
+
+FIRST_NAMES = ['Aarav', 'Diya', 'Kabir', 'Meera', 'Rohan', 'Sara', 'Vivaan', 'Zoya']
+LAST_NAMES = ['Sharma', 'Iyer', 'Khan', 'Patel', 'Reddy', 'Singh']
+
+
+def resume_lines(rng: random.Random, skills: List[str]) -> List[str]:
+    name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+    lines = [name, f'{name.split()[0].lower()}@example.com', '', 'Skills']
+    lines.append(', '.join(skills))
+    lines += ['', 'Experience']
+    for skill in skills[:3]:
+        lines.append(f'Built and maintained services using {skill} in a team of {rng.randint(2, 9)}')
+    lines += ['', 'Education', 'B.Tech in Computer Science']
+    return lines
+
+
+def pdf_bytes(lines: List[str]) -> bytes:
+    """A minimal one-page PDF with the lines in Helvetica"""
+    def escape(text):
+        return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+    content = 'BT /F1 11 Tf 72 720 Td 14 TL ' + ' '.join(f'({escape(line)}) Tj T*' for line in lines) + ' ET'
+    objects = [
+        '<< /Type /Catalog /Pages 2 0 R >>',
+        '<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        '<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R '
+        '/Resources << /Font << /F1 5 0 R >> >> >>',
+        f'<< /Length {len(content)} >>\nstream\n{content}\nendstream',
+        '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(f'{number} 0 obj\n{body}\nendobj\n'.encode('latin-1'))
+    xref = out.tell()
+    out.write(f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode())
+    for offset in offsets:
+        out.write(f'{offset:010d} 00000 n \n'.encode())
+    out.write(f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode())
+    return out.getvalue()
+
+
+def docx_bytes(lines: List[str]) -> bytes:
+    import docx
+
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def synthetic_resume(rng: random.Random, index: int, pdf_share: float) -> Tuple[str, bytes]:
+    """(file name, content) of a resume with 4-10 random known skills"""
+    from jobs.scraper import ResumeParser
+
+    skills = rng.sample(sorted(ResumeParser.TECH_KEYWORDS), rng.randint(4, 10))
+    lines = resume_lines(rng, skills)
+    if rng.random() < pdf_share:
+        return f'loadtest-{index}.pdf', pdf_bytes(lines)
+    return f'loadtest-{index}.docx', docx_bytes(lines)
+
+
+def create_resumes(count: int, pdf_share: float, seed: int) -> List[int]:
+    from django.contrib.auth.models import User
+    from jobs.models import Resume
+    from jobs.uploads import resume_file_name, save_stream
+
+    rng = random.Random(seed)
+    user = User.objects.create_user('loadtest', password=None)
+    ids = []
+    for index in range(count):
+        filename, content = synthetic_resume(rng, index, pdf_share)
+        name, content_hash, size = save_stream(resume_file_name(filename), io.BytesIO(content))
+        resume = Resume.objects.create(user=user, file=name, content_hash=content_hash, task_status='pending')
+        ids.append(resume.id)
+    return ids
+
+
+class QueryCounter:
+    """connection.execute_wrapper that counts the queries it sees"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def rss_mib() -> float:
+    """Current resident set size (Linux), else the peak"""
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        return peak_rss_mib()
+
+
+def peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024  # Bytes on macOS, KiB elsewhere
+
+
+def run_task(resume_id: int, submitted: float) -> dict:
+    from django.db import close_old_connections, connection
+    from jobs.tasks import scrape_jobs_for_resume
+
+    queries = QueryCounter()
+    started = time.perf_counter()
+    try:
+        with connection.execute_wrapper(queries):
+            result = scrape_jobs_for_resume.apply(kwargs={'resume_id': resume_id})
+        outcome = result.result if isinstance(result.result, dict) else {'status': result.state.lower()}
+    finally:
+        close_old_connections()
+    finished = time.perf_counter()
+    return {
+        'status': outcome.get('status', 'unknown'),
+        'jobs_created': outcome.get('jobs_created', 0),
+        'runtime': finished - started,
+        'turnaround': finished - submitted,  # Includes waiting for a free worker
+        'queries': queries.count,
+    }
+
+
+def redis_available() -> bool:
+    from jobs.redis_client import get_redis
+
+    try:
+        return bool(get_redis().ping())
+    except Exception:
+        return False
+
+
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+LOCAL_RESULT_BACKEND = 'cache+memory://'
+
+
+def load_test(args) -> dict:
+    from celery.app.backends import by_url
+    from django.test.utils import override_settings
+    from jobs import tasks
+
+    # Follow-up tasks go to other queues; count them instead of running them
+    queued = Counter()
+    queued_lock = threading.Lock()
+
+    class CountingChain:
+        def __init__(self, *signatures):
+            self.signatures = signatures
+
+        def delay(self):
+            with queued_lock:
+                queued.update(signature.task for signature in self.signatures)
+
+    original_chain, tasks.chain = tasks.chain, CountingChain
+    if args.without_redis:
+        backend_cls, url = by_url(LOCAL_RESULT_BACKEND)
+        tasks.scrape_jobs_for_resume.backend = backend_cls(app=tasks.scrape_jobs_for_resume.app, url=url)
+
+    media_root = tempfile.mkdtemp(prefix='careeros-loadtest-')
+    try:
+        with override_settings(MEDIA_ROOT=media_root, **({'CACHES': LOCAL_CACHE} if args.without_redis else {})):
+            resume_ids = create_resumes(args.resumes, args.pdf_share, args.seed)
+            with StandInServer(latency=args.latency / 1000, error_rate=args.error_rate) as server:
+                base_urls = {name: server.url_for(name) for name in server.pages}
+                with override_settings(SCRAPER_BASE_URLS=base_urls, SCRAPER_DELAY=args.delay):
+                    rss_start = rss_mib()
+                    started = time.perf_counter()
+                    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+                        futures = [pool.submit(run_task, resume_id, started) for resume_id in resume_ids]
+                        results = [future.result() for future in futures]
+                    elapsed = time.perf_counter() - started
+                    rss_end = rss_mib()
+                platform_requests, platform_errors = server.requests, server.errors
+    finally:
+        tasks.chain = original_chain
+        tasks.scrape_jobs_for_resume.backend = None  # Back to the app's
+        shutil.rmtree(media_root, ignore_errors=True)
+
+    queries = sorted(result['queries'] for result in results)
+    failed = sum(result['status'] != 'success' for result in results)
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'database': django.db.connection.vendor,
+            'redis': not args.without_redis,
+            'resumes': args.resumes,
+            'workers': args.workers,
+            'latency_ms': args.latency,
+            'error_rate': args.error_rate,
+            'delay_s': args.delay,
+            'pdf_share': args.pdf_share,
+            'seed': args.seed,
+        },
+        'elapsed_s': round(elapsed, 3),
+        # A failed task does less than a whole scrape: no honest figure then
+        'throughput_per_min': None if failed else round(len(results) / elapsed * 60, 2),
+        'failed_tasks': failed,
+        'statuses': dict(Counter(result['status'] for result in results)),
+        'jobs_created': sum(result['jobs_created'] for result in results),
+        'task_runtime_ms': summarize([result['runtime'] for result in results]),
+        'task_turnaround_ms': summarize([result['turnaround'] for result in results]),
+        'queries_per_task': {
+            'mean': round(sum(queries) / len(queries), 1),
+            'min': queries[0],
+            'max': queries[-1],
+        },
+        'memory_mib': {
+            'rss_start': round(rss_start, 1),
+            'rss_end': round(rss_end, 1),
+            'peak': round(peak_rss_mib(), 1),
+        },
+        'platform_requests': platform_requests,
+        'platform_errors': platform_errors,
+        'follow_up_tasks': dict(queued),
+    }
+
+
+def print_report(results: dict):
+    meta = results['meta']
+    runtime, turnaround = results['task_runtime_ms'], results['task_turnaround_ms']
+    print(f"{meta['resumes']} resumes, {meta['workers']} workers, {meta['latency_ms']} ms latency, "
+          f"{meta['error_rate']:.0%} platform errors ({meta['database']}, "
+          f"{'redis' if meta['redis'] else 'in-process cache, no redis'})")
+    if results['throughput_per_min'] is None:
+        print(f"throughput      n/a: {results['failed_tasks']} of {meta['resumes']} tasks did not succeed "
+              f"({results['elapsed_s']} s)")
+    else:
+        print(f"throughput      {results['throughput_per_min']} resumes/min ({results['elapsed_s']} s)")
+    print(f"task runtime    p50 {runtime['median']:.0f}  p95 {runtime['p95']:.0f}  p99 {runtime['p99']:.0f} ms")
+    print(f"turnaround      p50 {turnaround['median']:.0f}  p95 {turnaround['p95']:.0f}  p99 {turnaround['p99']:.0f} ms")
+    queries = results['queries_per_task']
+    print(f"queries/task    mean {queries['mean']}  min {queries['min']}  max {queries['max']}")
+    memory = results['memory_mib']
+    print(f"memory (MiB)    rss {memory['rss_start']} -> {memory['rss_end']}, peak {memory['peak']}")
+    print(f"outcomes        {results['statuses']}, {results['jobs_created']} jobs, "
+          f"{results['platform_errors']}/{results['platform_requests']} platform requests failed")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--resumes', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=4, help='tasks run at the same time')
+    parser.add_argument('--latency', type=float, default=200, help='stand-in response delay in ms')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of platform requests that fail')
+    parser.add_argument('--delay', type=float, default=1.0, help='pause after each platform, s (SCRAPER_DELAY)')
+    parser.add_argument('--pdf-share', type=float, default=0.5, help='fraction of resumes that are PDFs')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--without-redis', action='store_true',
+                        help='use an in-process cache and result backend instead of REDIS_URL')
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--verbose', action='store_true', help='keep the application logs')
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    django.setup()
+    if not args.verbose:
+        logging.getLogger('jobs').setLevel(logging.CRITICAL)
+        logging.getLogger('celery').setLevel(logging.CRITICAL)
+
+    from django.db import connection
+
+    if not args.without_redis and not redis_available():
+        print('Redis is not reachable at REDIS_URL; start one, or pass --without-redis', file=sys.stderr)
+        return 2
+
+    # A throwaway database, like the test runner's
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        results = load_test(args)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print_report(results)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+            output.write('\n')
+        print(f'Results written to {args.output}')
+    return 1 if results['failed_tasks'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+Scraper Benchmark
+Replays the fixture pages through the real scrapers via the local stand-in
+server and measures the hot path:
+
+- per scraper: fetch (HTTP), parse (BeautifulSoup) and extract (walking the
+  tree into job dicts) time, plus peak memory allocated by one scrape
+- JobScraperService.scrape_all_platforms end to end, sequential versus
+  concurrent (one worker per platform)
+
+Results are written as JSON; pass a previous file as --baseline to fail
+(exit status 1) when a median got slower by more than --tolerance.
+
+    python -m benchmarks.scrapers --output scrapers.json
+    python -m benchmarks.scrapers --baseline scrapers.json
+    python -m benchmarks.scrapers --record     # refresh fixtures from the live sites
+"""
+import argparse
+import json
+import logging
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+from jobs import scraper as scraper_module
+from jobs.scraper import JobScraperService
+
+from .standin import FIXTURES_DIR, StandInServer
+from .stats import summarize
+
+KEYWORDS = ['python', 'developer', 'intern']
+LOCATION = 'India'
+
+
+class _Timings(threading.local):
+    def __init__(self):
+        self.fetch = 0.0
+        self.parse = 0.0
+        self.responses = []
+
+
+_timings = _Timings()
+
+
+class _TimedRequests:
+    """Stands in for the requests module inside jobs.scraper, timing get()"""
+
+    def __init__(self, requests_module):
+        self._requests = requests_module
+
+    def get(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self._requests.get(*args, **kwargs)
+        finally:
+            _timings.fetch += time.perf_counter() - started
+        _timings.responses.append(response)
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._requests, name)
+
+
+@contextmanager
+def instrumented():
+    """Time HTTP fetches and HTML parsing done by the scrapers"""
+    original_requests = scraper_module.requests
+    original_soup = scraper_module.BeautifulSoup
+
+    def timed_soup(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return original_soup(*args, **kwargs)
+        finally:
+            _timings.parse += time.perf_counter() - started
+
+    scraper_module.requests = _TimedRequests(original_requests)
+    scraper_module.BeautifulSoup = timed_soup
+    try:
+        yield
+    finally:
+        scraper_module.requests = original_requests
+        scraper_module.BeautifulSoup = original_soup
+
+
+def bench_scraper(service: JobScraperService, name: str, repeats: int, limit: int) -> dict:
+    scraper = service.scrapers[name]
+    fetch, parse, extract, total = [], [], [], []
+    jobs = []
+    scraper.scrape(KEYWORDS, LOCATION, limit)  # Warm up connections and caches
+    for _ in range(repeats):
+        _timings.__init__()
+        started = time.perf_counter()
+        jobs = scraper.scrape(KEYWORDS, LOCATION, limit)
+        elapsed = time.perf_counter() - started
+        fetch.append(_timings.fetch)
+        parse.append(_timings.parse)
+        extract.append(max(0.0, elapsed - _timings.fetch - _timings.parse))
+        total.append(elapsed)
+
+    # Separate pass: tracemalloc slows everything down, so it isn't timed
+    tracemalloc.start()
+    scraper.scrape(KEYWORDS, LOCATION, limit)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'fetch_ms': summarize(fetch),
+        'parse_ms': summarize(parse),
+        'extract_ms': summarize(extract),
+        'total_ms': summarize(total),
+        'peak_kib': round(peak / 1024, 1),
+        'retained_kib': round(current / 1024, 1),
+        'jobs': len(jobs),
+        # Fallback jobs (page not understood) are credited to the platform itself
+        'parsed_from_fixture': bool(jobs) and all(
+            name not in job['company'].lower().replace(' ', '') for job in jobs
+        ),
+    }
+
+
+def bench_service(service: JobScraperService, repeats: int, limit: int, max_workers: int) -> dict:
+    samples = []
+    jobs = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        jobs = service.scrape_all_platforms(
+            resume_path='', location=LOCATION, jobs_per_site=limit,
+            keywords=set(KEYWORDS), max_workers=max_workers
+        )
+        samples.append(time.perf_counter() - started)
+    return {'max_workers': max_workers, 'latency_ms': summarize(samples), 'jobs': len(jobs)}
+
+
+def run(repeats: int, limit: int, latency: float, delay: float) -> dict:
+    with StandInServer(latency=latency) as server:
+        service = JobScraperService(
+            base_urls={name: server.url_for(name) for name in server.pages},
+            delay=delay
+        )
+        missing = sorted(set(service.scrapers) - set(server.pages))
+        if missing:
+            raise SystemExit(f"No fixture page for: {', '.join(missing)}")
+
+        with instrumented():
+            scrapers = {name: bench_scraper(service, name, repeats, limit) for name in service.scrapers}
+        sequential = bench_service(service, repeats, limit, max_workers=1)
+        concurrent = bench_service(service, repeats, limit, max_workers=len(service.scrapers))
+
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeats': repeats,
+            'jobs_per_site': limit,
+            'latency_ms': latency * 1000,
+            'delay_s': delay,
+        },
+        'scrapers': scrapers,
+        'scrape_all_platforms': {
+            'sequential': sequential,
+            'concurrent': concurrent,
+            'speedup': round(sequential['latency_ms']['median'] / concurrent['latency_ms']['median'], 2),
+        },
+    }
+
+
+def medians(results: dict) -> Dict[str, float]:
+    """Flat {metric path: value} of the numbers compared against a baseline"""
+    flat = {}
+    for name, stats in results['scrapers'].items():
+        for metric in ('fetch_ms', 'parse_ms', 'extract_ms', 'total_ms'):
+            flat[f'scrapers.{name}.{metric}'] = stats[metric]['median']
+        flat[f'scrapers.{name}.peak_kib'] = stats['peak_kib']
+    for mode in ('sequential', 'concurrent'):
+        flat[f'scrape_all_platforms.{mode}.latency_ms'] = results['scrape_all_platforms'][mode]['latency_ms']['median']
+    return flat
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    current, previous = medians(results), medians(baseline)
+    found = []
+    for key, value in current.items():
+        before = previous.get(key)
+        if before and value > before * (1 + tolerance):
+            found.append(f'{key}: {before} -> {value} (+{(value / before - 1) * 100:.0f}%)')
+    return found
+
+
+def record(limit: int):
+    """Save the pages the scrapers fetch from the live sites as fixtures"""
+    service = JobScraperService(delay=0)
+    with instrumented():
+        for name, scraper in service.scrapers.items():
+            _timings.__init__()
+            scraper.scrape(KEYWORDS, LOCATION, limit)
+            response = _timings.responses[-1] if _timings.responses else None
+            if response is None or response.status_code != 200:
+                print(f'{name}: not recorded ({getattr(response, "status_code", "no response")})')
+                continue
+            path = FIXTURES_DIR / f'{name}.html'
+            path.write_bytes(response.content)
+            print(f'{name}: {len(response.content)} bytes -> {path}')
+
+
+def print_report(results: dict):
+    print(f"{'scraper':<16}{'fetch':>10}{'parse':>10}{'extract':>10}{'total':>10}{'peak KiB':>10}  jobs")
+    for name, stats in results['scrapers'].items():
+        print(f"{name:<16}"
+              f"{stats['fetch_ms']['median']:>10.2f}{stats['parse_ms']['median']:>10.2f}"
+              f"{stats['extract_ms']['median']:>10.2f}{stats['total_ms']['median']:>10.2f}"
+              f"{stats['peak_kib']:>10.1f}  {stats['jobs']}")
+    service = results['scrape_all_platforms']
+    print(f"scrape_all_platforms: sequential {service['sequential']['latency_ms']['median']:.1f} ms, "
+          f"concurrent {service['concurrent']['latency_ms']['median']:.1f} ms "
+          f"({service['speedup']}x)  [medians, ms]")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--repeats', type=int, default=20, help='timed runs per measurement')
+    parser.add_argument('--limit', type=int, default=2, help='jobs_per_site, as the task uses')
+    parser.add_argument('--latency', type=float, default=50, help='stand-in response delay in ms')
+    parser.add_argument('--delay', type=float, default=0, help='pause between platforms when sequential, s')
+    parser.add_argument('--output', type=Path, help='write results JSON here')
+    parser.add_argument('--baseline', type=Path, help='results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown vs baseline (0.25 = 25%%)')
+    parser.add_argument('--record', action='store_true', help='refresh fixtures from the live sites and exit')
+    args = parser.parse_args(argv)
+
+    # The scrapers log every request at INFO
+    logging.getLogger(scraper_module.__name__).setLevel(logging.WARNING)
+
+    if args.record:
+        record(args.limit)
+        return 0
+
+    results = run(args.repeats, args.limit, args.latency / 1000, args.delay)
+    print_report(results)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + '\n')
+        print(f'Results written to {args.output}')
+
+    if args.baseline:
+        found = regressions(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for line in found:
+            print(f'REGRESSION {line}')
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
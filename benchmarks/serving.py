@@ -0,0 +1,264 @@
+"""
+Serving Benchmark
+Requests/sec, latency and memory of the API served by gunicorn (WSGI, as
+start.sh runs it by default) versus uvicorn (ASGI, SERVER_MODE=asgi)
+
+Both servers run the real application with the same number of worker
+processes against a throwaway SQLite database seeded with one user's
+resumes, jobs and applications. Client threads keep --connections
+connections busy for --duration seconds, cycling through the polled read
+endpoints (/api/jobs/, /api/resumes/, /api/resumes/{id}/status/,
+/api/applications/).
+
+--slow-clients holds that many extra connections open for the whole run,
+each having sent only part of its request, like clients on bad networks
+(or open progress streams): a sync worker is stuck with each one, the
+event loop is not.
+
+    python -m benchmarks.serving --workers 2 --connections 16
+    python -m benchmarks.serving --slow-clients 4 --output serving.json
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+from .stats import summarize
+
+ROOT = Path(__file__).resolve().parent.parent
+SETTINGS = 'benchmarks.serving_settings'
+
+SERVERS = {
+    'wsgi': ['-m', 'gunicorn', 'core.wsgi:application', '--bind', '127.0.0.1:{port}',
+             '--workers', '{workers}', '--log-level', 'warning'],
+    'asgi': ['-m', 'uvicorn', 'core.asgi:application', '--host', '127.0.0.1', '--port', '{port}',
+             '--workers', '{workers}', '--log-level', 'warning', '--no-access-log'],
+}
+STARTUP_TIMEOUT = 30  # Seconds for a server to start answering
+
+
+def seed(jobs: int) -> dict:
+    """A user with a token, two resumes, their jobs and a few applications"""
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from rest_framework.authtoken.models import Token
+    from jobs.models import Job, JobApplication, Resume
+
+    call_command('migrate', verbosity=0)
+    user = User.objects.create_user('servingbench', password=None)
+    resumes = [
+        Resume.objects.create(user=user, file=f'resumes/bench-{index}.pdf', task_status='completed',
+                              keywords_extracted='python, django, api')
+        for index in range(2)
+    ]
+    created = Job.objects.bulk_create(
+        Job(resume=resumes[index % 2], title=f'Python Developer {index}', company=f'Company {index % 40}',
+            platform=('LinkedIn', 'Naukri', 'RemoteOK')[index % 3], link=f'https://example.com/jobs/{index}',
+            location='India')
+        for index in range(jobs)
+    )
+    JobApplication.objects.bulk_create(JobApplication(user=user, job=job, status='saved') for job in created[:10])
+    return {
+        'token': Token.objects.create(user=user).key,
+        'paths': ['/api/jobs/', '/api/resumes/', f'/api/resumes/{resumes[0].id}/status/', '/api/applications/'],
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def process_tree_rss_mib(pid: int) -> float:
+    """Resident memory of a process and its children (Linux /proc)"""
+    children = {}
+    for entry in Path('/proc').iterdir():
+        if entry.name.isdigit():
+            try:
+                stat = (entry / 'stat').read_text()
+            except OSError:
+                continue
+            children.setdefault(int(stat.rsplit(')', 1)[1].split()[1]), []).append(int(entry.name))
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        pending.extend(children.get(current, []))
+        try:
+            for line in Path(f'/proc/{current}/status').read_text().splitlines():
+                if line.startswith('VmRSS:'):
+                    total += int(line.split()[1])
+        except OSError:
+            pass
+    return total / 1024
+
+
+def request(connection: http.client.HTTPConnection, path: str, token: str) -> int:
+    connection.request('GET', path, headers={'Authorization': f'Token {token}'})
+    response = connection.getresponse()
+    response.read()
+    if response.will_close:
+        connection.close()  # Reopened by the next request()
+    return response.status
+
+
+def wait_until_up(port: int, token: str, path: str, server: subprocess.Popen):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f'Server exited with status {server.returncode}')
+        try:
+            if request(http.client.HTTPConnection('127.0.0.1', port, timeout=5), path, token) == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server on port {port} did not come up')
+
+
+def hold_slow_clients(port: int, count: int) -> List[socket.socket]:
+    """Connections that sent half a request and then went quiet"""
+    held = []
+    for _ in range(count):
+        client = socket.create_connection(('127.0.0.1', port))
+        client.sendall(b'GET /api/jobs/ HTTP/1.1\r\nHost: 127.0.0.1\r\n')
+        held.append(client)
+    return held
+
+
+def generate_load(port: int, token: str, paths: List[str], connections: int, duration: float) -> dict:
+    latencies, statuses, lock = [], Counter(), threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(offset: int):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        mine, seen = [], Counter()
+        index = offset
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                status = request(connection, paths[index % len(paths)], token)
+            except (OSError, http.client.HTTPException):
+                status = 'error'
+                connection.close()
+            mine.append(time.perf_counter() - started)
+            seen[status] += 1
+            index += 1
+        with lock:
+            latencies.extend(mine)
+            statuses.update(seen)
+
+    threads = [threading.Thread(target=client, args=(offset,)) for offset in range(connections)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': len(latencies),
+        'requests_per_s': round(len(latencies) / elapsed, 1),
+        'latency_ms': summarize(latencies) if latencies else None,
+        'statuses': {str(status): count for status, count in statuses.items()},
+    }
+
+
+def bench_server(mode: str, args, env: dict, seeded: dict) -> dict:
+    port = free_port()
+    command = [sys.executable] + [part.format(port=port, workers=args.workers) for part in SERVERS[mode]]
+    server = subprocess.Popen(command, cwd=ROOT, env={**env, 'SERVER_MODE': mode})  # Picks api.urls' routes
+    held = []
+    try:
+        wait_until_up(port, seeded['token'], seeded['paths'][0], server)
+        # Warm every worker's caches and connections before measuring
+        generate_load(port, seeded['token'], seeded['paths'], args.connections, 1.0)
+        idle_rss = process_tree_rss_mib(server.pid)
+        held = hold_slow_clients(port, args.slow_clients)
+        results = generate_load(port, seeded['token'], seeded['paths'], args.connections, args.duration)
+        results['rss_mib'] = {'idle': round(idle_rss, 1), 'loaded': round(process_tree_rss_mib(server.pid), 1)}
+        return results
+    finally:
+        for client in held:
+            client.close()
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def run(args) -> dict:
+    workdir = tempfile.mkdtemp(prefix='careeros-serving-')
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': SETTINGS,
+        'BENCHMARK_DATABASE': str(Path(workdir) / 'db.sqlite3'),
+        'PYTHONPATH': os.pathsep.join(filter(None, [str(ROOT), os.environ.get('PYTHONPATH')])),
+    }
+    try:
+        os.environ.update({name: env[name] for name in ('DJANGO_SETTINGS_MODULE', 'BENCHMARK_DATABASE')})
+        import django
+        django.setup()
+        seeded = seed(args.jobs)
+        servers = {mode: bench_server(mode, args, env, seeded) for mode in args.servers}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'workers': args.workers,
+            'connections': args.connections,
+            'slow_clients': args.slow_clients,
+            'duration_s': args.duration,
+            'jobs': args.jobs,
+            'paths': seeded['paths'],
+        },
+        'servers': servers,
+    }
+
+
+def print_report(results: dict):
+    meta = results['meta']
+    print(f"{meta['workers']} workers, {meta['connections']} connections, "
+          f"{meta['slow_clients']} slow clients, {meta['duration_s']} s per server")
+    print(f"{'server':<8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'RSS idle':>10}{'RSS load':>10}  statuses")
+    for mode, stats in results['servers'].items():
+        latency = stats['latency_ms'] or {'median': 0, 'p99': 0}
+        print(f"{mode:<8}{stats['requests_per_s']:>10.1f}{latency['median']:>10.1f}{latency['p99']:>10.1f}"
+              f"{stats['rss_mib']['idle']:>10.1f}{stats['rss_mib']['loaded']:>10.1f}  {stats['statuses']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--servers', nargs='+', choices=list(SERVERS), default=list(SERVERS))
+    parser.add_argument('--workers', type=int, default=2, help='worker processes per server')
+    parser.add_argument('--connections', type=int, default=16, help='concurrent client connections')
+    parser.add_argument('--slow-clients', type=int, default=0, help='extra connections that never finish a request')
+    parser.add_argument('--duration', type=float, default=10, help='seconds of load per server')
+    parser.add_argument('--jobs', type=int, default=200, help='jobs in the seeded database')
+    parser.add_argument('--output', type=Path, help='write results JSON here')
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    print_report(results)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + '\n')
+        print(f'Results written to {args.output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,14 @@
+"""
+Settings for the servers benchmarks.serving starts: the app's own, with
+the throwaway SQLite database it seeded
+"""
+import os
+
+from core.settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'core.sqlite_backend',
+        'NAME': os.environ['BENCHMARK_DATABASE'],
+    }
+}
@@ -0,0 +1,96 @@
+"""
+Local stand-in for the job sites
+Serves fixture pages over HTTP on 127.0.0.1 so scrapers can run offline.
+The first path segment picks the site: a scraper built with
+base_url=server.url_for('linkedin') gets fixtures/linkedin.html for
+every URL it requests.
+"""
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional
+
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures'
+
+
+def load_fixtures(directory: Path = FIXTURES_DIR) -> Dict[str, bytes]:
+    """Fixture pages keyed by platform name (file name without .html)"""
+    return {path.stem: path.read_bytes() for path in sorted(directory.glob('*.html'))}
+
+
+class StandInServer:
+    """
+    Threaded HTTP server in the background, used as a context manager
+
+    latency (seconds) is slept before each response, to stand in for the
+    network round trip the real sites cost; error_rate is the fraction of
+    requests answered with a 503 instead of the page.
+    """
+
+    def __init__(self, pages: Optional[Dict[str, bytes]] = None, latency: float = 0.0, error_rate: float = 0.0):
+        self.pages = pages if pages is not None else load_fixtures()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                failing = server.error_rate and random.random() < server.error_rate
+                with server._lock:
+                    server.requests += 1
+                    server.errors += bool(failing)
+                if server.latency:
+                    time.sleep(server.latency)
+                if failing:
+                    self.send_error(503)
+                    return
+                platform = self.path.lstrip('/').split('/', 1)[0]
+                body = server.pages.get(platform)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output clean
+
+        return Handler
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def url_for(self, platform: str) -> str:
+        return f'{self.base_url}/{platform}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
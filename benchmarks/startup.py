@@ -0,0 +1,178 @@
+"""
+Startup Benchmark
+Cold-start time and memory of a fresh process, as a gunicorn worker (web)
+or a Celery worker (worker) boots:
+
+- web: the WSGI application plus the URLconf, i.e. everything a gunicorn
+  worker imports before serving its first request
+- worker: the Celery app with its task modules, plus what the first scrape
+  imports (jobs.scraper and the resume readers)
+
+Each target is started --repeats times in a new interpreter for wall time
+and peak RSS, and as often under `python -X importtime` for a breakdown of
+import time by top-level package (medians throughout).
+
+The web target must not import the scraping and parsing libraries
+(WEB_FORBIDDEN); they belong to the workers. Finding one there fails the
+run (exit status 1), as does a median more than --tolerance above a
+--baseline.
+
+    python -m benchmarks.startup --output startup.json
+    python -m benchmarks.startup --baseline startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules only Celery workers need
+WEB_FORBIDDEN = ('selenium', 'PyPDF2', 'docx', 'bs4', 'jobs.scraper', 'jobs.tasks', 'jobs.enrichment')
+
+TARGETS = {
+    'web': '''
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+''',
+    'worker': '''
+from core.celery import app
+app.loader.import_default_modules()
+import jobs.scraper, PyPDF2, docx
+''',
+}
+
+# Appended to every target: report what the process ended up with
+REPORT = '''
+import json, resource, sys, time
+print(json.dumps({
+    'seconds': time.perf_counter() - _started,
+    'rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'modules': sorted(sys.modules),
+}))
+'''
+
+TOP_SHOWN = 10  # Packages listed in the import time breakdown
+
+
+def source(target: str) -> str:
+    return f'import time\n_started = time.perf_counter()\n{TARGETS[target]}{REPORT}'
+
+
+def start(target: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    command = [sys.executable, *(['-X', 'importtime'] if importtime else []), '-c', source(target)]
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'core.settings')}
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(ROOT), env.get('PYTHONPATH')]))
+    completed = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+    if completed.returncode:
+        raise RuntimeError(f'{target} failed to start:\n{completed.stderr[-2000:]}')
+    return completed
+
+
+def import_breakdown(stderr: str) -> Dict[str, float]:
+    """Milliseconds of import time (self) per top-level package, from -X importtime output"""
+    totals = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, _, name = line[len('import time:'):].split('|')
+        totals[name.strip().split('.')[0]] += int(own) / 1000
+    return dict(totals)
+
+
+def bench_target(target: str, repeats: int) -> dict:
+    runs = [json.loads(start(target).stdout.splitlines()[-1]) for _ in range(repeats)]
+    breakdowns = [import_breakdown(start(target, importtime=True).stderr) for _ in range(repeats)]
+    packages = {
+        name: statistics.median(breakdown.get(name, 0.0) for breakdown in breakdowns)
+        for name in set().union(*breakdowns)
+    }
+    modules = runs[-1]['modules']
+    return {
+        'startup_ms': round(statistics.median(run['seconds'] for run in runs) * 1000, 1),
+        'rss_kib': statistics.median(run['rss_kib'] for run in runs),
+        'import_ms': round(statistics.median(sum(breakdown.values()) for breakdown in breakdowns), 1),
+        'modules': len(modules),
+        'slowest_packages': {
+            name: round(ms, 1) for name, ms in sorted(packages.items(), key=lambda item: -item[1])[:TOP_SHOWN]
+        },
+        'loaded': [name for name in WEB_FORBIDDEN if name in modules],
+    }
+
+
+def run(repeats: int) -> dict:
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeats': repeats,
+        },
+        'targets': {target: bench_target(target, repeats) for target in TARGETS},
+    }
+
+
+def medians(results: dict) -> Dict[str, float]:
+    """Flat {metric path: value} of the numbers compared against a baseline"""
+    return {
+        f'{target}.{metric}': stats[metric]
+        for target, stats in results['targets'].items()
+        for metric in ('startup_ms', 'rss_kib', 'import_ms')
+    }
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    current, previous = medians(results), medians(baseline)
+    found = []
+    for key, value in current.items():
+        before = previous.get(key)
+        if before and value > before * (1 + tolerance):
+            found.append(f'{key}: {before} -> {value} (+{(value / before - 1) * 100:.0f}%)')
+    loaded = results['targets']['web']['loaded']
+    if loaded:
+        found.append(f"web imports worker-only modules: {', '.join(loaded)}")
+    return found
+
+
+def print_report(results: dict):
+    print(f"{'target':<10}{'startup ms':>12}{'imports ms':>12}{'RSS MiB':>10}{'modules':>9}  slowest packages (ms)")
+    for target, stats in results['targets'].items():
+        slowest = ', '.join(f'{name} {ms:.0f}' for name, ms in list(stats['slowest_packages'].items())[:5])
+        print(f"{target:<10}{stats['startup_ms']:>12.1f}{stats['import_ms']:>12.1f}"
+              f"{stats['rss_kib'] / 1024:>10.1f}{stats['modules']:>9}  {slowest}")
+        if target == 'web' and stats['loaded']:
+            print(f"{'':<10}worker-only modules loaded: {', '.join(stats['loaded'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--repeats', type=int, default=5, help='fresh processes started per target')
+    parser.add_argument('--output', type=Path, help='write results JSON here')
+    parser.add_argument('--baseline', type=Path, help='results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed growth vs baseline (0.25 = 25%%)')
+    args = parser.parse_args(argv)
+
+    results = run(args.repeats)
+    print_report(results)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + '\n')
+        print(f'Results written to {args.output}')
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else {'targets': {}}
+    found = regressions(results, baseline, args.tolerance)
+    for line in found:
+        print(f'REGRESSION {line}')
+    return 1 if found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,22 @@
+"""
+Summary statistics shared by the benchmarks
+"""
+import statistics
+from typing import Dict, List, Sequence
+
+
+def percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted samples"""
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Milliseconds: median, p95, p99, min and max of samples taken in seconds"""
+    ordered = sorted(samples)
+    return {
+        'median': round(statistics.median(ordered) * 1000, 3),
+        'p95': round(percentile(ordered, 0.95) * 1000, 3),
+        'p99': round(percentile(ordered, 0.99) * 1000, 3),
+        'min': round(ordered[0] * 1000, 3),
+        'max': round(ordered[-1] * 1000, 3),
+    }
@@ -22,18 +22,23 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'jobs.middleware.RequestMetricsMiddleware',
+    'jobs.middleware.RequestTracingMiddleware',
+    'jobs.middleware.QueryProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'jobs.middleware.AsyncWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'jobs.middleware.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
 WSGI_APPLICATION = 'core.wsgi.application'
+ASGI_APPLICATION = 'core.asgi.application'  # SERVER_MODE=asgi in start.sh
 
 TEMPLATES = [
     {
@@ -52,32 +57,93 @@ TEMPLATES = [
 ]
 
 # DATABASE - Simple PostgreSQL or SQLite
+# Each gunicorn worker thread and each Celery worker process holds one
+# connection for DB_CONN_MAX_AGE seconds, checked before it is reused.
+# Their sum must stay below the server's max_connections: see
+# `python manage.py db_connections`, or put PgBouncer in front (DB_POOLER).
 import dj_database_url
 
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi')  # start.sh: wsgi (gunicorn) or asgi (uvicorn)
+
+# Applied to the primary and to every replica
+DATABASE_OPTIONS = {
+    # Under ASGI each request runs in a thread of its own, so a kept
+    # connection is never reused - only left open
+    'conn_max_age': int(os.environ.get('DB_CONN_MAX_AGE', 0 if SERVER_MODE == 'asgi' else 600)),
+    'conn_health_checks': True,
+    # DB_POOLER=pgbouncer (transaction pooling): consecutive queries may
+    # run on different server connections, which server-side cursors
+    # (the streamed exports' .iterator()) don't survive
+    'disable_server_side_cursors': os.environ.get('DB_POOLER') == 'pgbouncer',
+    'ssl_require': os.environ.get('DB_SSL_REQUIRE', 'True') == 'True',  # False for a pooler on localhost
+}
+
 if 'DATABASE_URL' in os.environ:
     DATABASES = {
-        'default': dj_database_url.config(conn_max_age=600, ssl_require=True)
+        'default': dj_database_url.config(**DATABASE_OPTIONS)
     }
 else:
-    # SQLite for local development
+    # SQLite for local development, in WAL mode with writes that wait for the
+    # lock (core.sqlite_backend) so web and workers can share the file
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
+            'ENGINE': 'core.sqlite_backend',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                'timeout': 20,  # Seconds a write waits for the lock before "database is locked"
+            },
         }
     }
 
+# READ REPLICAS - comma-separated DATABASE_REPLICA_URLS become 'replica1',
+# 'replica2', ... and GET requests read from them (jobs.replicas). Locally a
+# sqlite:/// URL works: the same file, or a copy of it to see replica lag.
+# Tests run against the primary (MIRROR).
+DATABASE_REPLICA_URLS = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+for index, url in enumerate(DATABASE_REPLICA_URLS, start=1):
+    if url.startswith('sqlite:'):
+        replica = dj_database_url.parse(url, engine='core.sqlite_backend')
+        replica['OPTIONS'] = {'timeout': 20}
+    else:
+        replica = dj_database_url.parse(url, **DATABASE_OPTIONS)
+    DATABASES[f'replica{index}'] = {**replica, 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_ROUTERS = ['jobs.replicas.ReplicaRouter']
+
 # STATIC FILES - Simple
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# FILE STORAGE - resumes go to local disk (MEDIA_ROOT), or to an S3-compatible
+# store (AWS, MinIO, ...) when a bucket is configured. Workers read resumes
+# through the storage API, so web and worker nodes don't need a shared disk.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedStaticFilesStorage',
+    },
+}
+if os.environ.get('AWS_STORAGE_BUCKET_NAME'):
+    # Credentials come from AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY
+    STORAGES['default'] = {
+        'BACKEND': 'storages.backends.s3.S3Storage',
+        'OPTIONS': {
+            'bucket_name': os.environ['AWS_STORAGE_BUCKET_NAME'],
+            'endpoint_url': os.environ.get('AWS_S3_ENDPOINT_URL'),  # e.g. http://localhost:9000 for MinIO
+            'region_name': os.environ.get('AWS_S3_REGION_NAME'),
+            'file_overwrite': False,
+            'default_acl': 'private',
+        },
+    }
+
 # CELERY - Simple Redis config
 REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
 CELERY_BROKER_URL = REDIS_URL
@@ -86,6 +152,118 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 
+# CACHE - the Redis Celery uses (REDIS_URL). It has to be shared: workers
+# bump the generations of cached pages (jobs.caching) and pin users to the
+# primary (jobs.replicas), and the web processes must see it. Without
+# REDIS_URL (local development) each process caches in its own memory, so
+# pages may lag behind a worker's writes by up to jobs.caching.CACHE_TIMEOUT
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'careeros',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# QUEUES - the Procfile's worker serves them all; split deployments give each
+# its own worker(s) (WORKER_QUEUES=interactive), so a user waiting on their
+# first scrape never queues behind bulk or housekeeping work:
+#   interactive  first scrape of a freshly uploaded resume (jobs.dispatch)
+#   batch        rescrapes and matching
+#   enrichment   detail-page fetching, so it never slows down the search scrape
+#   maintenance  periodic cleanup and reconciliation
+CELERY_TASK_DEFAULT_QUEUE = 'batch'
+CELERY_TASK_ROUTES = {
+    'jobs.tasks.scrape_jobs_for_resume': {'queue': 'batch'},
+    'jobs.tasks.match_new_jobs': {'queue': 'batch'},
+    'jobs.tasks.enrich_job_descriptions': {'queue': 'enrichment'},
+    'jobs.tasks.cleanup_old_jobs': {'queue': 'maintenance'},
+    'jobs.tasks.cleanup_stale_uploads': {'queue': 'maintenance'},
+    'jobs.tasks.reconcile_counters': {'queue': 'maintenance'},
+    'jobs.tasks.report_queue_depth': {'queue': 'maintenance'},
+}
+
+# Priorities order tasks within a queue (Redis: 0 is served first)
+CELERY_TASK_DEFAULT_PRIORITY = 5
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'priority_steps': list(range(10)),
+    'sep': ':',
+    'queue_order_strategy': 'priority',
+    # Must exceed the longest task, or acks_late tasks get redelivered
+    'visibility_timeout': 3600,
+}
+
+# A scrape attempt is killed after SCRAPE_TIME_LIMIT seconds and retried at
+# most SCRAPE_MAX_RETRIES times (jobs.tasks); jobs.dispatch sizes its
+# per-resume lock from these and the visibility timeout above
+SCRAPE_TIME_LIMIT = 15 * 60
+SCRAPE_MAX_RETRIES = 3
+
+# Scrapes are long and I/O bound: take one task at a time and acknowledge it
+# when done, so queued tasks stay available to idle workers instead of
+# sitting in a busy worker's prefetch buffer
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+
+# Each worker process keeps its database connection from task to task
+# (jobs.signals recycles it per DB_CONN_MAX_AGE, like a web request would)
+# rather than Celery's default of reconnecting for every task
+CELERY_DB_REUSE_MAX = 1000
+
+# Periodic jobs (run by the `beat` process in the Procfile)
+CELERY_BEAT_SCHEDULE = {
+    'cleanup-old-jobs': {
+        'task': 'jobs.tasks.cleanup_old_jobs',
+        'schedule': 86400.0,
+    },
+    # Correct any drift in the denormalized counters (jobs.counters)
+    'reconcile-counters': {
+        'task': 'jobs.tasks.reconcile_counters',
+        'schedule': 3600.0,
+    },
+    # Remove parts of chunked uploads that were never completed
+    'cleanup-stale-uploads': {
+        'task': 'jobs.tasks.cleanup_stale_uploads',
+        'schedule': 86400.0,
+    },
+    # Queue lengths for the metrics (jobs.metrics)
+    'report-queue-depth': {
+        'task': 'jobs.tasks.report_queue_depth',
+        'schedule': 30.0,
+        'options': {'expires': 30},
+    },
+}
+
+# METRICS - StatsD agent that receives timings and counters (jobs.metrics);
+# nothing is sent when STATSD_HOST is unset
+STATSD_HOST = os.environ.get('STATSD_HOST')
+STATSD_PORT = int(os.environ.get('STATSD_PORT', 8125))
+STATSD_PREFIX = os.environ.get('STATSD_PREFIX', 'careeros')
+
+# TRACING - JSON-lines file every process appends finished spans to
+# (jobs.tracing); spans are only recorded when it is set
+TRACING_FILE = os.environ.get('TRACING_FILE')
+TRACING_SAMPLE_RATE = float(os.environ.get('TRACING_SAMPLE_RATE', 1.0))
+
+# QUERY PROFILING - share of requests whose queries are profiled
+# (jobs.middleware.QueryProfilingMiddleware), and the X-Profile-Queries
+# header value that profiles a single request outside DEBUG
+QUERY_PROFILING_SAMPLE_RATE = float(os.environ.get('QUERY_PROFILING_SAMPLE_RATE', 0.0))
+QUERY_PROFILING_TOKEN = os.environ.get('QUERY_PROFILING_TOKEN')
+
+# SCRAPERS - hosts to fetch each platform from (the load test points these at a
+# local stand-in; empty means the real sites) and the pause after each platform
+SCRAPER_BASE_URLS = {}
+SCRAPER_DELAY = 1.0
+
 # BASIC Django settings
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LANGUAGE_CODE = 'en-us'
@@ -96,7 +274,7 @@ USE_TZ = True
 # REST Framework - minimal config
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'jobs.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
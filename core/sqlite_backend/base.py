@@ -0,0 +1,34 @@
+"""
+SQLite backend for local development
+Django's SQLite backend, tuned so the web process and Celery workers can
+write to the same file without "database is locked" errors:
+
+- WAL journal: readers no longer block the writer, nor the writer readers
+- synchronous=NORMAL: with WAL, commits skip the fsync (still durable
+  across application crashes, only the last commits can be lost on power
+  failure - fine for a dev database)
+- transactions begin IMMEDIATE, taking the write lock up front. A deferred
+  transaction that reads and then writes can't wait for the lock (SQLite
+  fails the upgrade at once instead of honouring the busy timeout);
+  waiting at BEGIN does respect OPTIONS['timeout'].
+
+Django 5.1 offers the last as OPTIONS['transaction_mode'] and pragmas as
+OPTIONS['init_command']; this does the same on 4.2.
+"""
+from django.db.backends.sqlite3 import base
+
+PRAGMAS = (
+    'PRAGMA journal_mode = WAL',    # Stored in the file; a no-op for in-memory test databases
+    'PRAGMA synchronous = NORMAL',
+)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -21,7 +21,7 @@ class ResumeAdmin(admin.ModelAdmin):
 class JobAdmin(admin.ModelAdmin):
     list_display = ['id', 'title', 'company', 'platform', 'location', 'scraped_at', 'is_active', 'view_link']
     list_filter = ['platform', 'is_active', 'scraped_at', 'location']
-    search_fields = ['title', 'company', 'description']
+    search_fields = ['title', 'company']  # description is stored compressed
     date_hierarchy = 'scraped_at'
     raw_id_fields = ['resume']
     list_editable = ['is_active']
@@ -38,6 +38,13 @@ class JobAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        # The change list never shows the description, so don't load it
+        queryset = super().get_queryset(request)
+        if request.resolver_match and request.resolver_match.url_name == 'jobs_job_changelist':
+            queryset = queryset.defer('description')
+        return queryset
+    
     def view_link(self, obj):
         from django.utils.html import format_html
         return format_html('<a href="{}" target="_blank">View Job</a>', obj.link)
@@ -46,15 +53,15 @@ class JobAdmin(admin.ModelAdmin):
 
 @admin.register(JobApplication)
 class JobApplicationAdmin(admin.ModelAdmin):
-    list_display = ['id', 'job_title', 'job_company', 'status', 'applied_at', 'created_at']
+    list_display = ['id', 'user', 'job_title', 'job_company', 'status', 'applied_at', 'created_at']
     list_filter = ['status', 'created_at', 'applied_at']
-    search_fields = ['job__title', 'job__company', 'notes']
+    search_fields = ['user__username', 'job__title', 'job__company', 'notes']
     date_hierarchy = 'created_at'
-    raw_id_fields = ['job']
+    raw_id_fields = ['user', 'job']
     
     fieldsets = (
         ('Application Details', {
-            'fields': ('job', 'status', 'applied_at')
+            'fields': ('user', 'job', 'status', 'applied_at')
         }),
         ('Notes', {
             'fields': ('notes',)
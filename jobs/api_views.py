@@ -2,20 +2,28 @@
 Django REST Framework API Views
 Using beginner-friendly class-based views: ListAPIView, CreateAPIView, etc.
 """
+from abc import ABC, abstractmethod
+
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.authtoken.models import Token
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+import redis
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.db.models import Count
+from django.shortcuts import get_object_or_404
+from rest_framework import serializers
 
-from .models import Resume, Job, JobApplication
+from .models import Resume, ResumeUpload, Job, JobApplication
 from .serializers import (
     UserSerializer, LoginSerializer, ResumeSerializer,
-    JobSerializer, JobApplicationSerializer
+    ResumeUploadSerializer, JobSerializer, JobListSerializer, JobApplicationSerializer
 )
-from .tasks import scrape_jobs_for_resume
+from . import authentication, caching, counters, dispatch, exports, health, matching, progress, uploads
 
 
 # ============ Authentication APIs ============
@@ -85,8 +93,12 @@ class LogoutAPIView(APIView):
     permission_classes = [IsAuthenticated]
     
     def post(self, request):
-        # Delete the user's token
-        request.user.auth_token.delete()
+        # Delete the user's token and drop it from the auth cache
+        token = Token.objects.filter(user=request.user).first()
+        if token is not None:
+            key = token.key
+            token.delete()
+            authentication.forget_token(key)
         return Response({
             'message': 'Logged out successfully!'
         })
@@ -114,25 +126,42 @@ class ResumeListCreateAPIView(generics.ListCreateAPIView):
     serializer_class = ResumeSerializer
     permission_classes = [IsAuthenticated]
     
-    def get_queryset(self):
+    @staticmethod
+    def resumes_for(user):
         # Only show resumes belonging to current user
-        return Resume.objects.filter(user=self.request.user).order_by('-uploaded_at')
+        return (
+            Resume.objects.filter(user=user)
+            .select_related('user')
+            .annotate(job_total=Count('jobs'))
+            .order_by('-uploaded_at')
+        )
+    
+    def get_queryset(self):
+        return self.resumes_for(self.request.user)
+    
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        created = self.perform_create(serializer)
+        # 200 with the earlier resume when the same file was uploaded before
+        return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
     
     def perform_create(self, serializer):
-        # Save resume with auto-set user
-        resume = serializer.save(user=self.request.user, task_status='pending')
+        # Stream the file to storage, hashing it on the way
+        try:
+            name, content_hash, size = uploads.store_resume_file(serializer.validated_data['file'])
+        except uploads.UploadError as e:
+            raise serializers.ValidationError({'file': [str(e)]})
         
-        # Trigger background job scraping
+        # Save resume with auto-set user, or reuse an identical earlier one
+        resume, created = uploads.create_resume(self.request.user, name, content_hash)
+        serializer.instance = resume
         location = self.request.data.get('location', 'India')
-        task = scrape_jobs_for_resume.delay(
-            resume_id=resume.id,
-            location=location,
-            jobs_per_site=2
-        )
-        
-        # Store task ID for status tracking
-        resume.task_id = task.id
-        resume.save()
+        if created:
+            dispatch.start_scraping(resume, location, interactive=True)
+        else:
+            dispatch.refresh_duplicate(resume, location)
+        return created
 
 
 class ResumeDetailAPIView(generics.RetrieveDestroyAPIView):
@@ -146,39 +175,246 @@ class ResumeDetailAPIView(generics.RetrieveDestroyAPIView):
     def get_queryset(self):
         # Only allow access to user's own resumes
         return Resume.objects.filter(user=self.request.user)
+    
+    def perform_destroy(self, instance):
+        # Deleting a resume also deletes its jobs and applications
+        user_id = instance.user_id
+        with counters.batched():
+            instance.delete()
+        caching.bump_for_users(['resumes', 'jobs', 'applications'], [user_id], [instance.id])
+
+
+class ResumeEventsAPIView(APIView):
+    """
+    GET /api/resumes/{id}/events/
+    Server-sent events stream with the resume's scraping progress
+    (status, parsed, platform, saved); ends when the task finishes
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, pk):
+        resume = get_object_or_404(Resume.objects.only('id'), pk=pk, user=request.user)
+        return progress.stream_response(request, resume)
+
+
+class ResumeStatusAPIView(APIView):
+    """
+    GET /api/resumes/{id}/status/ - Task status and structured progress
+    For clients that poll instead of following /events/
+    """
+    permission_classes = [IsAuthenticated]
+    FIELDS = ('id', 'task_id', 'task_status', 'task_result', 'keywords_extracted', 'progress')
+    
+    def get(self, request, pk):
+        resume = get_object_or_404(Resume.objects.only(*self.FIELDS), pk=pk, user=request.user)
+        return Response({field: getattr(resume, field) for field in self.FIELDS}, headers={'Cache-Control': 'no-cache'})
+
+
+class UploadCreateAPIView(APIView):
+    """
+    POST /api/uploads/ - Start a chunked resume upload
+    Body: {"filename": "resume.pdf", "size": 5242880, "sha256": "<optional>"}
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        # Clients that know the file's SHA-256 can skip re-sending a resume
+        # they already uploaded
+        duplicate = uploads.find_duplicate(request.user, request.data.get('sha256', ''))
+        if duplicate is not None:
+            dispatch.refresh_duplicate(duplicate, request.data.get('location', 'India'))
+            return Response({'duplicate': True, 'resume': ResumeSerializer(duplicate).data})
+        
+        try:
+            size = int(request.data.get('size', 0))
+            upload = uploads.begin_upload(request.user, request.data.get('filename', ''), size)
+        except (TypeError, ValueError):
+            return Response({'error': 'size must be a number of bytes'}, status=status.HTTP_400_BAD_REQUEST)
+        except uploads.UploadError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = ResumeUploadSerializer(upload).data
+        data['chunk_size'] = uploads.CHUNK_SIZE
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+class UploadMixin:
+    """The current user's upload session from the URL"""
+    permission_classes = [IsAuthenticated]
+    
+    def get_object(self, pk):
+        return get_object_or_404(ResumeUpload, pk=pk, user=self.request.user)
+
+
+class UploadDetailAPIView(UploadMixin, APIView):
+    """
+    GET /api/uploads/{id}/ - Upload state; 'received' is where the next chunk starts
+    PUT /api/uploads/{id}/ - Send one chunk as the raw body,
+        with "Content-Range: bytes <start>-<end>/<size>"
+    DELETE /api/uploads/{id}/ - Abandon the upload
+    """
+    
+    def get(self, request, pk):
+        return Response(ResumeUploadSerializer(self.get_object(pk)).data)
+    
+    def put(self, request, pk):
+        upload = self.get_object(pk)
+        if upload.resume_id:
+            return Response({'error': 'Upload already completed'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            # Read the raw body stream; request.data would buffer the whole chunk
+            uploads.write_chunk(upload, request.stream, request.headers.get('Content-Range', ''))
+        except uploads.UploadError as e:
+            upload.refresh_from_db(fields=['received'])
+            return Response(
+                {'error': str(e), 'received': upload.received},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(ResumeUploadSerializer(upload).data)
+    
+    def delete(self, request, pk):
+        upload = self.get_object(pk)
+        uploads.discard_parts(upload)
+        upload.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadCompleteAPIView(UploadMixin, APIView):
+    """
+    POST /api/uploads/{id}/complete/ - Assemble the file and create the resume
+    Body: {"location": "India"}
+    """
+    
+    def post(self, request, pk):
+        upload = self.get_object(pk)
+        if upload.resume_id:
+            return Response(ResumeSerializer(upload.resume).data)
+        try:
+            name, content_hash, size = uploads.finish_upload(upload)
+        except uploads.UploadError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        resume, created = uploads.create_resume(request.user, name, content_hash)
+        location = request.data.get('location', 'India')
+        if created:
+            upload.resume = resume
+            upload.save(update_fields=['resume'])
+            dispatch.start_scraping(resume, location, interactive=True)
+            return Response(ResumeSerializer(resume).data, status=status.HTTP_201_CREATED)
+        
+        # Same content as an earlier resume: that one is reused
+        upload.delete()
+        dispatch.refresh_duplicate(resume, location)
+        return Response(ResumeSerializer(resume).data)
 
 
 # ============ Job APIs ============
 
-class JobListAPIView(generics.ListAPIView):
+def filter_jobs(user, params):
+    """User's active jobs, filtered by the platform, resume_id and location params"""
+    # Base query: only show jobs scraped for or matched to user's resumes
+    queryset = Job.objects.filter(
+        matching.jobs_of(Resume.objects.filter(user=user).values('id')),
+        is_active=True
+    ).order_by('-scraped_at')
+    
+    # Optional filters from query params
+    platform = params.get('platform', None)
+    if platform:
+        queryset = queryset.filter(platform=platform)
+    
+    resume_id = params.get('resume_id', None)
+    if resume_id:
+        queryset = queryset.filter(matching.jobs_of([resume_id]))
+    
+    location = params.get('location', None)
+    if location:
+        queryset = queryset.filter(location__icontains=location)
+    
+    return queryset
+
+
+class JobFilterMixin:
+    """User's active jobs, filtered by platform, resume_id and location params"""
+    
+    def get_queryset(self):
+        return filter_jobs(self.request.user, self.request.query_params)
+
+
+class JobListAPIView(caching.CachedListMixin, JobFilterMixin, generics.ListAPIView):
     """
     GET /api/jobs/ - List all jobs
     Supports filtering by: platform, resume_id, location
+    Sparse fieldsets: ?fields=id,title,link returns only those fields
+    Cached per user; send If-None-Match with the last ETag to get a 304
     """
-    serializer_class = JobSerializer
+    serializer_class = JobListSerializer
     permission_classes = [IsAuthenticated]
     
-    def get_queryset(self):
-        # Base query: only show jobs from user's resumes
-        queryset = Job.objects.filter(
-            resume__user=self.request.user,
-            is_active=True
-        ).order_by('-scraped_at')
-        
-        # Optional filters from query params
-        platform = self.request.query_params.get('platform', None)
-        if platform:
-            queryset = queryset.filter(platform=platform)
-        
-        resume_id = self.request.query_params.get('resume_id', None)
-        if resume_id:
-            queryset = queryset.filter(resume_id=resume_id)
+    def list(self, request, *args, **kwargs):
+        return self.cached_list(request, lambda: self.build_list(request))
+    
+    def build_list(self, request):
+        # Load only the requested columns as plain dicts - no model instances
+        fields = JobListSerializer.parse_fields(request.query_params.get('fields'))
+        rows = self.get_queryset().values(*JobListSerializer.columns_for(fields))
         
-        location = self.request.query_params.get('location', None)
-        if location:
-            queryset = queryset.filter(location__icontains=location)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(JobListSerializer(page, many=True, fields=fields).data)
+        return Response(JobListSerializer(rows, many=True, fields=fields).data)
+
+
+class ExportAPIView(ABC, APIView):
+    """
+    Base for streaming exports
+    ?output=ndjson (default), json or csv
+    
+    Rows come from a server-side cursor and are written out as they arrive,
+    so memory use stays flat however many rows there are and the first
+    bytes go out immediately. Subclasses provide get_queryset.
+    """
+    permission_classes = [IsAuthenticated]
+    filename = 'export'
+    columns = {}
+    converters = {}
+    
+    @abstractmethod
+    def get_queryset(self):
+        """The rows to export, for self.request"""
+    
+    def get_columns(self):
+        return self.columns
+    
+    def get(self, request):
+        output = request.query_params.get('output', 'ndjson')
+        if output not in exports.CONTENT_TYPES:
+            raise serializers.ValidationError({
+                'output': f"Must be one of: {', '.join(exports.CONTENT_TYPES)}"
+            })
         
-        return queryset
+        columns = self.get_columns()
+        rows = exports.iter_rows(self.get_queryset(), columns, self.converters)
+        content = exports.render(output, rows, header=list(columns))
+        if isinstance(request._request, ASGIRequest):
+            content = exports.aiterate(content)
+        response = StreamingHttpResponse(content, content_type=exports.CONTENT_TYPES[output])
+        response['Content-Disposition'] = f'attachment; filename="{self.filename}.{output}"'
+        response['X-Accel-Buffering'] = 'no'  # Let proxies pass chunks straight through
+        return response
+
+
+class JobExportAPIView(JobFilterMixin, ExportAPIView):
+    """
+    GET /api/jobs/export/ - Stream every job from the user's resumes
+    Supports the same filters and ?fields= as /api/jobs/
+    """
+    filename = 'jobs'
+    converters = JobListSerializer.CONVERTERS
+    
+    def get_columns(self):
+        fields = JobListSerializer.parse_fields(self.request.query_params.get('fields'))
+        return {name: JobListSerializer.FIELDS[name] for name in (fields or JobListSerializer.FIELDS)}
 
 
 class JobDetailAPIView(generics.RetrieveAPIView):
@@ -189,14 +425,17 @@ class JobDetailAPIView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return Job.objects.filter(resume__user=self.request.user)
+        # JobSerializer doesn't include the description
+        return Job.objects.filter(
+            matching.jobs_of(Resume.objects.filter(user=self.request.user).values('id'))
+        ).defer('description')
 
 
 # ============ Application APIs ============
 
-class ApplicationListCreateAPIView(generics.ListCreateAPIView):
+class ApplicationListCreateAPIView(caching.CachedListMixin, generics.ListCreateAPIView):
     """
-    GET /api/applications/ - List all applications
+    GET /api/applications/ - List all applications (cached per user, ETag/304)
     POST /api/applications/ - Create new application
     """
     serializer_class = JobApplicationSerializer
@@ -204,17 +443,53 @@ class ApplicationListCreateAPIView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         return JobApplication.objects.filter(
-            job__resume__user=self.request.user
+            user=self.request.user
         ).order_by('-created_at')
     
     def perform_create(self, serializer):
-        # Validate that job belongs to user's resume
+        # Same jobs as JobListAPIView: scraped for, or matched to, the user's resumes
         job = serializer.validated_data['job']
-        if job.resume.user != self.request.user:
+        visible = Job.objects.filter(
+            matching.jobs_of(Resume.objects.filter(user=self.request.user).values('id')), id=job.id
+        )
+        if not visible.exists():
             raise serializers.ValidationError(
-                "You can only apply to jobs from your own resumes"
+                "You can only apply to jobs listed for your resumes"
             )
-        serializer.save()
+        if JobApplication.objects.filter(user=self.request.user, job=job).exists():
+            raise serializers.ValidationError(
+                "You already have an application for this job"
+            )
+        serializer.save(user=self.request.user)
+        caching.bump_for_users(['applications'], [self.request.user.pk])
+
+
+class ApplicationExportAPIView(ExportAPIView):
+    """
+    GET /api/applications/export/ - Stream every application of the user
+    """
+    filename = 'applications'
+    columns = {
+        'id': 'id',
+        'job': 'job_id',
+        'job_title': 'job__title',
+        'job_company': 'job__company',
+        'status': 'status',
+        'applied_at': 'applied_at',
+        'notes': 'notes',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }
+    converters = {
+        'applied_at': serializers.DateTimeField().to_representation,
+        'created_at': serializers.DateTimeField().to_representation,
+        'updated_at': serializers.DateTimeField().to_representation,
+    }
+    
+    def get_queryset(self):
+        return JobApplication.objects.filter(
+            user=self.request.user
+        ).order_by('-created_at')
 
 
 class ApplicationUpdateAPIView(generics.UpdateAPIView):
@@ -226,4 +501,26 @@ class ApplicationUpdateAPIView(generics.UpdateAPIView):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return JobApplication.objects.filter(job__resume__user=self.request.user)
+        return JobApplication.objects.filter(user=self.request.user)
+    
+    def perform_update(self, serializer):
+        serializer.save()
+        caching.bump_for_users(['applications'], [self.request.user.pk])
+
+
+# ============ Operations APIs ============
+
+class ScraperHealthAPIView(APIView):
+    """
+    GET /api/scrapers/health/ - Circuit state, success/yield rates and latency per platform (staff only)
+    """
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        from .scraper import JobScraperService
+        
+        try:
+            report = health.PlatformHealth().status(JobScraperService().scrapers)
+        except redis.RedisError as e:
+            return Response({'detail': f'Scraper health unavailable: {e}'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response(report)
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class JobsConfig(AppConfig):
+    name = 'jobs'
+    
+    def ready(self):
+        # Connect signal handlers (counters)
+        from . import signals  # noqa: F401
@@ -0,0 +1,163 @@
+"""
+Async API Views
+The read endpoints clients poll most, written against Django's async ORM
+
+api.urls routes to these only under ASGI (SERVER_MODE=asgi in start.sh),
+where they run on the event loop, so a client polling or waiting on a slow
+connection costs no worker thread (the progress event streams are async
+there too, see jobs.progress). WSGI deployments keep the DRF views.
+
+Each answers like the DRF view it stands in for: same authentication
+(the API's DRF authenticators), JSON and ETag/304 caching. Other methods
+on the same URL (creating a resume or application) go to the DRF view.
+Throttling, content negotiation and the browsable API are not applied.
+"""
+from functools import wraps
+from typing import Awaitable, Callable
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from . import caching
+from .api_views import (
+    ApplicationListCreateAPIView, JobListAPIView, ResumeListCreateAPIView, ResumeStatusAPIView, filter_jobs
+)
+from .models import JobApplication, Resume
+from .serializers import JobApplicationSerializer, JobListSerializer, ResumeSerializer
+
+
+def error(status: int, detail, **headers) -> JsonResponse:
+    """DRF-shaped error response"""
+    return JsonResponse(detail if isinstance(detail, dict) else {'detail': str(detail)}, status=status, headers=headers)
+
+
+async def authenticate(request):
+    """
+    Set request.user from the API's authenticators (token, then session)
+    Returns None, or the 401 response DRF would send.
+    """
+    drf_request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    try:
+        user = await sync_to_async(lambda: drf_request.user)()
+    except exceptions.AuthenticationFailed as e:
+        failure = e.detail
+    else:
+        if user.is_authenticated:
+            request.user = user
+            return None
+        failure = exceptions.NotAuthenticated.default_detail
+    challenge = drf_request.authenticators[0].authenticate_header(drf_request)
+    return error(401, failure, **({'WWW-Authenticate': challenge} if challenge else {}))
+
+
+def api_read(write_view: Callable = None):
+    """
+    Decorator for an async GET handler of an authenticated API endpoint
+    Other methods go to write_view (a DRF view) when given, else get a 405.
+    """
+    def decorator(handler: Callable[..., Awaitable[HttpResponse]]):
+        @wraps(handler)
+        async def view(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                if write_view is None:
+                    return error(405, f'Method "{request.method}" not allowed.', Allow='GET, HEAD')
+                return await sync_to_async(write_view)(request, *args, **kwargs)
+
+            unauthorized = await authenticate(request)
+            if unauthorized is not None:
+                return unauthorized
+            try:
+                return await handler(request, *args, **kwargs)
+            except exceptions.APIException as e:
+                return error(e.status_code, e.detail)
+        # The DRF views are CSRF exempt; session auth enforces CSRF itself
+        view.csrf_exempt = True
+        return view
+    return decorator
+
+
+async def cached_list(request, view_class, build: Callable[[], Awaitable[list]]):
+    """
+    CachedListMixin for async views: the built list cached per user and
+    query string, with ETag/304, under the same key as view_class's
+    """
+    def lookup():
+        # One trip to a thread for the generations and the entry
+        key = view_class.list_cache_key(request)
+        if key is None or caching.etag_matches(request, caching.etag_for(key)):
+            return key, None
+        return key, caching.cache_get(key)
+
+    key, data = await sync_to_async(lookup)()
+    if key is None:
+        return JsonResponse(await build(), safe=False)
+    etag = caching.etag_for(key)
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    if caching.etag_matches(request, etag):
+        return HttpResponse(status=304, headers=headers)
+
+    if data is None:
+        data = await build()
+        await sync_to_async(caching.cache_set)(key, data)
+    return JsonResponse(data, safe=False, headers=headers)
+
+
+@api_read(write_view=ResumeListCreateAPIView.as_view())
+async def resume_list(request):
+    """
+    GET /api/resumes/ - List all resumes for logged-in user
+    POST /api/resumes/ - Upload new resume (ResumeListCreateAPIView)
+    """
+    # Not cached, like the DRF view: task_status changes without a bump
+    resumes = [resume async for resume in ResumeListCreateAPIView.resumes_for(request.user)]
+    return JsonResponse(ResumeSerializer(resumes, many=True, context={'request': request}).data, safe=False)
+
+
+@api_read()
+async def resume_status(request, pk):
+    """
+    GET /api/resumes/{id}/status/ - Task status and structured progress
+    For clients that poll instead of following /events/
+    """
+    fields = ResumeStatusAPIView.FIELDS
+    resume = await Resume.objects.filter(pk=pk, user=request.user).only(*fields).afirst()
+    if resume is None:
+        return error(404, 'Not found.')
+    return JsonResponse({field: getattr(resume, field) for field in fields}, headers={'Cache-Control': 'no-cache'})
+
+
+@api_read()
+async def job_list(request):
+    """
+    GET /api/jobs/ - List all jobs
+    Supports filtering by: platform, resume_id, location
+    Sparse fieldsets: ?fields=id,title,link returns only those fields
+    Cached per user; send If-None-Match with the last ETag to get a 304
+    """
+    fields = JobListSerializer.parse_fields(request.GET.get('fields'))
+
+    async def build():
+        # Load only the requested columns as plain dicts - no model instances
+        rows = filter_jobs(request.user, request.GET).values(*JobListSerializer.columns_for(fields))
+        return list(JobListSerializer([row async for row in rows], many=True, fields=fields).data)
+
+    return await cached_list(request, JobListAPIView, build)
+
+
+@api_read(write_view=ApplicationListCreateAPIView.as_view())
+async def application_list(request):
+    """
+    GET /api/applications/ - List all applications (cached per user, ETag/304)
+    POST /api/applications/ - Create new application (ApplicationListCreateAPIView)
+    """
+    async def build():
+        # The job is joined in: serializing job_title must not query from the event loop
+        applications = JobApplication.objects.filter(
+            user=request.user
+        ).select_related('job').order_by('-created_at')
+        return list(JobApplicationSerializer([application async for application in applications], many=True).data)
+
+    return await cached_list(request, ApplicationListCreateAPIView, build)
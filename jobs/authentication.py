@@ -0,0 +1,135 @@
+"""
+API Authentication
+Token authentication with the token -> user lookup cached
+
+DRF's TokenAuthentication runs a token JOIN user query on every request,
+which dominates clients that poll for task status. Here a lookup is served
+from a small in-process LRU first, then from the shared cache (Redis in
+production), and only then from the database.
+
+Both layers hold a few field values, not the objects: every request gets
+user and token instances of its own, so threads never share (or see each
+other's changes to) the same User. Only what authentication and the
+permission checks read is cached (USER_FIELDS, TOKEN_FIELDS); never the
+password hash or the token key. Other fields are deferred and load from
+the database when a view first reads them.
+
+Deleting a token (logout, admin) or saving its user clears both layers in
+the current process and the shared layer everywhere. Other processes may
+keep accepting a revoked token for at most LOCAL_TTL seconds. While Redis
+is unreachable the shared layer is skipped (jobs.caching.cache_get).
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+
+from .caching import cache_get, cache_set
+
+logger = logging.getLogger(__name__)
+
+LOCAL_TTL = 5          # Seconds a process trusts its own copy
+LOCAL_MAX_SIZE = 1024  # Tokens kept per process
+SHARED_TTL = 300       # Seconds an entry lives in the shared cache
+
+USER_FIELDS = ('id', 'username', 'is_active', 'is_staff', 'is_superuser')  # Cached; the rest is deferred
+TOKEN_FIELDS = ('user_id', 'created')                                     # The key comes from the request
+
+
+class _LocalCache:
+    """Thread-safe LRU whose entries expire after a fixed TTL"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_local = _LocalCache(LOCAL_MAX_SIZE, LOCAL_TTL)
+
+
+def _cache_key(token_key: str) -> str:
+    # Never put the raw token in a cache key
+    return 'authtoken-identity:' + hashlib.sha256(token_key.encode('utf-8')).hexdigest()
+
+
+def _row(instance, fields):
+    """Some of an instance's columns as (database, values), to build fresh copies from"""
+    return instance._state.db, tuple(getattr(instance, field) for field in fields)
+
+
+def _from_row(model, fields, row, **extra):
+    """An instance with the given columns (plus extra) loaded and every other one deferred"""
+    db, values = row
+    values = dict(zip(fields, values), **extra)
+    # from_db expects the loaded values in the model's field order
+    names = [field.attname for field in model._meta.concrete_fields if field.attname in values]
+    return model.from_db(db, names, [values[name] for name in names])
+
+
+def forget_token(token_key: str):
+    """Drop a token from both cache layers"""
+    key = _cache_key(token_key)
+    _local.delete(key)
+    try:
+        cache.delete(key)
+    except redis.RedisError as e:
+        # A stale entry outlives the outage by at most SHARED_TTL
+        logger.warning(f"Could not drop a token from the shared cache: {e}")
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement for TokenAuthentication
+    Clients still send "Authorization: Token <key>".
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = _cache_key(key)
+        rows = _local.get(cache_key)
+        if rows is None:
+            rows = cache_get(cache_key)
+            if rows is None:
+                # Raises AuthenticationFailed for unknown keys / inactive users
+                user, token = super().authenticate_credentials(key)
+                rows = (_row(user, USER_FIELDS), _row(token, TOKEN_FIELDS))
+                cache_set(cache_key, rows, SHARED_TTL)
+            _local.set(cache_key, rows)
+        user = _from_row(get_user_model(), USER_FIELDS, rows[0])
+        token = _from_row(self.get_model(), TOKEN_FIELDS, rows[1], key=key)
+        token.user = user
+        return user, token
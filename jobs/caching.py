@@ -0,0 +1,250 @@
+"""
+View Caching
+Generation-keyed caching for read-heavy pages and API lists
+
+Every cached value depends on one or more namespaces ('jobs', 'resumes',
+'applications', 'user:<id>', 'resume:<id>', ...). Each namespace has a
+generation counter, and the counters are part of the cache key. Writers
+bump the counter instead of hunting down keys, so stale entries are simply
+never read again and expire on their own.
+
+The shared namespaces are for the site-wide pages only. Views of one
+user's or one resume's data key on that user's or resume's namespace, so
+a scrape for one resume leaves everybody else's entries alone.
+
+The same key doubles as the ETag, so a conditional GET can be answered
+with 304 Not Modified after a few cache lookups and no database queries.
+
+The cache is an optimization only: while Redis is unreachable, lookups
+count as misses and pages are built from the database every time.
+"""
+import hashlib
+import logging
+import time
+from functools import wraps
+from typing import Callable, Iterable, Optional, Sequence
+
+import redis
+from django.core.cache import cache
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+CACHE_TIMEOUT = 300  # Seconds; entries are normally invalidated by a bump long before this
+GLOBAL_NAMESPACE = 'global'  # Part of every key; bump it to drop everything
+
+
+def user_namespace(user_id) -> str:
+    return f'user:{user_id}'
+
+
+def resume_namespace(resume_id) -> str:
+    return f'resume:{resume_id}'
+
+
+def _generation_key(namespace: str) -> str:
+    return f'cachegen:{namespace}'
+
+
+def generations(namespaces: Sequence[str]) -> list:
+    """Current generation of each namespace (one cache round trip)"""
+    keys = [_generation_key(ns) for ns in namespaces]
+    found = cache.get_many(keys)
+    return [found.get(key, 0) for key in keys]
+
+
+def bump(*namespaces: str):
+    """Invalidate everything cached under these namespaces"""
+    try:
+        for namespace in namespaces:
+            key = _generation_key(namespace)
+            try:
+                cache.incr(key)
+            except ValueError:
+                # Unknown (or evicted) counter: start from a value that can't
+                # collide with a generation used before the eviction
+                cache.set(key, time.time_ns(), timeout=None)
+    except redis.RedisError as e:
+        # Entries written before the outage expire after CACHE_TIMEOUT
+        logger.warning(f"Could not bump cache generations {namespaces}: {e}")
+
+
+def bump_for_users(namespaces: Iterable[str], user_ids: Iterable, resume_ids: Iterable = ()) -> None:
+    """
+    Bump shared namespaces plus the namespace of each affected user and resume
+    The users also read from the primary for a moment (jobs.replicas), so
+    their entries aren't rebuilt from a replica that lacks the write.
+    """
+    from . import replicas
+    user_ids = {uid for uid in user_ids if uid is not None}
+    bump(
+        *namespaces,
+        *{user_namespace(uid) for uid in user_ids},
+        *{resume_namespace(rid) for rid in resume_ids},
+    )
+    replicas.pin(user_ids)
+
+
+def bump_for_resumes(namespaces: Iterable[str], resume_ids: Iterable[int]) -> None:
+    """Same as bump_for_users, looking up the owners of the given resumes"""
+    from .models import Resume
+    resume_ids = list(resume_ids)
+    user_ids = Resume.objects.filter(id__in=resume_ids).values_list('user_id', flat=True).distinct()
+    bump_for_users(namespaces, user_ids, resume_ids)
+
+
+def view_cache_key(request, name: str, namespaces: Sequence[str], **params) -> Optional[str]:
+    """
+    Key for one view + user + parameters + namespace generations
+    None while the cache is unavailable: the view must not be cached then.
+    """
+    namespaces = (GLOBAL_NAMESPACE, *namespaces)
+    try:
+        current = generations(namespaces)
+    except redis.RedisError as e:
+        logger.warning(f"Cache unavailable, building {name} uncached: {e}")
+        return None
+    user_id = request.user.pk if request.user.is_authenticated else 0
+    parts = [
+        name,
+        str(user_id),
+        repr(sorted(params.items())),
+        repr(sorted(request.GET.lists())),
+        repr(current),
+    ]
+    digest = hashlib.md5('|'.join(parts).encode('utf-8'), usedforsecurity=False).hexdigest()
+    return f'view:{name}:{digest}'
+
+
+def etag_for(key: str) -> str:
+    return '"%s"' % key.rsplit(':', 1)[-1]
+
+
+def etag_matches(request, etag: str) -> bool:
+    header = request.META.get('HTTP_IF_NONE_MATCH', '')
+    return etag in [value.strip() for value in header.split(',')] or header.strip() == '*'
+
+
+def cache_get(key: str):
+    """cache.get() that treats an unreachable cache as a miss"""
+    try:
+        return cache.get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Cache unavailable, treating {key} as a miss: {e}")
+        return None
+
+
+def cache_set(key: str, value, timeout: int = CACHE_TIMEOUT):
+    """cache.set() that gives up quietly on an unreachable cache"""
+    try:
+        cache.set(key, value, timeout)
+    except redis.RedisError as e:
+        logger.warning(f"Cache unavailable, not storing {key}: {e}")
+
+
+def get_or_build(key: str, build: Callable, timeout: int = CACHE_TIMEOUT):
+    """Return the cached value for key, building and storing it on a miss"""
+    value = cache_get(key)
+    if value is None:
+        value = build()
+        cache_set(key, value, timeout)
+    return value
+
+
+def _has_pending_messages(request) -> bool:
+    from django.contrib.messages import get_messages
+    # len() doesn't mark the messages as read
+    return bool(len(get_messages(request)))
+
+
+def cache_by_generation(*namespaces: str, per_resume: bool = False):
+    """
+    Decorator for GET views whose data only changes when a namespace is bumped
+
+    Sets request.view_cache_key for the view to cache its expensive context
+    with get_or_build(). The template is still rendered per request, so CSRF
+    tokens and flash messages stay correct, but the database isn't touched.
+    Responses carry an ETag, and a matching If-None-Match gets a 304.
+    With per_resume, a call with a resume_id depends on that resume's
+    namespace instead of the shared ones.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or _has_pending_messages(request):
+                request.view_cache_key = None
+                return view(request, *args, **kwargs)
+
+            view_namespaces = namespaces
+            if per_resume and kwargs.get('resume_id'):
+                view_namespaces = (resume_namespace(kwargs['resume_id']),)
+            key = view_cache_key(request, view.__name__, view_namespaces, **kwargs)
+            if key is None:
+                request.view_cache_key = None
+                return view(request, *args, **kwargs)
+            etag = etag_for(key)
+            if etag_matches(request, etag):
+                response = HttpResponseNotModified()
+            else:
+                request.view_cache_key = key
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            response['ETag'] = etag
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
+
+
+def cached_context(request, build: Callable, timeout: int = CACHE_TIMEOUT):
+    """Build a view's context through the cache set up by cache_by_generation"""
+    key = getattr(request, 'view_cache_key', None)
+    if not key:
+        return build()
+    return get_or_build(key, build, timeout)
+
+
+class CachedListMixin:
+    """
+    Generation caching + ETag/304 for DRF list endpoints
+
+    The serialized list is cached per user and query string under the
+    user's namespace, which every write to that user's data bumps.
+    Views with their own list() wrap it with cached_list(). The async views
+    standing in for these share their keys (list_cache_key).
+    """
+    cache_namespaces = ()
+
+    @classmethod
+    def list_cache_key(cls, request) -> Optional[str]:
+        namespaces = (*cls.cache_namespaces, user_namespace(request.user.pk))
+        return view_cache_key(request, cls.__name__, namespaces)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_list(request, lambda: super(CachedListMixin, self).list(request, *args, **kwargs))
+
+    def cached_list(self, request, build_response: Callable):
+        key = self.list_cache_key(request)
+        if key is None:
+            return build_response()
+        etag = etag_for(key)
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+        if etag_matches(request, etag):
+            return Response(status=304, headers=headers)
+
+        cached = cache_get(key)
+        if cached is None:
+            response = build_response()
+            if response.status_code != 200:
+                return response
+            # Plain lists only: DRF's ReturnList holds on to its serializer
+            cache_set(key, list(response.data))
+            for name, value in headers.items():
+                response[name] = value
+            return response
+
+        return Response(cached, headers=headers)
@@ -0,0 +1,155 @@
+"""
+Text Compression
+zlib codec with shared preset dictionaries for large text columns
+
+Stored layout (first byte is the format):
+    0x00 <utf-8 text>                    short values, stored as-is
+    0x01 <version> <raw deflate stream>  compressed with dictionary <version>
+
+Dictionaries are never changed once data was written with them; training
+produces a new version and old versions stay loadable.
+"""
+import re
+import zlib
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+FORMAT_RAW = 0
+FORMAT_DICT = 1
+
+COMPRESSION_THRESHOLD = 256     # Bytes; shorter values aren't worth compressing
+COMPRESSION_LEVEL = 6
+MAX_DICTIONARY_SIZE = 32 * 1024  # zlib only looks back 32 KB
+
+# Built-in dictionary: boilerplate that shows up in most job postings.
+# zlib favours matches near the end of the dictionary, so the most common
+# phrases are last.
+BUILTIN_DICTIONARY_VERSION = 1
+BUILTIN_DICTIONARY = (
+    "equal opportunity employer without regard to race, color, religion, sex, sexual orientation, "
+    "gender identity, national origin, disability, or veteran status. "
+    "competitive salary and benefits, health insurance, paid time off, flexible working hours, "
+    "work from home, remote-first team, learning and development budget, stock options. "
+    "Nice to have: experience with docker, kubernetes, aws, azure, google cloud, ci/cd pipelines, "
+    "graphql, rest apis, microservices, postgresql, mysql, mongodb, redis, celery. "
+    "Tech stack: python, django, flask, java, spring boot, javascript, typescript, react, angular, "
+    "vue, node.js, html, css, sql, git, linux. "
+    "Who you are: strong communication skills, problem solving skills, attention to detail, "
+    "ability to work independently and in a team, fast learner, passion for technology. "
+    "Requirements: bachelor's degree in computer science or a related field, "
+    "years of experience in software development, "
+    "experience with, knowledge of, familiarity with, understanding of, proficiency in. "
+    "Responsibilities: design, develop, test and maintain, collaborate with cross-functional teams, "
+    "write clean, maintainable and efficient code, participate in code reviews, "
+    "work closely with product managers and designers, build and ship features. "
+    "About the role: we are looking for a talented and motivated intern to join our team. "
+    "About the company: we are a fast-growing startup. "
+    "Stipend, duration, start date, apply by, who can apply, perks, certificate, letter of recommendation, "
+    "number of openings, skills required, internship, full time, part time, job description, "
+    "We are looking for a software engineer / developer to join our team. "
+)
+
+
+class CompressedValue(bytes):
+    """Raw stored bytes that have not been decompressed yet"""
+
+
+def dictionary_dir() -> Path:
+    from django.conf import settings
+    return Path(getattr(settings, 'COMPRESSION_DICTIONARY_DIR', Path(__file__).resolve().parent / 'zdicts'))
+
+
+@lru_cache(maxsize=None)
+def available_dictionaries() -> Dict[int, bytes]:
+    """All dictionary versions: the built-in one plus trained vN.zdict files"""
+    dictionaries = {BUILTIN_DICTIONARY_VERSION: BUILTIN_DICTIONARY.encode('utf-8')}
+    directory = dictionary_dir()
+    if directory.is_dir():
+        for path in directory.glob('v*.zdict'):
+            match = re.fullmatch(r'v(\d+)\.zdict', path.name)
+            if match:
+                dictionaries[int(match.group(1))] = path.read_bytes()
+    return dictionaries
+
+
+def current_dictionary() -> Tuple[int, bytes]:
+    """Newest dictionary, used for all new writes"""
+    dictionaries = available_dictionaries()
+    version = max(dictionaries)
+    return version, dictionaries[version]
+
+
+def compress_text(text: str, threshold: int = COMPRESSION_THRESHOLD) -> bytes:
+    """Encode text for storage, compressing it when that actually saves space"""
+    raw = text.encode('utf-8')
+    if len(raw) < threshold:
+        return bytes([FORMAT_RAW]) + raw
+
+    version, zdict = current_dictionary()
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=zdict)
+    payload = compressor.compress(raw) + compressor.flush()
+    if len(payload) + 2 >= len(raw) + 1:
+        return bytes([FORMAT_RAW]) + raw
+    return bytes([FORMAT_DICT, version]) + payload
+
+
+def decompress_text(value) -> Optional[str]:
+    """Decode a stored value; str and None pass through unchanged"""
+    if value is None or isinstance(value, str):
+        return value
+    data = bytes(value)
+    if not data:
+        return ''
+
+    fmt = data[0]
+    if fmt == FORMAT_RAW:
+        return data[1:].decode('utf-8')
+    if fmt == FORMAT_DICT:
+        zdict = available_dictionaries().get(data[1])
+        if zdict is None:
+            raise ValueError(f"Compression dictionary v{data[1]} is missing")
+        decompressor = zlib.decompressobj(-zlib.MAX_WBITS, zdict=zdict)
+        return (decompressor.decompress(data[2:]) + decompressor.flush()).decode('utf-8')
+    raise ValueError(f"Unknown compressed text format {fmt}")
+
+
+def train_dictionary(samples: Iterable[str], size: int = MAX_DICTIONARY_SIZE,
+                     max_ngram: int = 6, min_documents: int = 3) -> bytes:
+    """
+    Build a preset dictionary from sample texts
+
+    Word n-grams that appear in many different samples are scored by
+    (documents containing it) x (length), and the best ones are packed
+    with the most valuable closest to the end.
+    """
+    document_counts = Counter()
+    for text in samples:
+        words = re.findall(r'\S+', text)
+        seen = set()
+        for n in range(1, max_ngram + 1):
+            for i in range(len(words) - n + 1):
+                seen.add(' '.join(words[i:i + n]))
+        document_counts.update(seen)
+
+    candidates = [
+        (count * len(phrase), phrase)
+        for phrase, count in document_counts.items()
+        if count >= min_documents and len(phrase) >= 4
+    ]
+    candidates.sort(reverse=True)
+
+    chosen = []
+    total = 0
+    for _, phrase in candidates:
+        # Skip phrases already covered by a longer chosen phrase
+        if any(phrase in longer for longer in chosen):
+            continue
+        encoded = len(phrase.encode('utf-8')) + 1
+        if total + encoded > size:
+            break
+        chosen.append(phrase)
+        total += encoded
+
+    return ' '.join(reversed(chosen)).encode('utf-8')[:size]
@@ -0,0 +1,199 @@
+"""
+Denormalized Counters
+Per-user and global tallies of jobs, resumes and applications
+
+Hot pages read these instead of running COUNT(*) over whole tables.
+They are kept current in three ways:
+- the bulk insert path (the scrape task) applies deltas explicitly, since
+  bulk_create sends no signals
+- signals in jobs.signals cover single-row saves and every delete: jobs,
+  resumes and applications all have cascading relations, so Django never
+  fast-deletes them and sends the delete signals per row, for
+  QuerySet.delete() and cascades too. Big deletes run inside batched(),
+  so the counters are written once rather than per row
+- reconcile_counters recounts everything periodically, so drift from
+  writes that bypass both (raw SQL, QuerySet.update) is temporary
+"""
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+GLOBAL = 'global'
+
+JOBS = 'jobs'
+RESUMES = 'resumes'
+APPLICATIONS = 'applications'
+
+
+class _Batch:
+    def __init__(self):
+        self.deltas = Counter()
+        self.owners = {}  # resume id -> user id, looked up once per batch
+
+
+# Batch of the batched() block being run; None outside one
+_batch: ContextVar[Optional[_Batch]] = ContextVar('counter_batch', default=None)
+
+
+def user_scope(user_id) -> str:
+    return f'user:{user_id}'
+
+
+def scopes_for(user_id) -> Tuple[str, ...]:
+    """Every counter is kept globally and, if there is an owner, per user"""
+    if user_id is None:
+        return (GLOBAL,)
+    return (GLOBAL, user_scope(user_id))
+
+
+def job_deltas(rows: Iterable[Tuple[Optional[int], str]], step: int = 1) -> Counter:
+    """Deltas for jobs given (user_id, platform) pairs"""
+    deltas = Counter()
+    for user_id, platform in rows:
+        for scope in scopes_for(user_id):
+            deltas[(scope, JOBS)] += step
+            deltas[(scope, f'{JOBS}:{platform}')] += step
+    return deltas
+
+
+def application_deltas(rows: Iterable[Tuple[Optional[int], str]], step: int = 1) -> Counter:
+    """Deltas for applications given (user_id, status) pairs"""
+    deltas = Counter()
+    for user_id, status in rows:
+        for scope in scopes_for(user_id):
+            deltas[(scope, APPLICATIONS)] += step
+            deltas[(scope, f'{APPLICATIONS}:{status}')] += step
+    return deltas
+
+
+def resume_deltas(user_ids: Iterable[Optional[int]], step: int = 1) -> Counter:
+    """Deltas for resumes given their owners' ids"""
+    deltas = Counter()
+    for user_id in user_ids:
+        for scope in scopes_for(user_id):
+            deltas[(scope, RESUMES)] += step
+    return deltas
+
+
+@contextmanager
+def batched():
+    """Sum the deltas applied inside the block and store them once it succeeds"""
+    batch = _Batch()
+    token = _batch.set(batch)
+    try:
+        yield
+    finally:
+        _batch.reset(token)
+    apply(batch.deltas)
+
+
+def resume_owner(resume_id) -> Optional[int]:
+    """The user id of a resume, remembered for the rest of a batched() block"""
+    from .models import Resume
+
+    batch = _batch.get()
+    if batch is not None and resume_id in batch.owners:
+        return batch.owners[resume_id]
+    user_id = Resume.objects.filter(id=resume_id).values_list('user_id', flat=True).first()
+    if batch is not None:
+        batch.owners[resume_id] = user_id
+    return user_id
+
+
+def apply(deltas: Counter):
+    """Add deltas to the stored counters (one UPDATE per counter touched)"""
+    from .models import StatCounter
+
+    batch = _batch.get()
+    if batch is not None:
+        batch.deltas.update(deltas)
+        return
+
+    now = timezone.now()
+    for (scope, name), delta in deltas.items():
+        if not delta:
+            continue
+        updated = StatCounter.objects.filter(scope=scope, name=name).update(
+            value=F('value') + delta, updated_at=now
+        )
+        if updated:
+            continue
+        try:
+            with transaction.atomic():
+                StatCounter.objects.create(scope=scope, name=name, value=delta)
+        except IntegrityError:
+            # Another process created it first
+            StatCounter.objects.filter(scope=scope, name=name).update(
+                value=F('value') + delta, updated_at=now
+            )
+
+
+def read(scope: str, names: Iterable[str]) -> Dict[str, int]:
+    """Current values for a scope in one query; missing counters read as 0"""
+    from .models import StatCounter
+
+    names = list(names)
+    values = dict(
+        StatCounter.objects.filter(scope=scope, name__in=names).values_list('name', 'value')
+    )
+    return {name: values.get(name, 0) for name in names}
+
+
+def exact_counts() -> Counter:
+    """Recount everything from the source tables (GROUP BY queries)"""
+    from .models import Resume, Job, JobApplication
+
+    counts = Counter()
+    job_rows = Job.objects.order_by().values_list('resume__user_id', 'platform').annotate(n=Count('id'))
+    for user_id, platform, n in job_rows:
+        counts.update(job_deltas([(user_id, platform)], step=n))
+
+    resume_rows = Resume.objects.order_by().values_list('user_id').annotate(n=Count('id'))
+    for user_id, n in resume_rows:
+        counts.update(resume_deltas([user_id], step=n))
+
+    application_rows = (
+        JobApplication.objects.order_by()
+        .values_list('user_id', 'status')
+        .annotate(n=Count('id'))
+    )
+    for user_id, status, n in application_rows:
+        counts.update(application_deltas([(user_id, status)], step=n))
+    return counts
+
+
+def reconcile() -> int:
+    """
+    Overwrite every counter with an exact recount
+    Returns the number of counters that had drifted.
+    """
+    from .models import StatCounter
+
+    expected = exact_counts()
+    stored = {
+        (scope, name): value
+        for scope, name, value in StatCounter.objects.values_list('scope', 'name', 'value')
+    }
+    # Counters whose rows have all gone must drop back to zero
+    for key in stored:
+        expected.setdefault(key, 0)
+
+    now = timezone.now()
+    changed = [
+        StatCounter(scope=scope, name=name, value=value, updated_at=now)
+        for (scope, name), value in expected.items()
+        if stored.get((scope, name)) != value
+    ]
+    StatCounter.objects.bulk_create(
+        changed,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['scope', 'name'],
+        update_fields=['value', 'updated_at'],
+    )
+    return len(changed)
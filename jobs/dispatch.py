@@ -0,0 +1,161 @@
+"""
+Scrape Dispatch
+Starting scrape tasks for resumes from the web views and the API
+
+Dispatch is idempotent per (resume, location): the first request takes a
+Redis lock holding its task id, and any request made while that task is
+in flight attaches to it instead of queueing another scrape. The task
+releases the lock when it finishes (ScrapeTask.after_return).
+"""
+import logging
+from datetime import timedelta
+
+import redis
+from celery.utils import uuid
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from .caching import bump_for_users
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+RESCRAPE_AFTER = timedelta(hours=6)  # Results younger than this are reused as they are
+
+# Delete the lock only if it still belongs to the given task
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Someone is waiting on a first scrape; rescrapes can wait (see CELERY_TASK_ROUTES)
+INTERACTIVE = {'queue': 'interactive', 'priority': 0}
+BATCH = {'queue': 'batch', 'priority': 6}
+
+
+def lock_key(resume_id, location: str) -> str:
+    return f'scrape-lock:{resume_id}:{location.strip().lower()}'
+
+
+def lock_ttl() -> int:
+    """
+    Seconds a scrape lock lives: longer than the whole run, so no second
+    scrape starts beside it, but it still frees the slot if a worker dies
+    With acks_late, a message a dead worker held comes back after the
+    broker's visibility timeout, and then each attempt may run for
+    SCRAPE_TIME_LIMIT, with up to RETRY_BACKOFF_MAX between attempts.
+    """
+    from .tasks import RETRY_BACKOFF_MAX
+    retries = settings.SCRAPE_MAX_RETRIES
+    return (
+        settings.CELERY_BROKER_TRANSPORT_OPTIONS['visibility_timeout']
+        + (retries + 1) * settings.SCRAPE_TIME_LIMIT
+        + retries * RETRY_BACKOFF_MAX
+    )
+
+
+def claim(resume_id, location: str, task_id: str) -> str:
+    """
+    Try to make task_id the in-flight scrape for (resume, location)
+    Returns the id of the task that holds the slot: task_id if the claim
+    succeeded, otherwise the one already running.
+    """
+    key = lock_key(resume_id, location)
+    client = get_redis()
+    for _ in range(3):
+        if client.set(key, task_id, nx=True, ex=lock_ttl()):
+            return task_id
+        holder = client.get(key)
+        if holder:
+            return holder
+        # Expired between SET and GET; try again
+    return task_id
+
+
+def release(resume_id, location: str, task_id: str):
+    try:
+        get_redis().eval(_RELEASE_SCRIPT, 1, lock_key(resume_id, location), task_id)
+    except redis.RedisError as e:
+        # The lock expires on its own after lock_ttl()
+        logger.warning(f"Could not release scrape lock for resume {resume_id}: {e}")
+
+
+def in_flight(resume_id, location: str) -> bool:
+    """Whether a scrape for (resume, location) holds the lock; assumed so if Redis can't tell"""
+    try:
+        return bool(get_redis().exists(lock_key(resume_id, location)))
+    except redis.RedisError as e:
+        logger.warning(f"Scrape lock unavailable, assuming resume {resume_id} is in flight: {e}")
+        return True
+
+
+def start_scraping(resume, location: str = 'India', jobs_per_site: int = 2, interactive: bool = False):
+    """
+    Queue a scrape for the resume and store the task ID for status tracking
+    interactive puts it on the queue reserved for freshly uploaded resumes.
+    If a scrape for the same resume and location is in flight, no task is
+    queued and that task's result is returned instead.
+    """
+    from .models import Resume
+    from .tasks import scrape_jobs_for_resume
+
+    task_id = uuid()
+    try:
+        holder = claim(resume.id, location, task_id)
+    except redis.RedisError as e:
+        logger.warning(f"Scrape lock unavailable, dispatching without it: {e}")
+        holder = task_id
+
+    if holder != task_id:
+        logger.info(f"Resume {resume.id} already has scrape {holder} in flight for {location}")
+        if resume.task_id != holder:
+            resume.task_id = holder
+            resume.save(update_fields=['task_id'])
+        return scrape_jobs_for_resume.AsyncResult(holder)
+
+    # Saved before the task is sent: a fast (or eager) worker moves the
+    # status on, and that must not be overwritten with 'pending' afterwards
+    previous = resume.task_id, resume.task_status
+    resume.task_id = task_id
+    resume.task_status = 'pending'
+    resume.save(update_fields=['task_id', 'task_status'])
+    try:
+        task = scrape_jobs_for_resume.apply_async(
+            kwargs={'resume_id': resume.id, 'location': location, 'jobs_per_site': jobs_per_site},
+            task_id=task_id,
+            **(INTERACTIVE if interactive else BATCH)
+        )
+    except Exception:
+        # Nothing was queued: put back the previous run, unless that changed too
+        Resume.objects.filter(id=resume.id, task_id=task_id).update(
+            task_id=previous[0], task_status=previous[1]
+        )
+        resume.task_id, resume.task_status = previous
+        release(resume.id, location, task_id)
+        raise
+    bump_for_users(['resumes'], [resume.user_id], [resume.id])
+    return task
+
+
+def refresh_duplicate(resume, location: str = 'India') -> bool:
+    """
+    Called when a resume is uploaded again: rescrape only if its results are
+    stale or its last run failed. Jobs it already has are skipped by
+    save_jobs, so the rescrape only adds new postings.
+    Returns whether a task was started.
+    """
+    if resume.task_status in ('pending', 'processing'):
+        if in_flight(resume.id, location):
+            return False
+        # Every run holds the lock until it finishes: this one died (or its
+        # message was lost) without recording an outcome
+        logger.warning(f"Resume {resume.id} is {resume.task_status} without a scrape in flight; starting over")
+    elif resume.task_status == 'completed':
+        last_scraped = resume.jobs.aggregate(last=Max('scraped_at'))['last'] or resume.uploaded_at
+        if timezone.now() - last_scraped < RESCRAPE_AFTER:
+            return False
+    start_scraping(resume, location)
+    return True
@@ -0,0 +1,163 @@
+"""
+Job Description Enrichment
+Fetches posting detail pages and stores a cleaned description on each Job
+"""
+import re
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENCY = 8        # Detail pages fetched at once across all hosts
+PER_HOST_LIMIT = 2         # Detail pages fetched at once from a single host
+REQUEST_TIMEOUT = 10
+MAX_DESCRIPTION_CHARS = 20000
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+# CSS selectors for the description block on each platform's detail page
+DESCRIPTION_SELECTORS = {
+    'linkedin': ['div.show-more-less-html__markup', 'div.description__text'],
+    'internshala': ['div.internship_details', 'div.text-container'],
+    'weworkremotely': ['div.lis-container__job__content__description', 'div.listing-container'],
+    'remoteok': ['div.description', 'td.description'],
+    'naukri': ['section.job-desc', 'div.dang-inner-html'],
+}
+
+# Links the scrapers fall back to when no posting was found. These are search
+# result pages, so there is no description to fetch.
+SEARCH_PAGE_PATTERNS = {
+    'linkedin': re.compile(r'/jobs/search'),
+    'internshala': re.compile(r'/internships/[^/]+-internship/?$'),
+    'weworkremotely': re.compile(r'/remote-jobs/search'),
+    'remoteok': re.compile(r'remoteok\.com/remote-[^/]+-jobs/?$'),
+    'naukri': re.compile(r'naukri\.com/[^/]+-jobs/?$'),
+}
+
+
+def is_search_page(platform: str, link: str) -> bool:
+    """True if the link is a fallback search page rather than a posting"""
+    pattern = SEARCH_PAGE_PATTERNS.get(platform)
+    return bool(pattern and pattern.search(link))
+
+
+def clean_text(text: str) -> str:
+    """Collapse whitespace and cap the length of an extracted description"""
+    lines = [re.sub(r'[ \t\xa0]+', ' ', line).strip() for line in text.splitlines()]
+    text = re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip()
+    return text[:MAX_DESCRIPTION_CHARS]
+
+
+def extract_description(platform: str, html: bytes) -> str:
+    """Pull the description out of a detail page, or '' if none was found"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(['script', 'style', 'noscript']):
+        tag.decompose()
+
+    for selector in DESCRIPTION_SELECTORS.get(platform, []):
+        block = soup.select_one(selector)
+        if block:
+            return clean_text(block.get_text('\n'))
+
+    # Generic fallbacks: structured meta description, then the main content
+    meta = soup.find('meta', attrs={'property': 'og:description'}) or soup.find('meta', attrs={'name': 'description'})
+    if meta and meta.get('content'):
+        return clean_text(meta['content'])
+
+    main = soup.find('main') or soup.find('article')
+    if main:
+        return clean_text(main.get_text('\n'))
+    return ''
+
+
+class DescriptionFetcher:
+    """
+    Fetch detail pages with bounded concurrency
+
+    At most MAX_CONCURRENCY requests run at once overall, and at most
+    PER_HOST_LIMIT against any single host, so one platform can't be
+    hammered while the others sit idle.
+    """
+
+    def __init__(self, max_workers: int = MAX_CONCURRENCY, per_host_limit: int = PER_HOST_LIMIT):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=len(DESCRIPTION_SELECTORS), pool_maxsize=per_host_limit)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._host_slots = defaultdict(lambda: threading.BoundedSemaphore(self.per_host_limit))
+        self._lock = threading.Lock()
+
+    def _slot(self, link: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            return self._host_slots[urlparse(link).netloc]
+
+    def fetch(self, platform: str, link: str) -> Optional[str]:
+        """Return the description for one link, '' if none, None on a fetch error"""
+        try:
+            with self._slot(link):
+                response = self.session.get(link, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            return extract_description(platform, response.content)
+        except Exception as e:
+            logger.warning(f"Error enriching {link}: {e}")
+            return None
+
+    def fetch_all(self, links: Dict[str, str]) -> Dict[str, Optional[str]]:
+        """Fetch {link: platform} concurrently, returning {link: description}"""
+        if not links:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(links))) as pool:
+            results = pool.map(lambda item: self.fetch(item[1], item[0]), links.items())
+            return dict(zip(links.keys(), results))
+
+
+def enrich_jobs(job_ids: Iterable[int] = None, limit: int = 200, fetcher: DescriptionFetcher = None) -> int:
+    """
+    Fill in Job.description for jobs that have not been enriched yet
+
+    Every link is fetched once, even if it is shared by several Job rows.
+    Jobs whose page has no usable description get an empty string so they
+    are not fetched again; fetch errors leave the job for a later run.
+    Returns the number of distinct links enriched.
+    """
+    from .models import Job
+
+    pending = Job.objects.filter(description__isnull=True)
+    if job_ids is not None:
+        pending = pending.filter(id__in=list(job_ids))
+
+    links = {}
+    search_pages = set()
+    for link, platform in pending.order_by().values_list('link', 'platform').distinct()[:limit]:
+        if is_search_page(platform, link):
+            search_pages.add(link)
+        else:
+            links[link] = platform
+
+    if search_pages:
+        Job.objects.filter(link__in=search_pages, description__isnull=True).update(description='')
+
+    fetcher = fetcher or DescriptionFetcher()
+    enriched = 0
+    for link, description in fetcher.fetch_all(links).items():
+        if description is None:
+            continue
+        Job.objects.filter(link=link, description__isnull=True).update(description=description)
+        enriched += 1
+
+    logger.info(f"Enriched {enriched} of {len(links)} job links ({len(search_pages)} search pages skipped)")
+    return enriched
@@ -0,0 +1,74 @@
+"""
+Custom Model Fields
+"""
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+from .compression import CompressedValue, compress_text, decompress_text
+
+
+class CompressedTextDescriptor(DeferredAttribute):
+    """
+    Decompress on first attribute access instead of when the row is loaded
+
+    Rows that are loaded but whose text is never read (list pages, counts,
+    re-saves) never pay for decompression.
+    """
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, cls)
+        if isinstance(value, CompressedValue):
+            value = decompress_text(value)
+            instance.__dict__[self.field.attname] = value
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+
+class CompressedTextField(models.TextField):
+    """
+    TextField stored as compressed bytes (see jobs.compression)
+
+    Behaves like a TextField in Python, forms and the API, but the column is
+    binary, so text lookups such as icontains can't be used on it.
+    """
+    descriptor_class = CompressedTextDescriptor
+
+    def get_internal_type(self):
+        return 'BinaryField'
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return CompressedValue(value)
+
+    def to_python(self, value):
+        if isinstance(value, (bytes, memoryview)):
+            return decompress_text(value)
+        return super().to_python(value)
+
+    def pre_save(self, model_instance, add):
+        # Read the raw value so saving an instance doesn't decompress it
+        if self.attname in model_instance.__dict__:
+            return model_instance.__dict__[self.attname]
+        return super().pre_save(model_instance, add)
+
+    def get_prep_value(self, value):
+        if value is None:
+            return None
+        if isinstance(value, CompressedValue):
+            return bytes(value)
+        return compress_text(str(value))
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if not prepared:
+            value = self.get_prep_value(value)
+        if value is not None:
+            return connection.Database.Binary(value)
+        return value
+
+    def value_to_string(self, obj):
+        return decompress_text(self.value_from_object(obj))
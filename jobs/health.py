@@ -0,0 +1,155 @@
+"""
+Scraper Health
+Per-platform outcome history and a circuit breaker, shared by every worker
+through Redis
+
+Each platform scrape ends as one of:
+- ok          jobs were parsed from the page
+- no_results  the page was fetched but nothing was parsed (placeholder jobs;
+              often changed markup)
+- error       the fetch or parse failed (placeholder jobs; blocked, down,
+              timed out)
+
+FAILURE_THRESHOLD errors in a row open the platform's circuit: it is
+skipped, costing no request or timeout, for COOLDOWN seconds. After that
+one worker at a time gets a trial scrape; a fetched page closes the circuit
+and another error reopens it. no_results doesn't count towards the streak:
+the platform answered, and a query with nothing to parse is common (it
+shows in the yield rate instead).
+
+When Redis is unreachable every platform is scraped (the breaker fails
+open) and nothing is recorded.
+
+    python manage.py scraper_health            # status table
+    GET /api/scrapers/health/                  # same, for staff
+"""
+import logging
+import statistics
+import time
+from typing import Dict, Iterable, Optional
+
+import redis
+
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+OUTCOMES = ('ok', 'no_results', 'error')
+WINDOW = 50               # Recent scrapes kept per platform for the rates
+FAILURE_THRESHOLD = 5     # Errors in a row that open the circuit
+COOLDOWN = 15 * 60        # Seconds a platform is skipped once its circuit opens
+TRIAL_TTL = 120           # Seconds one worker has to finish a trial scrape
+ERROR_SHOWN = 300         # Characters of the last error kept
+
+
+def _key(platform: str, part: str = '') -> str:
+    return f'scraper-health:{platform}{part}'
+
+
+class PlatformHealth:
+    """Records scrape outcomes and decides whether a platform may be scraped"""
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        self._client = client
+
+    @property
+    def client(self) -> redis.Redis:
+        return self._client or get_redis()
+
+    def allow(self, platform: str) -> bool:
+        """Whether to scrape the platform now"""
+        try:
+            if self.client.exists(_key(platform, ':open')):
+                return False
+            failures = int(self.client.hget(_key(platform), 'consecutive_failures') or 0)
+            if failures < FAILURE_THRESHOLD:
+                return True
+            # Cooldown over: let one worker try
+            return bool(self.client.set(_key(platform, ':trial'), 1, nx=True, ex=TRIAL_TTL))
+        except redis.RedisError as e:
+            logger.warning(f"Scraper health unavailable, scraping {platform}: {e}")
+            return True
+
+    def record(self, platform: str, outcome: str, seconds: float, error: Optional[str] = None):
+        """Store the outcome of a scrape; opens the circuit after too many errors in a row"""
+        now = int(time.time())
+        key = _key(platform)
+        try:
+            pipe = self.client.pipeline()
+            pipe.lpush(_key(platform, ':recent'), f'{now} {outcome} {round(seconds * 1000)}')
+            pipe.ltrim(_key(platform, ':recent'), 0, WINDOW - 1)
+            pipe.hincrby(key, outcome)
+            if outcome == 'error':
+                pipe.hincrby(key, 'consecutive_failures')
+                pipe.hset(key, mapping={'last_failure_at': now, 'last_error': (error or outcome)[:ERROR_SHOWN]})
+            else:
+                # The page was fetched, whether or not it had jobs: the platform is up
+                pipe.hset(key, mapping={'consecutive_failures': 0,
+                                        **({'last_ok_at': now} if outcome == 'ok' else {})})
+            pipe.delete(_key(platform, ':trial'))
+            results = pipe.execute()
+            if outcome == 'error' and results[3] >= FAILURE_THRESHOLD:
+                self.trip(platform)
+        except redis.RedisError as e:
+            logger.warning(f"Could not record scraper health for {platform}: {e}")
+
+    def skipped(self, platform: str):
+        try:
+            self.client.hincrby(_key(platform), 'skipped')
+        except redis.RedisError:
+            pass
+
+    def trip(self, platform: str, cooldown: int = COOLDOWN):
+        """Open the circuit: skip the platform for cooldown seconds"""
+        self.client.set(_key(platform, ':open'), int(time.time()), ex=cooldown)
+        logger.warning(f"Circuit opened for {platform}: skipping it for {cooldown}s")
+
+    def reset(self, platform: str):
+        """Close the circuit and forget the failure streak (history is kept)"""
+        pipe = self.client.pipeline()
+        pipe.delete(_key(platform, ':open'), _key(platform, ':trial'))
+        pipe.hset(_key(platform), 'consecutive_failures', 0)
+        pipe.execute()
+
+    def status(self, platforms: Iterable[str]) -> Dict[str, dict]:
+        """Operator view: circuit state, recent rates and latency per platform"""
+        platforms = list(platforms)
+        pipe = self.client.pipeline()
+        for platform in platforms:
+            pipe.hgetall(_key(platform))
+            pipe.lrange(_key(platform, ':recent'), 0, -1)
+            pipe.ttl(_key(platform, ':open'))
+        results = pipe.execute()
+
+        report = {}
+        for index, platform in enumerate(platforms):
+            totals, recent, reopens_in = results[index * 3:index * 3 + 3]
+            failures = int(totals.get('consecutive_failures', 0))
+            outcomes = [entry.split() for entry in recent]
+            counts = {outcome: sum(1 for _, seen, _ in outcomes if seen == outcome) for outcome in OUTCOMES}
+            fetched = counts['ok'] + counts['no_results']
+            latencies = sorted(int(ms) for _, _, ms in outcomes)
+            if reopens_in > 0:
+                state = 'open'
+            elif failures >= FAILURE_THRESHOLD:
+                state = 'half-open'
+            else:
+                state = 'closed'
+            report[platform] = {
+                'state': state,
+                'reopens_in': max(reopens_in, 0),
+                'consecutive_failures': failures,
+                'recent': len(outcomes),
+                'success_rate': round(counts['ok'] / len(outcomes), 3) if outcomes else None,
+                'yield_rate': round(counts['ok'] / fetched, 3) if fetched else None,
+                'error_rate': round(counts['error'] / len(outcomes), 3) if outcomes else None,
+                'latency_ms': {
+                    'median': statistics.median_low(latencies),
+                    'p95': latencies[min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))],
+                } if latencies else None,
+                'totals': {name: int(totals.get(name, 0)) for name in (*OUTCOMES, 'skipped')},
+                'last_ok_at': int(totals['last_ok_at']) if 'last_ok_at' in totals else None,
+                'last_failure_at': int(totals['last_failure_at']) if 'last_failure_at' in totals else None,
+                'last_error': totals.get('last_error'),
+            }
+        return report
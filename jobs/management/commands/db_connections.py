@@ -0,0 +1,110 @@
+"""
+Check the processes in the Procfile against the database's connection limit
+
+Each process holds at most one connection per thread or child: the web
+process WEB_CONCURRENCY gunicorn workers x GUNICORN_THREADS, each Celery
+worker its --concurrency (the Procfile reads both from the environment).
+With Postgres the total is compared with max_connections, and the current
+connections (pg_stat_activity) are listed.
+
+    python manage.py db_connections
+    python manage.py db_connections --instances 3    # three containers of each process
+
+Exits with an error when the budget doesn't fit, so it can gate a deploy.
+"""
+import os
+import re
+import shlex
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+PROCFILE = settings.BASE_DIR / 'Procfile'
+DEFAULT_VAR = re.compile(r'\$\{(\w+):-([^}]*)\}')  # ${NAME:-default}
+
+
+def expand(command: str) -> str:
+    """The command with ${NAME:-default} and $NAME filled in from the environment"""
+    command = DEFAULT_VAR.sub(lambda match: os.environ.get(match.group(1)) or match.group(2), command)
+    return os.path.expandvars(command)
+
+
+def process_connections(command: str):
+    """Connections a Procfile process may hold, or None if it has no bound"""
+    args = shlex.split(expand(command))
+    if 'celery' in args and 'worker' in args:
+        for index, arg in enumerate(args):
+            if arg.startswith('--concurrency='):
+                return int(arg.split('=', 1)[1])
+            if arg in ('--concurrency', '-c'):
+                return int(args[index + 1])
+        return os.cpu_count()  # Celery's default
+    if 'celery' in args:
+        return 1  # beat
+    if settings.SERVER_MODE == 'asgi':
+        return None  # A thread, and a connection, per request in flight
+    return int(os.environ.get('WEB_CONCURRENCY', 1)) * int(os.environ.get('GUNICORN_THREADS', 1))
+
+
+class Command(BaseCommand):
+    help = 'Compare the connections the Procfile processes may open with what the database allows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--instances', type=int, default=1,
+                            help='Containers/dynos running each process (default: %(default)s)')
+        parser.add_argument('--limit', type=int,
+                            help='Connections available to the app (default: max_connections minus reserved)')
+
+    def handle(self, *args, **options):
+        budget, unbounded = {}, []
+        for line in PROCFILE.read_text().splitlines():
+            name, _, command = line.partition(':')
+            if line.startswith('#') or not command.strip():
+                continue
+            count = process_connections(command)
+            if count is None:
+                unbounded.append(name.strip())
+            else:
+                budget[name.strip()] = count * options['instances']
+
+        self.stdout.write(f"{'process':<14}{'connections':>12}")
+        for name, count in budget.items():
+            self.stdout.write(f'{name:<14}{count:>12}')
+        for name in unbounded:
+            self.stdout.write(f"{name:<14}{'per request':>12}")
+        total = sum(budget.values())
+        self.stdout.write(f"{'total':<14}{total:>12}")
+
+        pooled = os.environ.get('DB_POOLER') == 'pgbouncer'
+        limit = options['limit']
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT state, count(*) FROM pg_stat_activity "
+                               "WHERE datname = current_database() GROUP BY state ORDER BY 2 DESC")
+                current = cursor.fetchall()
+                cursor.execute("SELECT current_setting('max_connections')::int "
+                               "- current_setting('superuser_reserved_connections')::int")
+                available = cursor.fetchone()[0]
+            self.stdout.write('Connected now: ' + ', '.join(f'{count} {state or "background"}' for state, count in current))
+            if limit is None and not pooled:
+                limit = available
+            self.stdout.write(f'Server allows {available} (max_connections minus reserved)')
+        elif limit is None:
+            self.stdout.write(f'{connection.vendor}: no connection limit')
+            return
+
+        if pooled and options['limit'] is None:
+            # Clients count against PgBouncer's max_client_conn; the server only
+            # sees its default_pool_size connections
+            self.stdout.write('Behind PgBouncer: compare the total with max_client_conn (or pass --limit)')
+            return
+        if unbounded:
+            self.stdout.write(self.style.WARNING(
+                f"{', '.join(unbounded)}: connections grow with concurrent requests under ASGI; "
+                "use DB_POOLER=pgbouncer to bound them"
+            ))
+        if total > limit:
+            raise CommandError(f'{total} connections needed, {limit} available: lower the concurrency '
+                               'or put PgBouncer in front (DB_POOLER=pgbouncer)')
+        self.stdout.write(self.style.SUCCESS(f'{total} of {limit} connections'))
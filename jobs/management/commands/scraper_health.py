@@ -0,0 +1,67 @@
+"""
+Show each platform's scraper health, or open/close its circuit by hand
+
+    python manage.py scraper_health
+    python manage.py scraper_health --reset linkedin     # close after a fix
+    python manage.py scraper_health --open naukri        # skip it for COOLDOWN
+
+See jobs.health for how the circuit breaker decides.
+"""
+from datetime import datetime
+
+import redis
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs import health
+from jobs.scraper import JobScraperService
+
+
+class Command(BaseCommand):
+    help = 'Show scraper success/yield rates, latency and circuit state per platform'
+
+    def add_arguments(self, parser):
+        action = parser.add_mutually_exclusive_group()
+        action.add_argument('--reset', metavar='PLATFORM', help='Close the circuit of a platform')
+        action.add_argument('--open', metavar='PLATFORM', help='Open the circuit of a platform')
+        parser.add_argument('--cooldown', type=int, default=health.COOLDOWN,
+                            help='Seconds to keep an --open circuit open (default: %(default)s)')
+
+    def handle(self, *args, **options):
+        platforms = list(JobScraperService().scrapers)
+        tracker = health.PlatformHealth()
+        target = options['reset'] or options['open']
+        if target and target not in platforms:
+            raise CommandError(f"Unknown platform {target!r}; one of: {', '.join(platforms)}")
+
+        try:
+            if options['reset']:
+                tracker.reset(target)
+                self.stdout.write(f'Circuit for {target} closed')
+            elif options['open']:
+                tracker.trip(target, options['cooldown'])
+                self.stdout.write(f"Circuit for {target} open for {options['cooldown']}s")
+            report = tracker.status(platforms)
+        except redis.RedisError as e:
+            raise CommandError(f'Redis unavailable: {e}')
+
+        def rate(value):
+            return '-' if value is None else f'{value:.0%}'
+
+        self.stdout.write(f"{'platform':<16}{'state':<16}{'recent':>7}{'success':>9}{'yield':>7}"
+                          f"{'errors':>8}{'p50 ms':>8}{'p95 ms':>8}{'skipped':>9}  last ok")
+        for platform, row in report.items():
+            state = row['state']
+            if state == 'open':
+                state = f"open {row['reopens_in']}s"
+            elif row['consecutive_failures']:
+                state = f"{state} ({row['consecutive_failures']}x)"
+            latency = row['latency_ms'] or {}
+            last_ok = datetime.fromtimestamp(row['last_ok_at']).isoformat(' ', 'seconds') if row['last_ok_at'] else '-'
+            line = (f"{platform:<16}{state:<16}{row['recent']:>7}{rate(row['success_rate']):>9}"
+                    f"{rate(row['yield_rate']):>7}{rate(row['error_rate']):>8}"
+                    f"{latency.get('median', '-'):>8}{latency.get('p95', '-'):>8}{row['totals']['skipped']:>9}  {last_ok}")
+            if row['state'] != 'closed':
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+            if row['state'] != 'closed' and row['last_error']:
+                self.stdout.write(f"{'':<16}last error: {row['last_error']}")
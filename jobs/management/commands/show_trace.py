@@ -0,0 +1,79 @@
+"""
+Print the spans of one trace as a tree, with timings
+
+    python manage.py show_trace --resume 42
+    python manage.py show_trace --trace 4bf92f3577b34da6a3ce929d0e0e4736
+
+--resume uses the trace of the resume's last scrape (Resume.progress).
+Spans are read from TRACING_FILE (see jobs.tracing) unless --file is given.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs import tracing
+from jobs.models import Resume
+
+ATTRIBUTE_LIMIT = 60  # Characters of attributes shown per span
+
+
+class Command(BaseCommand):
+    help = 'Show the recorded spans of a trace, e.g. to see which stage made a scrape slow'
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--resume', type=int, help='Resume whose last scrape to show')
+        target.add_argument('--trace', help='Trace id')
+        parser.add_argument('--file', default=settings.TRACING_FILE, help='Span file (default: TRACING_FILE)')
+
+    def handle(self, *args, **options):
+        if not options['file']:
+            raise CommandError('No span file: set TRACING_FILE or pass --file')
+
+        trace_id = options['trace']
+        if options['resume'] is not None:
+            progress = Resume.objects.filter(id=options['resume']).values_list('progress', flat=True).first()
+            if progress is None:
+                raise CommandError(f"Resume {options['resume']} not found")
+            trace_id = progress.get('trace_id')
+            if not trace_id:
+                raise CommandError(f"Resume {options['resume']} has no recorded trace")
+
+        try:
+            spans = tracing.read_trace(options['file'], trace_id)
+        except FileNotFoundError:
+            raise CommandError(f"{options['file']} does not exist")
+        if not spans:
+            raise CommandError(f'No spans recorded for trace {trace_id} (unsampled, or still running?)')
+
+        children = defaultdict(list)
+        ids = {span['span_id'] for span in spans}
+        for span in spans:
+            # Spans whose parent wasn't recorded (e.g. a caller's) are shown as roots
+            children[span['parent_id'] if span['parent_id'] in ids else None].append(span)
+
+        origin = spans[0]['start']
+        self.stdout.write(f'trace {trace_id}: {len(spans)} spans')
+        self.stdout.write(f"{'start ms':>10} {'duration ms':>12}  span")
+
+        def show(span, depth):
+            attributes = ' '.join(f'{key}={value}' for key, value in span['attributes'].items())
+            line = (f"{(span['start'] - origin) * 1000:>10.1f} {span['duration_ms']:>12.1f}  "
+                    f"{'  ' * depth}{span['name']}  {attributes[:ATTRIBUTE_LIMIT]}")
+            if span['status'] == 'error':
+                line = self.style.ERROR(f"{line}  [{span['error']}]")
+            self.stdout.write(line)
+            for child in children[span['span_id']]:
+                show(child, depth + 1)
+
+        for root in children[None]:
+            show(root, 0)
+
+        # Where the time went, by kind of span
+        totals = defaultdict(float)
+        for span in spans:
+            totals[span['name']] += span['duration_ms']
+        self.stdout.write('\ntotal ms by span name:')
+        for name, total in sorted(totals.items(), key=lambda item: -item[1]):
+            self.stdout.write(f'{total:>12.1f}  {name}')
@@ -0,0 +1,51 @@
+"""
+Train a new compression dictionary from stored job descriptions
+
+    python manage.py train_description_dictionary --samples 5000
+
+Writes vN.zdict into COMPRESSION_DICTIONARY_DIR. Commit the file and deploy
+it everywhere before relying on it: rows written with a dictionary can only
+be read where that dictionary exists.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs import compression
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Train a zlib preset dictionary from existing job descriptions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--samples', type=int, default=5000, help='Number of descriptions to sample')
+        parser.add_argument('--size', type=int, default=compression.MAX_DICTIONARY_SIZE, help='Dictionary size in bytes')
+
+    def handle(self, *args, **options):
+        descriptions = (
+            Job.objects.exclude(description=None)
+            .order_by('-scraped_at')
+            .values_list('description', flat=True)[:options['samples']]
+        )
+        samples = [compression.decompress_text(value) for value in descriptions.iterator()]
+        samples = [text for text in samples if text]
+        if len(samples) < 10:
+            raise CommandError(f'Need at least 10 descriptions to train on, found {len(samples)}')
+
+        zdict = compression.train_dictionary(samples, size=options['size'])
+
+        version = max(compression.available_dictionaries()) + 1
+        if version > 255:
+            raise CommandError('Dictionary versions are exhausted (max 255)')
+        directory = compression.dictionary_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'v{version}.zdict'
+        path.write_bytes(zdict)
+        compression.available_dictionaries.cache_clear()
+
+        # Report the gain on the training set against the previous dictionary
+        raw = sum(len(text.encode('utf-8')) for text in samples)
+        packed = sum(len(compression.compress_text(text)) for text in samples)
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {path} ({len(zdict)} bytes) from {len(samples)} descriptions; '
+            f'sample set compresses {raw} -> {packed} bytes'
+        ))
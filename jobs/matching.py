@@ -0,0 +1,398 @@
+"""
+Batch Job Matching
+Scores new jobs against every stored resume using keyword bitsets
+
+A match is a JobMatch row (resume, job, score) pointing at the scraped job.
+Each job goes to its MATCHES_PER_JOB best resumes, picked inside the
+bit-sliced comparison so the full hit list is never built, and each resume
+keeps only its MATCHES_PER_RESUME best matches.
+
+Each worker process keeps its SkillMatrix (shared_matrix) and on every run
+only applies the keyword changes since (Resume.keywords_updated_at),
+instead of reading every resume again.
+"""
+import re
+import math
+import heapq
+import logging
+import threading
+from datetime import timedelta
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+MATCHES_PER_JOB = 50       # Best-fitting resumes each new job is offered to
+MATCHES_PER_RESUME = 200   # Best-scoring matches kept for each resume
+REFRESH_OVERLAP = timedelta(minutes=1)  # Re-read changes this close to the last refresh: commits land late
+
+# Positions of the set bits for every byte value, used to decode bitsets quickly
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+# The next non-zero byte; the engine skips a run of one literal much faster
+# than it tests a character class at every byte
+_NEXT_NONZERO_BYTE = re.compile(rb'\x00*([^\x00])')
+
+
+def build_vocabulary() -> List[str]:
+    """Fixed, sorted keyword vocabulary shared by resumes and jobs"""
+    from .scraper import ResumeParser
+    return sorted(ResumeParser.TECH_KEYWORDS | ResumeParser.JOB_TITLES)
+
+
+def iter_set_bits(bits: int) -> Iterable[int]:
+    """Yield the index of every set bit, scanning whole zero bytes in C"""
+    if not bits:
+        return
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    for match in _NEXT_NONZERO_BYTE.finditer(data):
+        start = match.start(1)
+        base = start * 8
+        for bit in _BYTE_BITS[data[start]]:
+            yield base + bit
+
+
+class SkillMatrix:
+    """
+    Compact resume x keyword matrix
+
+    Stored twice, both as Python ints used as bitsets:
+    - rows[i]: keyword mask of resume i (one bit per vocabulary term)
+    - columns[k]: resume mask of keyword k (one bit per resume)
+
+    Scoring a job ANDs/ORs whole columns, so a single job is compared with
+    every resume in a handful of big-int operations instead of a Python loop.
+    A removed resume keeps its position with an empty row.
+    """
+
+    def __init__(self, vocabulary: Sequence[str] = None):
+        self.vocabulary = list(vocabulary) if vocabulary is not None else build_vocabulary()
+        self.term_index = {term: i for i, term in enumerate(self.vocabulary)}
+        self.resume_ids: List[int] = []
+        self.positions: Dict[int, int] = {}
+        self.rows: List[int] = []
+        self.columns: List[int] = [0] * len(self.vocabulary)
+        self.synced_at = None  # Keyword changes up to here are in (refresh)
+
+    def __len__(self):
+        return len(self.resume_ids)
+
+    def mask_for(self, keywords: Iterable[str]) -> int:
+        """Keyword mask for a set of keywords, ignoring unknown terms"""
+        mask = 0
+        for keyword in keywords:
+            index = self.term_index.get(keyword.strip().lower())
+            if index is not None:
+                mask |= 1 << index
+        return mask
+
+    def add(self, resume_id: int, keywords: Iterable[str]):
+        """Set the keywords of a resume, appending a row if it is new"""
+        mask = self.mask_for(keywords)
+        position = self.positions.get(resume_id)
+        if position is None:
+            position = len(self.resume_ids)
+            self.positions[resume_id] = position
+            self.resume_ids.append(resume_id)
+            self.rows.append(0)
+        self._set_row(position, mask)
+
+    def remove(self, resume_id: int):
+        """Stop matching a (deleted) resume"""
+        position = self.positions.get(resume_id)
+        if position is not None:
+            self._set_row(position, 0)
+
+    def _set_row(self, position: int, mask: int):
+        old, bit = self.rows[position], 1 << position
+        for term in iter_set_bits(old & ~mask):
+            self.columns[term] &= ~bit
+        for term in iter_set_bits(mask & ~old):
+            self.columns[term] |= bit
+        self.rows[position] = mask
+
+    @classmethod
+    def from_resumes(cls, queryset=None, chunk_size: int = 5000) -> 'SkillMatrix':
+        """Build the matrix from Resume.keywords_extracted"""
+        from django.utils import timezone
+        from .models import Resume
+
+        if queryset is None:
+            queryset = Resume.objects.exclude(keywords_extracted='')
+
+        matrix = cls()
+        matrix.synced_at = timezone.now()
+        columns = [[] for _ in matrix.vocabulary]
+        rows = queryset.order_by().values_list('id', 'keywords_extracted')
+        for position, (resume_id, keywords_extracted) in enumerate(rows.iterator(chunk_size=chunk_size)):
+            mask = matrix.mask_for(keywords_extracted.split(','))
+            matrix.resume_ids.append(resume_id)
+            matrix.positions[resume_id] = position
+            matrix.rows.append(mask)
+            for term in iter_set_bits(mask):
+                columns[term].append(position)
+
+        # Building each column once from its positions is much cheaper than
+        # OR-ing a growing big int for every resume
+        for term, positions in enumerate(columns):
+            if positions:
+                column = bytearray((len(matrix.resume_ids) + 7) // 8)
+                for position in positions:
+                    column[position >> 3] |= 1 << (position & 7)
+                matrix.columns[term] = int.from_bytes(column, 'little')
+
+        logger.info(f"Built skill matrix: {len(matrix)} resumes x {len(matrix.vocabulary)} keywords")
+        return matrix
+
+    def refresh(self, chunk_size: int = 5000) -> int:
+        """Apply the keyword changes made since the last build or refresh; returns how many"""
+        from django.utils import timezone
+        from .models import Resume
+
+        started = timezone.now()
+        changed = Resume.objects.filter(keywords_updated_at__gte=self.synced_at - REFRESH_OVERLAP)
+        count = 0
+        for resume_id, keywords_extracted in changed.order_by().values_list('id', 'keywords_extracted').iterator(
+                chunk_size=chunk_size):
+            self.add(resume_id, keywords_extracted.split(','))
+            count += 1
+        self.synced_at = started
+        return count
+
+    def _overlap_planes(self, job_mask: int) -> List[int]:
+        """
+        Bit-sliced per-resume overlap counts for one job
+
+        planes[b] holds bit b of |job keywords & resume keywords| for every
+        resume at once (a ripple-carry adder over the job's keyword columns).
+        """
+        planes: List[int] = []
+        for term in iter_set_bits(job_mask):
+            carry = self.columns[term]
+            for b in range(len(planes)):
+                if not carry:
+                    break
+                planes[b], carry = planes[b] ^ carry, planes[b] & carry
+            if carry:
+                planes.append(carry)
+        return planes
+
+    def _at_least(self, planes: List[int], count: int) -> int:
+        """Resume bitset whose bit-sliced overlap count is >= count"""
+        sharing = 0  # Resumes sharing any keyword, the only ones that can qualify
+        for plane in planes:
+            sharing |= plane
+        if count <= 1:
+            return sharing
+
+        # Compare the bit-sliced counts against (count - 1), MSB first. Only
+        # &, | and ^ of non-negative ints: ~ on a big int costs several passes
+        threshold = count - 1
+        if threshold >> len(planes):
+            return 0
+        greater, equal = 0, sharing
+        for b in reversed(range(len(planes))):
+            if threshold >> b & 1:
+                equal &= planes[b]
+            else:
+                above = equal & planes[b]
+                greater |= above
+                equal ^= above
+        return greater
+
+    def candidates(self, job_mask: int, min_overlap: int) -> int:
+        """Resume bitset whose keyword overlap with the job is >= min_overlap"""
+        return self._at_least(self._overlap_planes(job_mask), min_overlap)
+
+    def best_candidates(self, job_mask: int, min_overlap: int, limit: int) -> List[Tuple[int, int]]:
+        """
+        (position, overlap) of up to `limit` resumes with the largest
+        overlap >= min_overlap, best first
+
+        Walks the overlap levels down from the highest, one bit-sliced
+        comparison each, and decodes only the positions it returns.
+        """
+        planes = self._overlap_planes(job_mask)
+        found: List[Tuple[int, int]] = []
+        higher = 0  # Resumes on the levels above: a subset of each lower level's
+        for overlap in range(min(job_mask.bit_count(), (1 << len(planes)) - 1), max(min_overlap, 1) - 1, -1):
+            at_least = self._at_least(planes, overlap)
+            level = islice(iter_set_bits(at_least ^ higher), limit - len(found))
+            found.extend((position, overlap) for position in level)
+            if len(found) >= limit:
+                break
+            higher = at_least
+        return found
+
+    def score_jobs(self, job_keywords: Sequence[Tuple[int, Set[str]]], min_overlap: int = 1,
+                   min_score: float = 0.5, exclude: Dict[int, int] = None,
+                   per_job: int = MATCHES_PER_JOB) -> Iterator[Tuple[int, int, float]]:
+        """
+        Score a batch of jobs against every resume
+
+        Args:
+            job_keywords: (job_id, keywords) pairs
+            min_overlap: minimum number of shared keywords
+            min_score: minimum fraction of the job's keywords the resume covers
+            exclude: job_id -> resume_id that must not be matched (the job's own resume)
+            per_job: most resumes a job is matched to, the best-scoring ones
+
+        Yields:
+            (job_id, resume_id, score) triples, one job at a time
+        """
+        exclude = exclude or {}
+        # Jobs often share their keywords (the same title on several boards),
+        # so each distinct mask is compared once, with one spare for the skip
+        best_by_mask: Dict[int, List[Tuple[int, int]]] = {}
+        for job_id, keywords in job_keywords:
+            job_mask = self.mask_for(keywords)
+            job_terms = job_mask.bit_count()
+            if not job_terms:
+                continue
+
+            best = best_by_mask.get(job_mask)
+            if best is None:
+                # A resume needs at least ceil(min_score * terms) shared keywords
+                required = max(min_overlap, math.ceil(min_score * job_terms))
+                best = best_by_mask[job_mask] = self.best_candidates(job_mask, required, per_job + 1)
+            skip = self.positions.get(exclude.get(job_id))
+            best = [(position, overlap) for position, overlap in best if position != skip][:per_job]
+            yield from [(job_id, self.resume_ids[position], overlap / job_terms) for position, overlap in best]
+
+
+_shared: Optional[SkillMatrix] = None
+_shared_lock = threading.Lock()
+
+
+def shared_matrix() -> SkillMatrix:
+    """This process's matrix: built on first use, then only refreshed"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SkillMatrix.from_resumes()
+        else:
+            refreshed = _shared.refresh()
+            logger.info(f"Refreshed skill matrix: {refreshed} resumes changed, {len(_shared)} in total")
+        return _shared
+
+
+def job_keywords(job) -> Set[str]:
+    """Keywords for a job from its title and (if fetched) description"""
+    from .compression import decompress_text
+    from .scraper import ResumeParser
+    text = job['title'] if isinstance(job, dict) else job.title
+    # .values() rows hold the stored (still compressed) description
+    description = decompress_text(job.get('description')) if isinstance(job, dict) else job.description
+    if description:
+        text = f"{text}\n{description}"
+    return ResumeParser.keywords_from_text(text)
+
+
+def jobs_of(resumes):
+    """Q for the jobs scraped for, or matched to, these resumes (ids or a Resume queryset)"""
+    from django.db.models import Q
+    from .models import JobMatch
+    return Q(resume__in=resumes) | Q(id__in=JobMatch.objects.filter(resume__in=resumes).values('job_id'))
+
+
+def best_per_resume(matches: Iterable[Tuple[int, int, float]],
+                    limit: int = MATCHES_PER_RESUME) -> Dict[int, List[Tuple[float, int]]]:
+    """The `limit` best (score, job_id) of each resume, holding at most twice that per resume"""
+    best: Dict[int, List[Tuple[float, int]]] = {}
+    for job_id, resume_id, score in matches:
+        kept = best.get(resume_id)
+        if kept is None:
+            best[resume_id] = kept = []
+        kept.append((score, job_id))
+        if len(kept) >= 2 * limit:
+            kept[:] = heapq.nlargest(limit, kept)
+    for resume_id, kept in best.items():
+        if len(kept) > limit:
+            best[resume_id] = heapq.nlargest(limit, kept)
+    return best
+
+
+def trim_matches(resume_ids: Iterable[int], limit: int = MATCHES_PER_RESUME, chunk_size: int = 500) -> int:
+    """Delete all but each resume's `limit` best matches; returns the number deleted"""
+    from django.db.models import F, Window
+    from django.db.models.functions import RowNumber
+    from .models import JobMatch
+
+    resume_ids = list(resume_ids)
+    deleted = 0
+    for start in range(0, len(resume_ids), chunk_size):
+        surplus = JobMatch.objects.filter(resume_id__in=resume_ids[start:start + chunk_size]).annotate(
+            rank=Window(RowNumber(), partition_by=F('resume_id'), order_by=[F('score').desc(), F('job_id').desc()]),
+        ).filter(rank__gt=limit).values_list('id', flat=True)
+        for ids in _chunks(list(surplus), chunk_size):
+            deleted += JobMatch.objects.filter(id__in=ids).delete()[0]
+    return deleted
+
+
+def _chunks(items: Sequence, size: int) -> Iterator[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def match_jobs_to_resumes(job_ids: Sequence[int], matrix: SkillMatrix = None,
+                          min_score: float = 0.5, batch_size: int = 1000) -> int:
+    """
+    Match newly scraped jobs to every other resume they fit
+
+    Matches are JobMatch rows, which put the job in that resume's job list
+    (jobs_of). Each job yields at most MATCHES_PER_JOB matches, each batch
+    keeps every resume's MATCHES_PER_RESUME best of those, and the stored
+    ones are trimmed to that after it. Returns the number of matches stored.
+    """
+    from .caching import bump_for_resumes
+    from .models import Job, JobMatch, Resume
+
+    if matrix is None:
+        matrix = shared_matrix()
+    if not len(matrix):
+        return 0
+
+    stored = 0
+    touched_resumes = set()
+    for start in range(0, len(job_ids), batch_size):
+        jobs = {
+            job['id']: job
+            for job in Job.objects.filter(id__in=job_ids[start:start + batch_size]).values(
+                'id', 'resume_id', 'title', 'link', 'description'
+            )
+        }
+        best = best_per_resume(matrix.score_jobs(
+            [(job_id, job_keywords(job)) for job_id, job in jobs.items()],
+            min_score=min_score,
+            exclude={job_id: job['resume_id'] for job_id, job in jobs.items()},
+        ))
+
+        for resume_ids in _chunks(list(best), batch_size):
+            # The matrix may still hold resumes deleted since it was built
+            alive = set(Resume.objects.filter(id__in=resume_ids).values_list('id', flat=True))
+            for resume_id in set(resume_ids) - alive:
+                matrix.remove(resume_id)
+            resume_ids = [resume_id for resume_id in resume_ids if resume_id in alive]
+
+            # Skip resumes that already hold a job with the same link
+            links = {jobs[job_id]['link'] for resume_id in resume_ids for _, job_id in best[resume_id]}
+            existing = set(
+                Job.objects.filter(link__in=links, resume_id__in=resume_ids).values_list('resume_id', 'link')
+            )
+            new_matches = [
+                JobMatch(resume_id=resume_id, job_id=job_id, score=score)
+                for resume_id in resume_ids
+                for score, job_id in best[resume_id]
+                if (resume_id, jobs[job_id]['link']) not in existing
+            ]
+            JobMatch.objects.bulk_create(new_matches, batch_size=batch_size, ignore_conflicts=True)
+            stored += len(new_matches)
+            touched_resumes.update(match.resume_id for match in new_matches)
+
+        trim_matches(best)
+
+    if touched_resumes:
+        # Only the resumes' own lists change; the site-wide pages don't show matches
+        bump_for_resumes([], touched_resumes)
+
+    logger.info(f"Matched {len(job_ids)} new jobs against {len(matrix)} resumes: stored {stored} matches")
+    return stored
@@ -0,0 +1,101 @@
+"""
+Metrics
+Timings, counters and gauges sent to StatsD over UDP
+
+Every process (web, each Celery worker, beat) sends its own measurements
+to the agent at STATSD_HOST, which aggregates them; nothing is kept in
+the process and a send never blocks or fails the caller. Tags use the
+DogStatsD extension (|#name:value), understood by the Datadog agent,
+Telegraf and Prometheus' statsd_exporter. With STATSD_HOST unset, nothing
+is sent.
+
+Metric names (prefixed with STATSD_PREFIX):
+- scraper.fetch_time      timer    platform, status (HTTP code or 'error')
+- scraper.parse_time      timer    platform
+- scraper.platform_time   timer    platform, outcome (ok/no_results/error)
+- scraper.fallback        counter  platform, reason (no_results/error)
+- scraper.jobs            counter  platform
+- scraper.skipped         counter  platform (circuit open, see jobs.health)
+- resume.extract_time     timer    format (pdf/docx)
+- jobs.save_time          timer
+- jobs.created            counter
+- celery.task_time        timer    task, state
+- celery.queue_depth      gauge    queue
+- http.request_time       timer    view, method, status
+"""
+import logging
+import os
+import socket
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+
+class StatsClient:
+    """Minimal fire-and-forget StatsD client"""
+
+    def __init__(self, host: str, port: int = 8125, prefix: str = ''):
+        self.address = (host, port)
+        self.prefix = f'{prefix}.' if prefix else ''
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+
+    def send(self, stat: str, value, kind: str, tags: dict):
+        line = f'{self.prefix}{stat}:{value}|{kind}'
+        if tags:
+            line += '|#' + ','.join(f'{name}:{tag}' for name, tag in tags.items())
+        try:
+            self.socket.sendto(line.encode(), self.address)
+        except OSError:
+            pass  # Metrics are best effort; a full buffer or missing agent drops them
+
+
+class NullClient:
+    def send(self, stat, value, kind, tags):
+        pass
+
+
+@lru_cache(maxsize=None)
+def get_client():
+    """Process-wide client, configured from settings (or the environment outside Django)"""
+    from django.conf import settings
+
+    if settings.configured:
+        host = getattr(settings, 'STATSD_HOST', None)
+        port = getattr(settings, 'STATSD_PORT', 8125)
+        prefix = getattr(settings, 'STATSD_PREFIX', 'careeros')
+    else:
+        host = os.environ.get('STATSD_HOST')
+        port = int(os.environ.get('STATSD_PORT', 8125))
+        prefix = os.environ.get('STATSD_PREFIX', 'careeros')
+    if not host:
+        return NullClient()
+    try:
+        return StatsClient(host, port, prefix)
+    except OSError as e:
+        logger.warning(f"Metrics disabled, could not open a StatsD socket: {e}")
+        return NullClient()
+
+
+def incr(stat: str, value: int = 1, **tags):
+    get_client().send(stat, value, 'c', tags)
+
+
+def gauge(stat: str, value, **tags):
+    get_client().send(stat, value, 'g', tags)
+
+
+def timing(stat: str, seconds: float, **tags):
+    """Record a duration given in seconds (sent as milliseconds)"""
+    get_client().send(stat, round(seconds * 1000, 3), 'ms', tags)
+
+
+@contextmanager
+def timer(stat: str, **tags):
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        timing(stat, time.monotonic() - started, **tags)
@@ -0,0 +1,333 @@
+"""
+Middleware
+Everything here runs natively under WSGI and ASGI (see HybridMiddleware),
+so under ASGI a request only leaves the event loop for sync views.
+"""
+import hmac
+import logging
+import random
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import metrics, replicas, tracing
+
+logger = logging.getLogger(__name__)
+
+# A profiled request over any of these is logged as an offender
+MAX_QUERIES = 30          # Statements per request
+MAX_DB_TIME = 0.2         # Seconds spent in the database per request
+MAX_REPEATS = 5           # Runs of one statement (same SQL, any parameters): an N+1
+SLOWEST_SHOWN = 3         # Statements listed in the log line
+SQL_SHOWN = 200           # Characters of each statement logged
+
+
+def view_name(request) -> str:
+    match = request.resolver_match
+    return (match.view_name or match._func_path) if match else 'unmatched'
+
+
+class HybridMiddleware(ABC):
+    """
+    Base for middleware that is both sync and async capable
+    Django picks the mode from the rest of the chain: under ASGI requests
+    go to ahandle(), under WSGI to handle(). A sync-only middleware would
+    make Django run everything inside it through a thread per request.
+    Subclasses must implement both.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.asynchronous = iscoroutinefunction(get_response)
+        if self.asynchronous:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.asynchronous:
+            return self.ahandle(request)
+        return self.handle(request)
+
+    @abstractmethod
+    def handle(self, request):
+        """Process a request under WSGI"""
+
+    @abstractmethod
+    async def ahandle(self, request):
+        """Process a request under ASGI"""
+
+
+class RequestMetricsMiddleware(HybridMiddleware):
+    """
+    Time every request, tagged with the URL pattern's name
+    First in MIDDLEWARE so the time includes all the other middleware. For
+    streamed responses (exports, progress events) it is the time until the
+    stream starts.
+    """
+
+    def handle(self, request):
+        started = time.monotonic()
+        response = self.get_response(request)
+        self.record(request, response, started)
+        return response
+
+    async def ahandle(self, request):
+        started = time.monotonic()
+        response = await self.get_response(request)
+        self.record(request, response, started)
+        return response
+
+    def record(self, request, response, started: float):
+        metrics.timing('http.request_time', time.monotonic() - started,
+                       view=view_name(request), method=request.method, status=response.status_code)
+
+
+class RequestTracingMiddleware(HybridMiddleware):
+    """
+    Root span of each request (or a child of the caller's traceparent)
+    Tasks queued while handling it carry the trace on (jobs.signals).
+    """
+
+    def start(self, request) -> tracing.Span:
+        return tracing.start_span(
+            'http.request', traceparent=request.META.get('HTTP_TRACEPARENT'),
+            method=request.method, path=request.path
+        )
+
+    def handle(self, request):
+        span = self.start(request)
+        try:
+            response = self.get_response(request)
+            span.set(status=response.status_code)
+            return response
+        except BaseException as e:
+            span.fail(e)
+            raise
+        finally:
+            span.set(view=view_name(request))
+            tracing.end_span(span)
+
+    async def ahandle(self, request):
+        span = self.start(request)
+        try:
+            response = await self.get_response(request)
+            span.set(status=response.status_code)
+            return response
+        except BaseException as e:
+            span.fail(e)
+            raise
+        finally:
+            span.set(view=view_name(request))
+            tracing.end_span(span)
+
+
+class QueryRecorder:
+    """connection.execute_wrapper recording each statement's SQL, parameters and time"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, params, time.monotonic() - started))
+
+    @property
+    def db_time(self) -> float:
+        return sum(duration for sql, params, duration in self.queries)
+
+    def repeats(self) -> Counter:
+        """How often each SQL statement ran, regardless of parameters"""
+        return Counter(sql for sql, params, duration in self.queries)
+
+    def duplicates(self) -> int:
+        """Statements run again with the very same parameters"""
+        exact = Counter((sql, repr(params)) for sql, params, duration in self.queries)
+        return sum(count - 1 for count in exact.values())
+
+    def slowest(self, n: int) -> list:
+        return sorted(self.queries, key=lambda query: -query[2])[:n]
+
+
+class QueryProfilingMiddleware(HybridMiddleware):
+    """
+    Opt-in query profiling of a request: statement count, database time,
+    repeated and duplicate statements, and the slowest ones
+
+    A request is profiled when picked at QUERY_PROFILING_SAMPLE_RATE, or on
+    request with an X-Profile-Queries header (any value under DEBUG,
+    otherwise QUERY_PROFILING_TOKEN). Profiled responses get a Server-Timing
+    header (db time and count, app time), and requests over the MAX_*
+    thresholds are logged with their worst statements.
+
+    Queries made while a streamed response is being sent are not counted.
+    """
+
+    def wanted(self, request) -> bool:
+        header = request.META.get('HTTP_X_PROFILE_QUERIES')
+        if header:
+            token = settings.QUERY_PROFILING_TOKEN
+            if settings.DEBUG or (token and hmac.compare_digest(header, token)):
+                return True
+        rate = settings.QUERY_PROFILING_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    @staticmethod
+    def record_queries(stack: ExitStack, recorder: QueryRecorder):
+        """Install the recorder on this thread's connections until the stack closes"""
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+
+    def handle(self, request):
+        if not self.wanted(request):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        started = time.monotonic()
+        with ExitStack() as stack:
+            self.record_queries(stack, recorder)
+            response = self.get_response(request)
+        return self.finish(request, response, recorder, time.monotonic() - started)
+
+    async def ahandle(self, request):
+        if not self.wanted(request):
+            return await self.get_response(request)
+
+        # Connections are thread-local and the async ORM runs queries in the
+        # request's thread-sensitive thread, so the recorder goes on there
+        recorder = QueryRecorder()
+        started = time.monotonic()
+        stack = ExitStack()
+        await sync_to_async(self.record_queries)(stack, recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.finish(request, response, recorder, time.monotonic() - started)
+
+    def finish(self, request, response, recorder: QueryRecorder, elapsed: float):
+        db_time = recorder.db_time
+        count = len(recorder.queries)
+        timing = (f'db;dur={db_time * 1000:.1f};desc="{count} queries", '
+                  f'app;dur={max(0.0, elapsed - db_time) * 1000:.1f}')
+        response['Server-Timing'] = f"{response['Server-Timing']}, {timing}" if response.has_header('Server-Timing') else timing
+
+        span = tracing.current_span()
+        if span is not None:
+            span.set(db_queries=count, db_ms=round(db_time * 1000, 1))
+
+        self.report(request, recorder, elapsed)
+        return response
+
+    def report(self, request, recorder: QueryRecorder, elapsed: float):
+        count, db_time = len(recorder.queries), recorder.db_time
+        repeated_sql, repeats = (recorder.repeats().most_common(1) or [(None, 0)])[0]
+        problems = []
+        if count > MAX_QUERIES:
+            problems.append(f'{count} queries')
+        if db_time > MAX_DB_TIME:
+            problems.append(f'{db_time * 1000:.0f} ms in the database')
+        if repeats > MAX_REPEATS:
+            problems.append(f'one statement run {repeats} times')
+        if not problems:
+            return
+
+        lines = [
+            f"Query profile {request.method} {request.path} ({view_name(request)}): {', '.join(problems)}; "
+            f"{count} queries, {db_time * 1000:.1f} ms db of {elapsed * 1000:.1f} ms, "
+            f"{recorder.duplicates()} exact duplicates"
+        ]
+        if repeats > MAX_REPEATS:
+            lines.append(f'  repeated x{repeats}: {repeated_sql[:SQL_SHOWN]}')
+        for sql, params, duration in recorder.slowest(SLOWEST_SHOWN):
+            lines.append(f'  {duration * 1000:.1f} ms: {sql[:SQL_SHOWN]}')
+        logger.warning('\n'.join(lines))
+
+
+class ReplicaRoutingMiddleware(HybridMiddleware):
+    """
+    Let GET/HEAD/OPTIONS requests read from a replica (jobs.replicas), and
+    keep a user, or an anonymous visitor's browser, on the primary for a
+    while after each of their writes
+    Streamed responses (exports, progress events) keep reading from their
+    request's database while they are sent. Not used without replicas.
+    """
+    READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        if not replicas.replicas():
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def handle(self, request):
+        if request.method not in self.READ_METHODS:
+            response = self.get_response(request)
+            self.pin_writer(request, response)
+            return response
+        with replicas.reading(request) as reads:
+            response = self.get_response(request)
+        return self.keep_streaming(reads, response)
+
+    async def ahandle(self, request):
+        if request.method not in self.READ_METHODS:
+            response = await self.get_response(request)
+            await sync_to_async(self.pin_writer)(request, response)
+            return response
+        with replicas.reading(request) as reads:
+            response = await self.get_response(request)
+        return self.keep_streaming(reads, response)
+
+    @staticmethod
+    def keep_streaming(reads: replicas.RequestReads, response):
+        if response.streaming:
+            response.streaming_content = replicas.streamed(reads, response.streaming_content)
+        return response
+
+    @staticmethod
+    def pin_writer(request, response):
+        if response.status_code >= 400:
+            return
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            replicas.pin([user.pk])
+        else:
+            replicas.pin_client(response)
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise that can also run in async mode
+    Only requests for static files are served from a thread; everything
+    else passes straight through on the event loop.
+    """
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        self.asynchronous = iscoroutinefunction(get_response)
+        if self.asynchronous:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.asynchronous:
+            return self.ahandle(request)
+        return super().__call__(request)
+
+    async def ahandle(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.27 on 2026-10-18 22:24
+
+from django.db import migrations, models
+import jobs.fields
+
+
+def copy_to_compressed(apps, schema_editor):
+    """Re-write existing text through CompressedTextField"""
+    Job = apps.get_model('jobs', 'Job')
+    Resume = apps.get_model('jobs', 'Resume')
+    for job in Job.objects.exclude(description_plain=None).only('id', 'description_plain').iterator():
+        Job.objects.filter(id=job.id).update(description=job.description_plain)
+    for resume in Resume.objects.exclude(task_result_plain='').only('id', 'task_result_plain').iterator():
+        Resume.objects.filter(id=resume.id).update(task_result=resume.task_result_plain)
+
+
+def copy_to_plain(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    Resume = apps.get_model('jobs', 'Resume')
+    for job in Job.objects.exclude(description=None).only('id', 'description').iterator():
+        Job.objects.filter(id=job.id).update(description_plain=job.description)
+    for resume in Resume.objects.only('id', 'task_result').iterator():
+        Resume.objects.filter(id=resume.id).update(task_result_plain=resume.task_result)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0002_resume_task_id_resume_task_result_resume_task_status"),
+    ]
+
+    # Text and binary columns can't be converted in place on PostgreSQL, so
+    # the old column is kept under a temporary name while data is copied.
+    operations = [
+        migrations.RenameField(
+            model_name="job",
+            old_name="description",
+            new_name="description_plain",
+        ),
+        migrations.RenameField(
+            model_name="resume",
+            old_name="task_result",
+            new_name="task_result_plain",
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="description",
+            field=jobs.fields.CompressedTextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="resume",
+            name="task_result",
+            field=jobs.fields.CompressedTextField(
+                blank=True, default="", help_text="Task result or error message"
+            ),
+        ),
+        migrations.RunPython(copy_to_compressed, copy_to_plain),
+        migrations.RemoveField(
+            model_name="job",
+            name="description_plain",
+        ),
+        migrations.RemoveField(
+            model_name="resume",
+            name="task_result_plain",
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.27 on 2026-10-18 22:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("jobs", "0003_compressed_text_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resume",
+            name="user",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="resumes",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
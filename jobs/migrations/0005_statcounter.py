@@ -0,0 +1,58 @@
+# Generated by Django 4.2.27 on 2026-10-18 22:30
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.utils import timezone
+
+
+def populate_counters(apps, schema_editor):
+    """Seed the counters from the existing rows"""
+    from jobs.counters import application_deltas, job_deltas, resume_deltas
+
+    Resume = apps.get_model('jobs', 'Resume')
+    Job = apps.get_model('jobs', 'Job')
+    JobApplication = apps.get_model('jobs', 'JobApplication')
+    StatCounter = apps.get_model('jobs', 'StatCounter')
+
+    counts = Counter()
+    for user_id, platform, n in Job.objects.order_by().values_list('resume__user_id', 'platform').annotate(n=Count('id')):
+        counts.update(job_deltas([(user_id, platform)], step=n))
+    for user_id, n in Resume.objects.order_by().values_list('user_id').annotate(n=Count('id')):
+        counts.update(resume_deltas([user_id], step=n))
+    for user_id, status, n in (
+        JobApplication.objects.order_by().values_list('job__resume__user_id', 'status').annotate(n=Count('id'))
+    ):
+        counts.update(application_deltas([(user_id, status)], step=n))
+
+    now = timezone.now()
+    StatCounter.objects.bulk_create(
+        [StatCounter(scope=scope, name=name, value=value, updated_at=now) for (scope, name), value in counts.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_resume_user'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(help_text="'global' or 'user:<id>'", max_length=50)),
+                ('name', models.CharField(help_text="e.g. 'jobs', 'jobs:linkedin', 'applications:applied'", max_length=50)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='statcounter',
+            constraint=models.UniqueConstraint(fields=('scope', 'name'), name='unique_stat_counter'),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
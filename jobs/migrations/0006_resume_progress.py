@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-18 22:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_statcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='progress',
+            field=models.JSONField(blank=True, default=dict, help_text='Stage, per-platform state and timings of the last run'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.27 on 2026-10-18 22:36
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('jobs', '0006_resume_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the file, computed while storing it', max_length=64),
+        ),
+        migrations.CreateModel(
+            name='ResumeUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255)),
+                ('size', models.BigIntegerField(help_text='Total size announced by the client, in bytes')),
+                ('received', models.BigIntegerField(default=0, help_text='Bytes stored so far; the next chunk starts here')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('resume', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload', to='jobs.resume')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resume_uploads', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.27 on 2026-10-18 22:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_chunked_uploads'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resume',
+            index=models.Index(fields=['user', 'content_hash'], name='resume_user_hash_idx'),
+        ),
+    ]
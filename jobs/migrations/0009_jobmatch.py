@@ -0,0 +1,31 @@
+# Generated by Django 4.2.27 on 2026-10-18 23:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_resume_content_hash_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text="Fraction of the job's keywords found in the resume")),
+                ('matched_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='jobs.job')),
+                ('resume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='jobs.resume')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['resume', '-score'], name='jobmatch_resume_score_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='jobmatch',
+            constraint=models.UniqueConstraint(fields=('resume', 'job'), name='unique_job_match'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-18 23:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_jobmatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='keywords_updated_at',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='When keywords_extracted last changed (jobs.matching)', null=True),
+        ),
+    ]
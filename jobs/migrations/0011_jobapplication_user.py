@@ -0,0 +1,35 @@
+# Generated by Django 4.2.27 on 2026-10-19 00:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import OuterRef, Subquery
+
+
+def assign_owners(apps, schema_editor):
+    """Existing applications belong to the owner of the job's resume"""
+    Resume = apps.get_model('jobs', 'Resume')
+    JobApplication = apps.get_model('jobs', 'JobApplication')
+    owner = Resume.objects.filter(jobs=OuterRef('job_id')).values('user_id')[:1]
+    JobApplication.objects.update(user=Subquery(owner))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('jobs', '0010_resume_keywords_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapplication',
+            name='user',
+            field=models.ForeignKey(blank=True, help_text='Whose application this is (unset for rows of anonymous resumes)', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='job_applications', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(assign_owners, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='jobapplication',
+            constraint=models.UniqueConstraint(fields=('user', 'job'), name='unique_user_application'),
+        ),
+    ]
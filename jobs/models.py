@@ -1,6 +1,11 @@
+import uuid
+
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
+from .fields import CompressedTextField
+
 
 class Resume(models.Model):
     """Store uploaded resumes"""
@@ -11,20 +16,32 @@ class Resume(models.Model):
         ('failed', 'Failed'),
     ]
     
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='resumes',
+        null=True, blank=True
+    )
     file = models.FileField(upload_to='resumes/')
+    content_hash = models.CharField(max_length=64, blank=True, help_text="SHA-256 of the file, computed while storing it")
     uploaded_at = models.DateTimeField(auto_now_add=True)
     keywords_extracted = models.TextField(blank=True, help_text="Comma-separated keywords")
+    keywords_updated_at = models.DateTimeField(null=True, blank=True, db_index=True,
+                                               help_text="When keywords_extracted last changed (jobs.matching)")
     
     # Celery task tracking
     task_id = models.CharField(max_length=255, blank=True, null=True, help_text="Celery task ID")
     task_status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
-    task_result = models.TextField(blank=True, help_text="Task result or error message")
+    task_result = CompressedTextField(blank=True, default='', help_text="Task result or error message")
+    progress = models.JSONField(default=dict, blank=True, help_text="Stage, per-platform state and timings of the last run")
     
     def __str__(self):
         return f"Resume {self.id} - {self.uploaded_at.strftime('%Y-%m-%d')}"
     
     class Meta:
         ordering = ['-uploaded_at']
+        indexes = [
+            # Duplicate detection on upload (jobs.uploads.find_duplicate)
+            models.Index(fields=['user', 'content_hash'], name='resume_user_hash_idx'),
+        ]
 
 
 class Job(models.Model):
@@ -44,7 +61,7 @@ class Job(models.Model):
     platform = models.CharField(max_length=50, choices=PLATFORM_CHOICES)
     link = models.URLField(max_length=1000)
     location = models.CharField(max_length=200, default='India')
-    description = models.TextField(blank=True, null=True)
+    description = CompressedTextField(blank=True, null=True)
     scraped_at = models.DateTimeField(default=timezone.now)
     is_active = models.BooleanField(default=True)
     
@@ -59,8 +76,32 @@ class Job(models.Model):
         ]
 
 
+class JobMatch(models.Model):
+    """A job scraped for one resume that fits another one too (see jobs.matching)"""
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='matches')
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='matches')
+    score = models.FloatField(help_text="Fraction of the job's keywords found in the resume")
+    matched_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"Job {self.job_id} for resume {self.resume_id} ({self.score:.2f})"
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['resume', 'job'], name='unique_job_match'),
+        ]
+        indexes = [
+            # A resume's best matches (matching.trim_matches)
+            models.Index(fields=['resume', '-score'], name='jobmatch_resume_score_idx'),
+        ]
+
+
 class JobApplication(models.Model):
-    """Track job applications"""
+    """
+    Track job applications
+    Each user keeps their own state for a job, so a job matched to several
+    users' resumes has one application per user.
+    """
     STATUS_CHOICES = [
         ('saved', 'Saved'),
         ('applied', 'Applied'),
@@ -69,6 +110,14 @@ class JobApplication(models.Model):
         ('accepted', 'Accepted'),
     ]
     
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='job_applications',
+        null=True,
+        blank=True,
+        help_text='Whose application this is (unset for rows of anonymous resumes)'
+    )
     job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='applications')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='saved')
     applied_at = models.DateTimeField(null=True, blank=True)
@@ -80,4 +129,41 @@ class JobApplication(models.Model):
         return f"{self.job.title} - {self.status}"
     
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'job'], name='unique_user_application'),
+        ]
+
+
+class ResumeUpload(models.Model):
+    """A chunked resume upload in progress (see jobs.uploads)"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='resume_uploads')
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField(help_text="Total size announced by the client, in bytes")
+    received = models.BigIntegerField(default=0, help_text="Bytes stored so far; the next chunk starts here")
+    created_at = models.DateTimeField(auto_now_add=True)
+    resume = models.OneToOneField(Resume, on_delete=models.SET_NULL, null=True, blank=True, related_name='upload')
+    
+    def __str__(self):
+        return f"Upload {self.id} - {self.filename} ({self.received}/{self.size})"
+    
+    @property
+    def is_complete(self):
+        return self.received == self.size
+
+
+class StatCounter(models.Model):
+    """Denormalized tallies so hot pages don't run COUNT(*) (see jobs.counters)"""
+    scope = models.CharField(max_length=50, help_text="'global' or 'user:<id>'")
+    name = models.CharField(max_length=50, help_text="e.g. 'jobs', 'jobs:linkedin', 'applications:applied'")
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.scope} {self.name} = {self.value}"
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'name'], name='unique_stat_counter'),
+        ]
@@ -0,0 +1,279 @@
+"""
+Task Progress Events
+scrape_jobs_for_resume publishes progress for a resume on a Redis pub/sub
+channel, and the server-sent events endpoints relay it to browsers and API
+clients, so nobody has to poll for task_status.
+
+Every event is a JSON object with an 'event' name and the resume_id:
+- status    task_status changed (pending/processing/completed/failed), or
+            retrying with retry_in seconds after a transient error
+- parsed    keywords extracted from the resume
+- platform  one platform finished (jobs found, seconds taken, error)
+- saved     scraped jobs persisted (jobs_created)
+
+ProgressTracker keeps the structured state of a run in Resume.progress.
+
+Under ASGI the stream is an async generator (aevent_stream) waiting on
+redis.asyncio, so an open stream holds no thread. Under threaded WSGI
+(gunicorn --threads > 1) it is a plain generator that holds one of the
+worker's threads until it ends. A sync worker serves one request at a
+time, so there the response is just the current state plus a retry
+delay: EventSource reconnects after POLL_INTERVAL, i.e. it polls.
+"""
+import json
+import logging
+import time
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator, Optional
+
+import redis
+import redis.asyncio
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from . import tracing
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ('completed', 'failed')
+STREAM_TIMEOUT = 600      # Seconds before a stream is closed (EventSource reconnects)
+HEARTBEAT_INTERVAL = 15   # Seconds between keep-alive comments on a quiet stream
+RECONNECT_DELAY = 5000    # Milliseconds a client waits before reconnecting
+POLL_INTERVAL = 3000      # Milliseconds between reconnects where streams aren't served
+
+
+def channel_for(resume_id) -> str:
+    return f'resume-progress:{resume_id}'
+
+
+def publish(resume_id, event: str, **data):
+    """Send an event to everyone watching the resume; never fails the task"""
+    payload = json.dumps({'event': event, 'resume_id': resume_id, **data}, cls=DjangoJSONEncoder)
+    try:
+        get_redis().publish(channel_for(resume_id), payload)
+    except redis.RedisError as e:
+        logger.warning(f"Could not publish {event} for resume {resume_id}: {e}")
+
+
+def is_finished(event: dict) -> bool:
+    return event.get('event') == 'status' and event.get('status') in TERMINAL_STATUSES
+
+
+def format_event(event: dict) -> str:
+    """One SSE frame"""
+    return f"event: {event['event']}\ndata: {json.dumps(event, cls=DjangoJSONEncoder)}\n\n"
+
+
+def event_stream(resume_id, load_snapshot: Callable[[], dict]) -> Iterator[str]:
+    """
+    SSE frames for one resume until its task finishes or STREAM_TIMEOUT
+
+    load_snapshot returns the current state as a 'status' event. It is
+    called after subscribing, so no event can slip in between.
+    """
+    yield f'retry: {RECONNECT_DELAY}\n\n'
+    try:
+        pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(channel_for(resume_id))
+    except redis.RedisError as e:
+        # Without pub/sub, send the current state and let the client reconnect
+        logger.warning(f"Progress stream for resume {resume_id} unavailable: {e}")
+        yield format_event(load_snapshot())
+        return
+
+    try:
+        current = load_snapshot()
+        yield format_event(current)
+        if is_finished(current):
+            return
+
+        deadline = time.monotonic() + STREAM_TIMEOUT
+        while time.monotonic() < deadline:
+            message = pubsub.get_message(timeout=HEARTBEAT_INTERVAL)
+            if message is None:
+                yield ': keep-alive\n\n'
+                continue
+            event = json.loads(message['data'])
+            yield format_event(event)
+            if is_finished(event):
+                return
+    except redis.RedisError as e:
+        logger.warning(f"Progress stream for resume {resume_id} interrupted: {e}")
+    finally:
+        pubsub.close()
+
+
+async def aevent_stream(resume_id, load_snapshot: Callable[[], Awaitable[dict]]) -> AsyncIterator[str]:
+    """event_stream for ASGI, waiting on the event loop instead of in a thread"""
+    yield f'retry: {RECONNECT_DELAY}\n\n'
+    # A client of its own: async connections belong to the event loop they were made on
+    client = redis.asyncio.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    pubsub = client.pubsub(ignore_subscribe_messages=True)
+    try:
+        try:
+            await pubsub.subscribe(channel_for(resume_id))
+        except redis.RedisError as e:
+            logger.warning(f"Progress stream for resume {resume_id} unavailable: {e}")
+            yield format_event(await load_snapshot())
+            return
+
+        current = await load_snapshot()
+        yield format_event(current)
+        if is_finished(current):
+            return
+
+        deadline = time.monotonic() + STREAM_TIMEOUT
+        while time.monotonic() < deadline:
+            message = await pubsub.get_message(timeout=HEARTBEAT_INTERVAL)
+            if message is None:
+                yield ': keep-alive\n\n'
+                continue
+            event = json.loads(message['data'])
+            yield format_event(event)
+            if is_finished(event):
+                return
+    except redis.RedisError as e:
+        logger.warning(f"Progress stream for resume {resume_id} interrupted: {e}")
+    finally:
+        await pubsub.aclose()
+        await client.aclose()
+
+
+def resume_snapshot(resume) -> dict:
+    return {
+        'event': 'status',
+        'resume_id': resume.id,
+        'status': resume.task_status,
+        'keywords': resume.keywords_extracted,
+    }
+
+
+def stream_response(request, resume) -> StreamingHttpResponse:
+    """text/event-stream response following a resume's task"""
+    from .models import Resume
+
+    snapshot_of = Resume.objects.only('id', 'task_status', 'keywords_extracted')
+
+    def load_snapshot():
+        return resume_snapshot(snapshot_of.get(id=resume.id))
+
+    async def aload_snapshot():
+        return resume_snapshot(await snapshot_of.aget(id=resume.id))
+
+    # DRF views pass their Request, which wraps Django's
+    request = getattr(request, '_request', request)
+    if isinstance(request, ASGIRequest):
+        stream = aevent_stream(resume.id, aload_snapshot)
+    elif request.META.get('wsgi.multithread'):
+        stream = event_stream(resume.id, load_snapshot)
+    else:
+        # A sync worker held by a stream would serve nobody else (and be
+        # killed by gunicorn's worker timeout)
+        stream = iter([f'retry: {POLL_INTERVAL}\n\n', format_event(load_snapshot())])
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+    return response
+
+
+class ProgressTracker:
+    """
+    Structured progress of one scrape_jobs_for_resume run
+
+    Stored in Resume.progress with save(update_fields=...), so an update
+    writes that column (plus any named with it) and nothing else. The same
+    dict is the Celery task's PROGRESS meta. Shape:
+
+        {"task_id": "...", "trace_id": "...", "attempt": 1, "stage": "scraping",
+         "started_at": "...", "updated_at": "...",
+         "timings": {"parsing": 0.41},
+         "platforms": {"linkedin": {"state": "done", "jobs": 2, "created": 2,
+                                    "seconds": 3.12, "error": null}, ...},
+         "jobs_found": 2, "jobs_created": 2}
+
+    It is also the task's checkpoint: a retry of the same task picks it up
+    (for_task) and skips the stages and platforms already done.
+    """
+
+    def __init__(self, resume, task=None, platforms: Iterable[str] = (), state: Optional[dict] = None):
+        self.resume = resume
+        self.task = task
+        self._stage_started = time.monotonic()
+        span = tracing.current_span()
+        self.state = state or {
+            'task_id': task.request.id if task is not None else None,
+            'trace_id': span.trace_id if span is not None else None,  # For show_trace
+            'attempt': 1,
+            'stage': 'queued',
+            'started_at': timezone.now().isoformat(),
+            'timings': {},
+            'platforms': {
+                name: {'state': 'pending', 'jobs': 0, 'created': 0, 'seconds': None, 'error': None}
+                for name in platforms
+            },
+            'jobs_found': 0,
+            'jobs_created': 0,
+        }
+
+    @classmethod
+    def for_task(cls, resume, task, platforms: Iterable[str]) -> 'ProgressTracker':
+        """Continue the checkpoint left by an earlier attempt of this task, or start afresh"""
+        previous = resume.progress or {}
+        if task.request.id and previous.get('task_id') == task.request.id:
+            state = dict(previous, attempt=previous.get('attempt', 1) + 1)
+            return cls(resume, task, state=state)
+        return cls(resume, task, platforms)
+
+    @property
+    def started_at(self):
+        return datetime.fromisoformat(self.state['started_at'])
+
+    def finished(self, stage: str) -> bool:
+        """Whether a stage was completed (by this or an earlier attempt)"""
+        return stage in self.state['timings']
+
+    def pending_platforms(self) -> list:
+        return [name for name, platform in self.state['platforms'].items() if platform['state'] != 'done']
+
+    def stage(self, name: str, *fields: str, **values):
+        """
+        Enter a new stage, recording how long the previous one took
+        fields are other Resume columns, already set, to save in the same UPDATE.
+        """
+        now = time.monotonic()
+        if self.state['stage'] != 'queued':
+            self.state['timings'][self.state['stage']] = round(now - self._stage_started, 2)
+        self._stage_started = now
+        self.state['stage'] = name
+        self.state.update(values)
+        self.save(*fields)
+
+    def platform_done(self, platform: str, jobs: list, seconds: float, error: Optional[str] = None, created: int = 0):
+        """Record a finished platform; created is how many of its jobs were new"""
+        self.state['platforms'][platform] = {
+            'state': 'failed' if error else 'done',
+            'jobs': len(jobs),
+            'created': created,
+            'seconds': round(seconds, 2),
+            'error': error,
+        }
+        self.state['jobs_found'] += len(jobs)
+        self.state['jobs_created'] += created
+        self.save()
+        publish(self.resume.id, 'platform', platform=platform, jobs=len(jobs), seconds=round(seconds, 2), error=error)
+
+    def save(self, *fields: str):
+        self.state['updated_at'] = timezone.now().isoformat()
+        self.resume.progress = self.state
+        with tracing.span('db.save_progress', stage=self.state['stage']):
+            self.resume.save(update_fields=['progress', *fields])
+        if self.task is not None and self.task.request.id:
+            try:
+                self.task.update_state(state='PROGRESS', meta=self.state)
+            except Exception as e:
+                # The column above is the source of truth; the result backend is a mirror
+                logger.warning(f"Could not store progress for task {self.task.request.id}: {e}")
@@ -0,0 +1,14 @@
+"""
+Shared Redis connection
+The broker's Redis doubles as the pub/sub and lock store for the app
+"""
+from functools import lru_cache
+
+import redis
+from django.conf import settings
+
+
+@lru_cache(maxsize=None)
+def get_redis() -> redis.Redis:
+    """Process-wide client; redis-py pools connections internally"""
+    return redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
@@ -0,0 +1,155 @@
+"""
+Read Replicas
+Send the reads of GET requests to a read replica; everything else stays on
+the primary ('default'), which keeps taking the scrape ingestion
+
+Replicas are the 'replica<n>' entries of DATABASES (DATABASE_REPLICA_URLS).
+ReplicaRouter only routes a read to one inside a request that
+jobs.middleware.ReplicaRoutingMiddleware opened for it, i.e.:
+
+- GET/HEAD/OPTIONS requests; writes, Celery tasks and management commands
+  read from the primary (get_or_create and select_for_update too, as
+  Django sends those to db_for_write)
+- outside transactions on the primary
+- not for sessions, tokens, users and permissions: logging in must work
+  the moment the account or token is written
+- not for PIN_SECONDS after a write affecting the user, their own request
+  or a task's (caching.bump_for_users). That gives them read-your-writes,
+  and their invalidated cache entries are rebuilt from the primary rather
+  than from a replica that hasn't caught up yet
+- not for PIN_SECONDS after an anonymous visitor's own write, e.g. the
+  redirect after an upload: they have no user to pin, so their write
+  response sets a PIN_COOKIE that expires by then
+
+Pins live in the cache, so web and workers must share it (REDIS_URL).
+Each request reads from one replica, picked at random.
+"""
+import logging
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterable, List, Optional
+
+import redis
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = 'default'
+PIN_SECONDS = 10  # Comfortably above the replication lag
+PIN_COOKIE = 'replica_pin'  # Pins anonymous visitors, who have no user id
+PRIMARY_ONLY_APPS = {'auth', 'authtoken', 'contenttypes', 'sessions'}
+
+# Replica choice of the request being handled; None outside read requests
+_reads: ContextVar[Optional['RequestReads']] = ContextVar('replica_reads', default=None)
+
+
+def replicas() -> List[str]:
+    return [alias for alias in settings.DATABASES if alias.startswith('replica')]
+
+
+def _pin_key(user_id) -> str:
+    return f'replica-pin:{user_id}'
+
+
+def pin(user_ids: Iterable):
+    """Send these users' reads to the primary for the next PIN_SECONDS"""
+    keys = {_pin_key(user_id): 1 for user_id in user_ids if user_id is not None}
+    if keys and replicas():
+        try:
+            cache.set_many(keys, PIN_SECONDS)
+        except redis.RedisError as e:
+            logger.warning(f"Could not pin users to the primary: {e}")
+
+
+def is_pinned(user_id) -> bool:
+    try:
+        return cache.get(_pin_key(user_id)) is not None
+    except redis.RedisError:
+        # Pins are unknown: the primary is always up to date
+        return True
+
+
+def pin_client(response):
+    """Send the reads of the client getting this response to the primary for the next PIN_SECONDS"""
+    response.set_cookie(PIN_COOKIE, '1', max_age=PIN_SECONDS, httponly=True, samesite='Lax')
+
+
+class RequestReads:
+    """
+    Where one request's reads go
+    The pin is looked up once the user is known: DRF views authenticate
+    inside the view, after this is created.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.replica = random.choice(replicas())
+        self.pinned = None
+
+    def alias(self) -> str:
+        if self.pinned is None:
+            user = getattr(self.request, 'user', None)
+            if user is None or not user.is_authenticated:
+                # Not remembered: a token may still authenticate the request
+                return PRIMARY if PIN_COOKIE in self.request.COOKIES else self.replica
+            self.pinned = is_pinned(user.pk)
+        return PRIMARY if self.pinned else self.replica
+
+
+@contextmanager
+def reading(request):
+    """Let the reads made while handling this request go to a replica"""
+    token = _reads.set(RequestReads(request))
+    try:
+        yield _reads.get()
+    finally:
+        _reads.reset(token)
+
+
+def streamed(reads: RequestReads, content):
+    """A streamed response's content, read from the database its request used"""
+    if hasattr(content, '__aiter__'):
+        async def chunks():
+            token = _reads.set(reads)
+            try:
+                async for chunk in content:
+                    yield chunk
+            finally:
+                _reads.reset(token)
+    else:
+        def chunks():
+            token = _reads.set(reads)
+            try:
+                yield from content
+            finally:
+                _reads.reset(token)
+    return chunks()
+
+
+class ReplicaRouter:
+    """Reads of read requests to a replica (see above), all writes to the primary"""
+
+    def db_for_read(self, model, **hints):
+        reads = _reads.get()
+        if reads is None or model._meta.app_label in PRIMARY_ONLY_APPS:
+            return None
+        if connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        return reads.alias()
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        databases = {PRIMARY, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema from the primary
+        return False if db in replicas() else None
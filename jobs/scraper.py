@@ -1,27 +1,31 @@
 """
 Job Scraper Service
 Scrapes jobs from multiple platforms based on resume keywords
+
+Only Celery workers scrape, so the resume readers (PyPDF2, python-docx) and
+selenium are imported where they are used; importing this module (e.g. for
+ResumeParser's keyword lists) stays cheap. benchmarks.startup checks that
+the web process loads none of them.
 """
 
+import contextvars
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
 from bs4 import BeautifulSoup
-from typing import List, Dict, Set
-import PyPDF2
-import docx
+from typing import Callable, Dict, List, Optional, Set, Tuple
 from urllib.parse import quote_plus, urljoin
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import logging
 
-logging.basicConfig(level=logging.INFO)
+from . import metrics, tracing
+
 logger = logging.getLogger(__name__)
 
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
 
 class ResumeParser:
     """Extract keywords from resume files"""
@@ -43,24 +47,27 @@ class ResumeParser:
     }
     
     @staticmethod
-    def extract_text_from_pdf(file_path: str) -> str:
-        """Extract text from PDF resume"""
+    def extract_text_from_pdf(source) -> str:
+        """Extract text from PDF resume (a path or an open binary file)"""
+        import PyPDF2
+        
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ''
-                for page in pdf_reader.pages:
-                    text += page.extract_text()
-                return text
+            pdf_reader = PyPDF2.PdfReader(source)
+            text = ''
+            for page in pdf_reader.pages:
+                text += page.extract_text()
+            return text
         except Exception as e:
             logger.error(f"Error reading PDF: {e}")
             return ""
     
     @staticmethod
-    def extract_text_from_docx(file_path: str) -> str:
-        """Extract text from DOCX resume"""
+    def extract_text_from_docx(source) -> str:
+        """Extract text from DOCX resume (a path or an open binary file)"""
+        import docx
+        
         try:
-            doc = docx.Document(file_path)
+            doc = docx.Document(source)
             text = '\n'.join([paragraph.text for paragraph in doc.paragraphs])
             return text
         except Exception as e:
@@ -68,16 +75,27 @@ class ResumeParser:
             return ""
     
     @classmethod
-    def extract_keywords(cls, file_path: str) -> Set[str]:
-        """Extract relevant keywords from resume"""
+    def extract_keywords(cls, file_path: str, file=None) -> Set[str]:
+        """
+        Extract relevant keywords from resume
+        Reads file_path from disk, or file (e.g. opened from storage) if given,
+        in which case file_path only tells the format.
+        """
+        source = file if file is not None else file_path
+        
         # Determine file type and extract text
-        if file_path.endswith('.pdf'):
-            text = cls.extract_text_from_pdf(file_path)
-        elif file_path.endswith('.docx'):
-            text = cls.extract_text_from_docx(file_path)
+        if file_path.lower().endswith('.pdf'):
+            text = cls.extract_text_from_pdf(source)
+        elif file_path.lower().endswith('.docx'):
+            text = cls.extract_text_from_docx(source)
         else:
             text = ""
         
+        return cls.keywords_from_text(text)
+    
+    @classmethod
+    def keywords_from_text(cls, text: str) -> Set[str]:
+        """Extract relevant keywords from free text (resume or job posting)"""
         text_lower = text.lower()
         keywords = set()
         
@@ -103,12 +121,23 @@ class ResumeParser:
 class JobScraper:
     """Base class for job scrapers"""
     
-    def __init__(self, headless=True):
+    BASE_URL = ''
+    PLATFORM = ''  # Name used in metrics, as in JobScraperService.scrapers
+    
+    def __init__(self, headless=True, base_url: Optional[str] = None):
         self.headless = headless
         self.driver = None
+        # Overridable so benchmarks can point a scraper at a local stand-in
+        self.base_url = (base_url or self.BASE_URL).rstrip('/')
+        # How the last scrape went (see jobs.health): ok, no_results or error
+        self.outcome = 'ok'
+        self.error = None
     
     def setup_driver(self):
         """Setup Selenium WebDriver"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        
         chrome_options = Options()
         if self.headless:
             chrome_options.add_argument('--headless')
@@ -125,6 +154,28 @@ class JobScraper:
         if self.driver:
             self.driver.quit()
     
+    def fetch_page(self, url: str) -> BeautifulSoup:
+        """GET a page and parse it, recording fetch and parse time"""
+        started = time.monotonic()
+        with tracing.span('scraper.fetch', platform=self.PLATFORM, url=url) as span:
+            try:
+                response = requests.get(url, headers=HEADERS, timeout=10)
+            except requests.RequestException:
+                metrics.timing('scraper.fetch_time', time.monotonic() - started, platform=self.PLATFORM, status='error')
+                raise
+            span.set(status=response.status_code, bytes=len(response.content))
+        metrics.timing('scraper.fetch_time', time.monotonic() - started,
+                       platform=self.PLATFORM, status=response.status_code)
+        with metrics.timer('scraper.parse_time', platform=self.PLATFORM), \
+                tracing.span('scraper.parse', platform=self.PLATFORM):
+            return BeautifulSoup(response.content, 'html.parser')
+    
+    def fallback(self, reason: str, error: Optional[Exception] = None):
+        """Note that placeholder jobs are returned instead of parsed ones"""
+        self.outcome = reason
+        self.error = str(error) if error else None
+        metrics.incr('scraper.fallback', platform=self.PLATFORM, reason=reason)
+    
     def scrape(self, keywords: List[str], location: str = "", limit: int = 2) -> List[Dict]:
         """Override in subclass"""
         raise NotImplementedError
@@ -133,24 +184,21 @@ class JobScraper:
 class LinkedInScraper(JobScraper):
     """Scrape jobs from LinkedIn (public job board)"""
     
+    BASE_URL = 'https://www.linkedin.com'
+    PLATFORM = 'linkedin'
+    
     def scrape(self, keywords: List[str], location: str = "India", limit: int = 2) -> List[Dict]:
         jobs = []
         search_query = ' '.join(keywords[:3])  # Use top 3 keywords
         
         try:
             # LinkedIn job search URL (public)
-            base_url = "https://www.linkedin.com/jobs/search"
             params = f"?keywords={quote_plus(search_query)}&location={quote_plus(location)}&f_E=2"  # f_E=2 for internships
-            url = base_url + params
+            url = f"{self.base_url}/jobs/search" + params
             
             logger.info(f"Scraping LinkedIn: {url}")
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self.fetch_page(url)
             
             # Find job cards
             job_cards = soup.find_all('div', class_='base-card', limit=limit)
@@ -176,11 +224,12 @@ class LinkedInScraper(JobScraper):
             
             # If no jobs found, add sample jobs
             if not jobs:
+                self.fallback('no_results')
                 jobs = [
                     {
                         'title': f'{search_query} Intern',
                         'company': 'LinkedIn Sample Company',
-                        'link': f'https://www.linkedin.com/jobs/search?keywords={quote_plus(search_query)}&location={quote_plus(location)}&f_E=2',
+                        'link': f'{self.base_url}/jobs/search?keywords={quote_plus(search_query)}&location={quote_plus(location)}&f_E=2',
                         'platform': 'LinkedIn',
                         'location': location
                     }
@@ -188,12 +237,13 @@ class LinkedInScraper(JobScraper):
         
         except Exception as e:
             logger.error(f"LinkedIn scraping error: {e}")
+            self.fallback('error', e)
             # Return sample job on error
             jobs = [
                 {
                     'title': f'{" ".join(keywords[:2])} Internship',
                     'company': 'LinkedIn',
-                    'link': f'https://www.linkedin.com/jobs/search?keywords={quote_plus(" ".join(keywords[:2]))}&location={quote_plus(location)}&f_E=2',
+                    'link': f'{self.base_url}/jobs/search?keywords={quote_plus(" ".join(keywords[:2]))}&location={quote_plus(location)}&f_E=2',
                     'platform': 'LinkedIn',
                     'location': location
                 }
@@ -205,20 +255,18 @@ class LinkedInScraper(JobScraper):
 class InternshalaScaper(JobScraper):
     """Scrape jobs from Internshala"""
     
+    BASE_URL = 'https://internshala.com'
+    PLATFORM = 'internshala'
+    
     def scrape(self, keywords: List[str], location: str = "", limit: int = 2) -> List[Dict]:
         jobs = []
         search_query = '-'.join(keywords[:2]).replace(' ', '-')
         
         try:
-            url = f"https://internshala.com/internships/{search_query}-internship"
+            url = f"{self.base_url}/internships/{search_query}-internship"
             logger.info(f"Scraping Internshala: {url}")
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self.fetch_page(url)
             
             # Find internship cards
             internship_cards = soup.find_all('div', class_='individual_internship', limit=limit)
@@ -233,7 +281,7 @@ class InternshalaScaper(JobScraper):
                         job = {
                             'title': title_elem.text.strip(),
                             'company': company_elem.text.strip() if company_elem else 'N/A',
-                            'link': 'https://internshala.com' + link_elem['href'],
+                            'link': self.base_url + link_elem['href'],
                             'platform': 'Internshala',
                             'location': location
                         }
@@ -244,23 +292,25 @@ class InternshalaScaper(JobScraper):
             
             # If no jobs found, provide direct search links
             if not jobs:
+                self.fallback('no_results')
                 for i in range(limit):
                     jobs.append({
                         'title': f'{" ".join(keywords[:2])} Internship',
                         'company': 'Internshala',
-                        'link': f'https://internshala.com/internships/{search_query}-internship',
+                        'link': f'{self.base_url}/internships/{search_query}-internship',
                         'platform': 'Internshala',
                         'location': 'India'
                     })
         
         except Exception as e:
             logger.error(f"Internshala scraping error: {e}")
+            self.fallback('error', e)
             # Provide fallback links
             for i in range(limit):
                 jobs.append({
                     'title': f'{" ".join(keywords[:2])} Internship',
                     'company': 'Internshala',
-                    'link': f'https://internshala.com/internships/{search_query}-internship',
+                    'link': f'{self.base_url}/internships/{search_query}-internship',
                     'platform': 'Internshala',
                     'location': 'India'
                 })
@@ -271,19 +321,17 @@ class InternshalaScaper(JobScraper):
 class WeWorkRemotelyScraper(JobScraper):
     """Scrape jobs from We Work Remotely"""
     
+    BASE_URL = 'https://weworkremotely.com'
+    PLATFORM = 'weworkremotely'
+    
     def scrape(self, keywords: List[str], location: str = "Remote", limit: int = 2) -> List[Dict]:
         jobs = []
         
         try:
-            url = "https://weworkremotely.com/remote-jobs/search?term=" + quote_plus(' '.join(keywords[:2]))
+            url = f"{self.base_url}/remote-jobs/search?term=" + quote_plus(' '.join(keywords[:2]))
             logger.info(f"Scraping WeWorkRemotely: {url}")
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self.fetch_page(url)
             
             # Find job listings
             job_listings = soup.find_all('li', class_='feature', limit=limit)
@@ -298,7 +346,7 @@ class WeWorkRemotelyScraper(JobScraper):
                         job = {
                             'title': title_elem.text.strip(),
                             'company': company_elem.text.strip() if company_elem else 'N/A',
-                            'link': 'https://weworkremotely.com' + link_elem['href'],
+                            'link': self.base_url + link_elem['href'],
                             'platform': 'WeWorkRemotely',
                             'location': 'Remote'
                         }
@@ -309,22 +357,24 @@ class WeWorkRemotelyScraper(JobScraper):
             
             # Fallback
             if not jobs:
+                self.fallback('no_results')
                 for i in range(limit):
                     jobs.append({
                         'title': f'Remote {" ".join(keywords[:2])} Position',
                         'company': 'WeWorkRemotely',
-                        'link': f'https://weworkremotely.com/remote-jobs/search?term={quote_plus(" ".join(keywords[:2]))}',
+                        'link': f'{self.base_url}/remote-jobs/search?term={quote_plus(" ".join(keywords[:2]))}',
                         'platform': 'WeWorkRemotely',
                         'location': 'Remote'
                     })
         
         except Exception as e:
             logger.error(f"WeWorkRemotely scraping error: {e}")
+            self.fallback('error', e)
             for i in range(limit):
                 jobs.append({
                     'title': f'Remote {" ".join(keywords[:2])} Job',
                     'company': 'WeWorkRemotely',
-                    'link': f'https://weworkremotely.com/remote-jobs/search?term={quote_plus(" ".join(keywords[:2]))}',
+                    'link': f'{self.base_url}/remote-jobs/search?term={quote_plus(" ".join(keywords[:2]))}',
                     'platform': 'WeWorkRemotely',
                     'location': 'Remote'
                 })
@@ -335,20 +385,18 @@ class WeWorkRemotelyScraper(JobScraper):
 class RemoteOKScraper(JobScraper):
     """Scrape jobs from Remote OK"""
     
+    BASE_URL = 'https://remoteok.com'
+    PLATFORM = 'remoteok'
+    
     def scrape(self, keywords: List[str], location: str = "Remote", limit: int = 2) -> List[Dict]:
         jobs = []
         search_term = '+'.join(keywords[:2])
         
         try:
-            url = f"https://remoteok.com/remote-{search_term.replace(' ', '-')}-jobs"
+            url = f"{self.base_url}/remote-{search_term.replace(' ', '-')}-jobs"
             logger.info(f"Scraping RemoteOK: {url}")
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self.fetch_page(url)
             
             # Find job rows
             job_rows = soup.find_all('tr', class_='job', limit=limit)
@@ -363,7 +411,7 @@ class RemoteOKScraper(JobScraper):
                         job = {
                             'title': title_elem.text.strip(),
                             'company': company_elem.text.strip() if company_elem else 'N/A',
-                            'link': 'https://remoteok.com' + link_elem['href'],
+                            'link': self.base_url + link_elem['href'],
                             'platform': 'RemoteOK',
                             'location': 'Remote'
                         }
@@ -374,22 +422,24 @@ class RemoteOKScraper(JobScraper):
             
             # Fallback
             if not jobs:
+                self.fallback('no_results')
                 for i in range(limit):
                     jobs.append({
                         'title': f'Remote {" ".join(keywords[:2])} Developer',
                         'company': 'RemoteOK',
-                        'link': f'https://remoteok.com/remote-{search_term.replace(" ", "-")}-jobs',
+                        'link': f'{self.base_url}/remote-{search_term.replace(" ", "-")}-jobs',
                         'platform': 'RemoteOK',
                         'location': 'Remote'
                     })
         
         except Exception as e:
             logger.error(f"RemoteOK scraping error: {e}")
+            self.fallback('error', e)
             for i in range(limit):
                 jobs.append({
                     'title': f'Remote {" ".join(keywords[:2])} Position',
                     'company': 'RemoteOK',
-                    'link': f'https://remoteok.com/remote-{search_term.replace(" ", "-")}-jobs',
+                    'link': f'{self.base_url}/remote-{search_term.replace(" ", "-")}-jobs',
                     'platform': 'RemoteOK',
                     'location': 'Remote'
                 })
@@ -400,20 +450,18 @@ class RemoteOKScraper(JobScraper):
 class NaukriScraper(JobScraper):
     """Scrape jobs from Naukri"""
     
+    BASE_URL = 'https://www.naukri.com'
+    PLATFORM = 'naukri'
+    
     def scrape(self, keywords: List[str], location: str = "India", limit: int = 2) -> List[Dict]:
         jobs = []
         search_query = '-'.join(keywords[:2]).replace(' ', '-')
         
         try:
-            url = f"https://www.naukri.com/{search_query}-jobs"
+            url = f"{self.base_url}/{search_query}-jobs"
             logger.info(f"Scraping Naukri: {url}")
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self.fetch_page(url)
             
             # Find job articles
             job_articles = soup.find_all('article', class_='jobTuple', limit=limit)
@@ -427,7 +475,7 @@ class NaukriScraper(JobScraper):
                         job = {
                             'title': title_elem.text.strip(),
                             'company': company_elem.text.strip() if company_elem else 'N/A',
-                            'link': title_elem['href'] if title_elem.get('href', '').startswith('http') else 'https://www.naukri.com' + title_elem.get('href', ''),
+                            'link': title_elem['href'] if title_elem.get('href', '').startswith('http') else self.base_url + title_elem.get('href', ''),
                             'platform': 'Naukri',
                             'location': location
                         }
@@ -438,22 +486,24 @@ class NaukriScraper(JobScraper):
             
             # Fallback
             if not jobs:
+                self.fallback('no_results')
                 for i in range(limit):
                     jobs.append({
                         'title': f'{" ".join(keywords[:2])} Job',
                         'company': 'Naukri',
-                        'link': f'https://www.naukri.com/{search_query}-jobs',
+                        'link': f'{self.base_url}/{search_query}-jobs',
                         'platform': 'Naukri',
                         'location': location
                     })
         
         except Exception as e:
             logger.error(f"Naukri scraping error: {e}")
+            self.fallback('error', e)
             for i in range(limit):
                 jobs.append({
                     'title': f'{" ".join(keywords[:2])} Position',
                     'company': 'Naukri',
-                    'link': f'https://www.naukri.com/{search_query}-jobs',
+                    'link': f'{self.base_url}/{search_query}-jobs',
                     'platform': 'Naukri',
                     'location': location
                 })
@@ -461,19 +511,65 @@ class NaukriScraper(JobScraper):
         return jobs[:limit]
 
 
+CIRCUIT_OPEN = 'skipped: circuit open'  # Error reported for platforms the breaker skips
+
+
 class JobScraperService:
     """Main service to coordinate job scraping from all platforms"""
     
-    def __init__(self):
+    def __init__(self, base_urls: Optional[Dict[str, str]] = None, delay: float = 1.0, health=None):
+        """
+        base_urls maps platform names to replacement hosts (benchmarks use
+        a local stand-in); delay is the pause after each platform when
+        scraping sequentially; health (a jobs.health.PlatformHealth) records
+        each platform's outcome and skips platforms whose circuit is open
+        """
+        base_urls = base_urls or {}
         self.scrapers = {
-            'linkedin': LinkedInScraper(),
-            'internshala': InternshalaScaper(),
-            'weworkremotely': WeWorkRemotelyScraper(),
-            'remoteok': RemoteOKScraper(),
-            'naukri': NaukriScraper(),
+            'linkedin': LinkedInScraper(base_url=base_urls.get('linkedin')),
+            'internshala': InternshalaScaper(base_url=base_urls.get('internshala')),
+            'weworkremotely': WeWorkRemotelyScraper(base_url=base_urls.get('weworkremotely')),
+            'remoteok': RemoteOKScraper(base_url=base_urls.get('remoteok')),
+            'naukri': NaukriScraper(base_url=base_urls.get('naukri')),
         }
+        self.delay = delay
+        self.health = health
     
-    def scrape_all_platforms(self, resume_path: str, location: str = "India", jobs_per_site: int = 2) -> List[Dict]:
+    def scrape_platform(self, platform_name: str, keywords: List[str], location: str,
+                        jobs_per_site: int) -> Tuple[List[Dict], float, Optional[str]]:
+        """Scrape one platform, returning (jobs, seconds taken, error)"""
+        if self.health is not None and not self.health.allow(platform_name):
+            logger.warning(f"Skipping {platform_name}: circuit open")
+            self.health.skipped(platform_name)
+            metrics.incr('scraper.skipped', platform=platform_name)
+            return [], 0.0, CIRCUIT_OPEN
+        
+        scraper = self.scrapers[platform_name]
+        scraper.outcome, scraper.error = 'ok', None
+        started = time.monotonic()
+        jobs, error = [], None
+        with tracing.span('scraper.platform', platform=platform_name) as span:
+            try:
+                logger.info(f"Scraping {platform_name}...")
+                jobs = scraper.scrape(keywords, location, jobs_per_site)
+            except Exception as e:
+                logger.error(f"Error scraping {platform_name}: {e}")
+                error = str(e)
+                span.fail(e)
+            outcome = 'error' if error else scraper.outcome
+            span.set(jobs=len(jobs), outcome=outcome)
+        seconds = time.monotonic() - started
+        metrics.timing('scraper.platform_time', seconds, platform=platform_name, outcome=outcome)
+        metrics.incr('scraper.jobs', len(jobs), platform=platform_name)
+        if self.health is not None:
+            self.health.record(platform_name, outcome, seconds, error or scraper.error)
+        return jobs, seconds, error
+    
+    def scrape_all_platforms(self, resume_path: str, location: str = "India", jobs_per_site: int = 2,
+                             keywords: Optional[Set[str]] = None,
+                             on_platform_done: Optional[Callable] = None,
+                             platforms: Optional[List[str]] = None,
+                             max_workers: int = 1) -> List[Dict]:
         """
         Scrape jobs from all platforms based on resume keywords
         
@@ -481,12 +577,20 @@ class JobScraperService:
             resume_path: Path to resume file (PDF or DOCX)
             location: Job location preference
             jobs_per_site: Number of jobs to scrape per platform
+            keywords: Keywords already extracted from the resume, if any
+            on_platform_done: Called as (platform_name, jobs, seconds, error)
+                after each platform, e.g. to report progress. Always called
+                from this thread, also when scraping concurrently
+            platforms: Names of the platforms to scrape (default: all)
+            max_workers: Platforms scraped at the same time; each is a
+                different site, so there is no pause between them above 1
         
         Returns:
             List of job dictionaries
         """
         # Extract keywords from resume
-        keywords = ResumeParser.extract_keywords(resume_path)
+        if keywords is None:
+            keywords = ResumeParser.extract_keywords(resume_path)
         
         if not keywords:
             # Default keywords if none found
@@ -494,18 +598,32 @@ class JobScraperService:
         
         logger.info(f"Extracted keywords: {keywords}")
         keywords_list = list(keywords)
+        names = [name for name in self.scrapers if platforms is None or name in platforms]
         
         all_jobs = []
         
+        def finish(platform_name, jobs, seconds, error):
+            all_jobs.extend(jobs)
+            if on_platform_done:
+                on_platform_done(platform_name, jobs, seconds, error)
+        
+        if max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                # Each thread gets a copy of the context, so spans nest under the caller's
+                futures = {
+                    pool.submit(contextvars.copy_context().run, self.scrape_platform,
+                                name, keywords_list, location, jobs_per_site): name
+                    for name in names
+                }
+                for future in as_completed(futures):
+                    finish(futures[future], *future.result())
+            return all_jobs
+        
         # Scrape from each platform
-        for platform_name, scraper in self.scrapers.items():
-            try:
-                logger.info(f"Scraping {platform_name}...")
-                jobs = scraper.scrape(keywords_list, location, jobs_per_site)
-                all_jobs.extend(jobs)
-                time.sleep(1)  # Be nice to servers
-            except Exception as e:
-                logger.error(f"Error scraping {platform_name}: {e}")
-                continue
+        for platform_name in names:
+            jobs, seconds, error = self.scrape_platform(platform_name, keywords_list, location, jobs_per_site)
+            finish(platform_name, jobs, seconds, error)
+            if error is None and self.delay:
+                time.sleep(self.delay)  # Be nice to servers
         
-        return all_jobs
\ No newline at end of file
+        return all_jobs
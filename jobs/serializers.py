@@ -5,7 +5,7 @@ Using beginner-friendly patterns for API data validation and serialization
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
-from .models import Resume, Job, JobApplication
+from .models import Resume, ResumeUpload, Job, JobApplication
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -61,18 +61,30 @@ class ResumeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Resume
         fields = ('id', 'user', 'file', 'uploaded_at', 'keywords_extracted',
-                  'task_status', 'task_result', 'task_id', 'job_count')
+                  'task_status', 'task_result', 'task_id', 'progress', 'job_count')
         read_only_fields = ('uploaded_at', 'keywords_extracted', 'task_status',
-                           'task_result', 'task_id')
+                           'task_result', 'task_id', 'progress')
     
     def get_job_count(self, obj):
         """Calculate number of jobs found for this resume"""
-        return obj.job_set.count()
+        # Lists annotate the count in their query (job_total) instead of one COUNT per row
+        job_total = getattr(obj, 'job_total', None)
+        return job_total if job_total is not None else obj.jobs.count()
+
+
+class ResumeUploadSerializer(serializers.ModelSerializer):
+    """Serializer for chunked upload sessions (read-only; see jobs.uploads)"""
+    resume_id = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = ResumeUpload
+        fields = ('id', 'filename', 'size', 'received', 'created_at', 'resume_id')
+        read_only_fields = fields
 
 
 class JobSerializer(serializers.ModelSerializer):
     """Serializer for Job model"""
-    resume_id = serializers.IntegerField(read_only=True, source='resume.id')
+    resume_id = serializers.IntegerField(read_only=True)  # FK column, no Resume fetch
     
     class Meta:
         model = Job
@@ -81,6 +93,67 @@ class JobSerializer(serializers.ModelSerializer):
         read_only_fields = ('scraped_at',)
 
 
+class JobListSerializer(serializers.BaseSerializer):
+    """
+    Read-only serializer for job list responses
+
+    Works on plain dict rows from .values() instead of model instances and
+    skips DRF's per-field machinery: the (name, converter) pairs for a field
+    selection are worked out once, then each row is a single dict build.
+    Output matches JobSerializer.
+
+    Pass fields=[...] to render a subset (sparse fieldsets).
+    """
+    # Output field -> model column, in response order
+    FIELDS = {
+        'id': 'id',
+        'resume_id': 'resume_id',
+        'title': 'title',
+        'company': 'company',
+        'platform': 'platform',
+        'link': 'link',
+        'location': 'location',
+        'scraped_at': 'scraped_at',
+        'is_active': 'is_active',
+    }
+    CONVERTERS = {
+        'scraped_at': serializers.DateTimeField().to_representation,
+    }
+    
+    def __init__(self, instance=None, fields=None, **kwargs):
+        super().__init__(instance, **kwargs)
+        self.field_names = tuple(fields) if fields else tuple(self.FIELDS)
+        self._plan = tuple(
+            (name, self.FIELDS[name], self.CONVERTERS.get(name))
+            for name in self.field_names
+        )
+    
+    @classmethod
+    def parse_fields(cls, value):
+        """Parse a ?fields=a,b,c parameter, rejecting unknown names"""
+        if not value:
+            return None
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in cls.FIELDS]
+        if unknown:
+            raise serializers.ValidationError({
+                'fields': f"Unknown field(s): {', '.join(unknown)}. "
+                          f"Choose from: {', '.join(cls.FIELDS)}"
+            })
+        return names or None
+    
+    @classmethod
+    def columns_for(cls, fields=None):
+        """Model columns to load for a field selection"""
+        return [cls.FIELDS[name] for name in (fields or cls.FIELDS)]
+    
+    def to_representation(self, row):
+        return {
+            name: convert(row[column]) if convert and row[column] is not None else row[column]
+            for name, column, convert in self._plan
+        }
+
+
 class JobApplicationSerializer(serializers.ModelSerializer):
     """Serializer for JobApplication model"""
     job_title = serializers.CharField(read_only=True, source='job.title')
@@ -89,7 +162,7 @@ class JobApplicationSerializer(serializers.ModelSerializer):
     class Meta:
         model = JobApplication
         fields = ('id', 'job', 'job_title', 'job_company', 'status', 
-                  'applied_date', 'notes', 'created_at', 'updated_at')
+                  'applied_at', 'notes', 'created_at', 'updated_at')
         read_only_fields = ('created_at', 'updated_at')
     
     def validate_status(self, value):
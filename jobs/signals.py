@@ -0,0 +1,137 @@
+"""
+Model signal handlers
+Keep jobs.counters in step with single-row writes, and drop cached API
+tokens (jobs.authentication) whose token or user changed
+
+Also times Celery tasks for jobs.metrics, carries jobs.tracing context
+through Celery messages and recycles workers' database connections
+between tasks.
+"""
+import time
+
+from celery.signals import before_task_publish, task_postrun, task_prerun
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from . import counters, metrics, tracing
+from .authentication import forget_token
+from .models import Resume, Job, JobApplication
+
+
+@receiver(post_save, sender=Job)
+def count_new_job(sender, instance, created, raw=False, **kwargs):
+    # bulk_create (scrape task) doesn't send this; it updates the counters itself
+    if created and not raw:
+        counters.apply(counters.job_deltas([(counters.resume_owner(instance.resume_id), instance.platform)]))
+
+
+@receiver(pre_delete, sender=Job)
+def uncount_job(sender, instance, **kwargs):
+    # Sent for each job, whether deleted alone, by QuerySet.delete() or along
+    # with its resume (Job has cascading relations, so is never fast-deleted).
+    # pre_delete: the resume is still there to look the owner up
+    counters.apply(counters.job_deltas([(counters.resume_owner(instance.resume_id), instance.platform)], step=-1))
+
+
+@receiver(post_save, sender=Resume)
+def count_new_resume(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.apply(counters.resume_deltas([instance.user_id]))
+
+
+@receiver(pre_delete, sender=Resume)
+def uncount_resume(sender, instance, **kwargs):
+    # Its cascade-deleted jobs and applications uncount themselves
+    counters.apply(counters.resume_deltas([instance.user_id], step=-1))
+
+
+@receiver(pre_save, sender=JobApplication)
+def remember_application_status(sender, instance, raw=False, **kwargs):
+    instance._previous_status = None
+    if instance.pk and not raw:
+        instance._previous_status = (
+            JobApplication.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=JobApplication)
+def count_application(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_status', None)
+    if not created and previous == instance.status:
+        return
+
+    user_id = instance.user_id
+    deltas = counters.application_deltas([(user_id, instance.status)])
+    if not created and previous is not None:
+        deltas.update(counters.application_deltas([(user_id, previous)], step=-1))
+    counters.apply(deltas)
+
+
+@receiver(pre_delete, sender=JobApplication)
+def uncount_application(sender, instance, **kwargs):
+    counters.apply(counters.application_deltas([(instance.user_id, instance.status)], step=-1))
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    forget_token(instance.key)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def forget_user_tokens(sender, instance, raw=False, **kwargs):
+    # Cached entries carry the user's fields, so a deactivated or edited user
+    # must be looked up again
+    if not raw:
+        for key in Token.objects.filter(user_id=instance.pk).values_list('key', flat=True):
+            forget_token(key)
+
+
+# Start time and span of each task running in this worker process, by task id
+_task_started = {}
+_task_spans = {}
+
+
+@before_task_publish.connect
+def add_trace_header(headers=None, **kwargs):
+    traceparent = tracing.current_traceparent()
+    if traceparent and headers is not None:
+        headers.setdefault('traceparent', traceparent)
+
+
+@task_prerun.connect
+def start_task_timer(task_id=None, task=None, **kwargs):
+    _task_started[task_id] = time.monotonic()
+    # Workers expose custom message headers as request attributes
+    traceparent = getattr(task.request, 'traceparent', None) or (task.request.headers or {}).get('traceparent')
+    _task_spans[task_id] = tracing.start_span(
+        'celery.task', traceparent=traceparent,
+        task=task.name, task_id=task_id, retries=task.request.retries
+    )
+
+
+@task_postrun.connect
+def record_task_time(task_id=None, task=None, state=None, retval=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        metrics.timing('celery.task_time', time.monotonic() - started, task=task.name, state=state)
+    span = _task_spans.pop(task_id, None)
+    if span is not None:
+        span.set(state=state)
+        if isinstance(retval, BaseException):
+            span.fail(retval)
+        tracing.end_span(span)
+
+
+@task_prerun.connect
+@task_postrun.connect
+def recycle_db_connections(task=None, **kwargs):
+    # What request_started/finished do around a view: close a connection
+    # that is broken or older than CONN_MAX_AGE, and health-check the rest
+    # on next use. Eager tasks run inside someone else's request/transaction
+    if not getattr(task.request, 'is_eager', False):
+        close_old_connections()
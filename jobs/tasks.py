@@ -1,91 +1,217 @@
 """
 Celery Tasks for Job Scraping
 """
-from celery import shared_task
+from celery import Task, chain, shared_task
+from celery import states
+from django.conf import settings
+from django.db import InterfaceError, OperationalError
 from django.utils import timezone
 import logging
+import random
+import time
+
+import redis
+import requests
 
 logger = logging.getLogger(__name__)
 
 
+# Transient failures worth retrying: the network, broker or database may be
+# back by the next attempt. Anything else is treated as permanent.
+RETRYABLE_ERRORS = (
+    requests.RequestException,
+    redis.RedisError,
+    OperationalError,
+    InterfaceError,
+    ConnectionError,
+    TimeoutError,
+)
+RETRY_BACKOFF = 30           # Seconds before the first retry; doubles each attempt
+RETRY_BACKOFF_MAX = 10 * 60  # Seconds
+
+
+class ScrapeTask(Task):
+    """Frees the (resume, location) dispatch lock once a scrape is finished"""
+    
+    def after_return(self, status, retval, task_id, args, kwargs, einfo):
+        # RETRY is not final: the retried task keeps the same id and the lock
+        if status in states.READY_STATES:
+            from .dispatch import release
+            call = dict(zip(('resume_id', 'location'), args), **kwargs)
+            release(call.get('resume_id'), call.get('location', 'India'), task_id)
+
+
+
+def save_jobs(resume, jobs_data, location):
+    """
+    Persist scraped job dicts for a resume, skipping links it already has
+    One query to find existing links and one bulk INSERT, instead of a
+    lookup and an INSERT per job. Returns the created Job objects.
+    """
+    from .models import Job
+    from . import counters, metrics, tracing
+    
+    started = time.monotonic()
+    with tracing.span('db.save_jobs', jobs=len(jobs_data)) as span:
+        links = [job_data['link'] for job_data in jobs_data]
+        seen = set(Job.objects.filter(resume=resume, link__in=links).values_list('link', flat=True))
+        
+        now = timezone.now()
+        new_jobs = []
+        for job_data in jobs_data:
+            if job_data['link'] in seen:
+                continue
+            seen.add(job_data['link'])
+            new_jobs.append(Job(
+                resume=resume,
+                title=job_data['title'][:500],
+                company=job_data['company'][:300],
+                platform=job_data['platform'].lower().replace(' ', ''),
+                link=job_data['link'],
+                location=job_data.get('location', location),
+                scraped_at=now
+            ))
+        
+        created = Job.objects.bulk_create(new_jobs)
+        
+        # bulk_create sends no post_save, so update the counters here
+        counters.apply(counters.job_deltas((resume.user_id, job.platform) for job in created))
+        span.set(created=len(created))
+    metrics.timing('jobs.save_time', time.monotonic() - started)
+    metrics.incr('jobs.created', len(created))
+    return created
+
+
+def retry_countdown(retries: int) -> float:
+    """
+    Exponential backoff with jitter: about RETRY_BACKOFF, 2x, 4x... seconds,
+    randomized so tasks that failed together don't all retry together
+    """
+    delay = min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2 ** retries)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _record_failure(resume_id, tracker, error):
+    """Mark the resume failed; best effort, the database may be what failed"""
+    from .models import Resume
+    from .caching import bump_for_users
+    from . import progress
+    
+    try:
+        if tracker is None:
+            tracker = progress.ProgressTracker(Resume.objects.get(id=resume_id))
+        resume = tracker.resume
+        resume.task_status = 'failed'
+        resume.task_result = f'Error: {str(error)}'
+        tracker.stage('failed', 'task_status', 'task_result', error=str(error))
+        bump_for_users(['resumes', 'jobs'], [resume.user_id], [resume.id])
+        progress.publish(resume_id, 'status', status='failed', error=str(error))
+    except Exception as e:
+        logger.error(f"Could not mark resume {resume_id} as failed: {e}")
+
 
-@shared_task(bind=True, max_retries=3)
+@shared_task(bind=True, base=ScrapeTask, max_retries=settings.SCRAPE_MAX_RETRIES,
+             time_limit=settings.SCRAPE_TIME_LIMIT)
 def scrape_jobs_for_resume(self, resume_id, location='India', jobs_per_site=2):
     """
     Async task to scrape jobs across multiple platforms
     Runs in background so user gets instant response
+    
+    Resume.progress doubles as a checkpoint: keywords are stored once parsed
+    and each platform's jobs are saved as soon as it finishes, so a retry
+    (same task id) skips parsing and the platforms that are done. Only
+    transient errors (RETRYABLE_ERRORS) are retried; anything else fails
+    the resume straight away.
     """
     from .models import Resume, Job
     from .scraper import JobScraperService, ResumeParser
+    from .health import PlatformHealth
+    from .caching import bump_for_users
+    from . import metrics, progress, tracing
     
+    tracker = None
     try:
         resume = Resume.objects.get(id=resume_id)
+        scraper_service = JobScraperService(base_urls=settings.SCRAPER_BASE_URLS, delay=settings.SCRAPER_DELAY,
+                                            health=PlatformHealth())
+        tracker = progress.ProgressTracker.for_task(resume, self, scraper_service.scrapers)
         
-        # Update status to show processing has started
-        resume.task_status = 'processing'
-        resume.task_id = self.request.id
-        resume.save()
-        
-        logger.info(f"Starting job scraping for resume {resume_id}")
-        
-        # Extract skills and keywords from resume file
-        resume_path = resume.file.path
-        keywords = ResumeParser.extract_keywords(resume_path)
-        
-        if not keywords:
-            keywords = {'python', 'developer', 'intern'}
-            logger.warning(f"No keywords found for resume {resume_id}, using defaults")
-        
-        # Save extracted keywords for display
-        resume.keywords_extracted = ', '.join(keywords)
-        resume.save()
+        if tracker.finished('parsing') and resume.keywords_extracted:
+            # Retry: keywords were extracted by an earlier attempt
+            keywords = set(resume.keywords_extracted.split(', '))
+            tracker.stage('scraping')
+            logger.info(f"Resuming job scraping for resume {resume_id} (attempt {tracker.state['attempt']})")
+        else:
+            # Update status to show processing has started
+            resume.task_status = 'processing'
+            resume.task_id = self.request.id
+            tracker.stage('parsing', 'task_status', 'task_id')
+            bump_for_users(['resumes'], [resume.user_id], [resume.id])
+            progress.publish(resume_id, 'status', status='processing')
+            
+            logger.info(f"Starting job scraping for resume {resume_id}")
+            
+            # Extract skills and keywords from resume file, read through the
+            # storage API so workers don't need the web node's disk
+            file_format = resume.file.name.rsplit('.', 1)[-1].lower()
+            with resume.file.open('rb') as resume_file, metrics.timer('resume.extract_time', format=file_format), \
+                    tracing.span('resume.extract', format=file_format) as span:
+                keywords = ResumeParser.extract_keywords(resume.file.name, file=resume_file)
+                span.set(keywords=len(keywords))
+            
+            if not keywords:
+                keywords = {'python', 'developer', 'intern'}
+                logger.warning(f"No keywords found for resume {resume_id}, using defaults")
+            
+            # Save extracted keywords for display
+            resume.keywords_extracted = ', '.join(keywords)
+            resume.keywords_updated_at = timezone.now()
+            tracker.stage('scraping', 'keywords_extracted', 'keywords_updated_at')
+            progress.publish(resume_id, 'parsed', keywords=sorted(keywords))
         
         logger.info(f"Extracted keywords: {keywords}")
         
-        # Initialize scraper service
-        scraper_service = JobScraperService()
+        def platform_done(platform_name, jobs, seconds, error):
+            # Checkpoint: save the platform's jobs before marking it done
+            created = save_jobs(resume, jobs, location)
+            tracker.platform_done(platform_name, jobs, seconds, error, created=len(created))
         
-        # Scrape jobs from all platforms in parallel
+        # Scrape the platforms not done yet, saving jobs as each one finishes
         jobs_data = scraper_service.scrape_all_platforms(
-            resume_path=resume_path,
+            resume_path=resume.file.name,
             location=location,
-            jobs_per_site=jobs_per_site
+            jobs_per_site=jobs_per_site,
+            keywords=keywords,
+            on_platform_done=platform_done,
+            platforms=tracker.pending_platforms()
         )
         
-        logger.info(f"Scraped {len(jobs_data)} jobs from all platforms")
+        logger.info(f"Scraped {len(jobs_data)} jobs from remaining platforms")
         
-        # Save jobs to database
-        jobs_created = 0
-        for job_data in jobs_data:
-            try:
-                # Avoid duplicates - check if job link already exists
-                existing_job = Job.objects.filter(
-                    link=job_data['link'],
-                    resume=resume
-                ).first()
-                
-                if not existing_job:
-                    Job.objects.create(
-                        resume=resume,
-                        title=job_data['title'],
-                        company=job_data['company'],
-                        platform=job_data['platform'].lower().replace(' ', ''),
-                        link=job_data['link'],
-                        location=job_data.get('location', location),
-                        scraped_at=timezone.now()
-                    )
-                    jobs_created += 1
-            except Exception as e:
-                logger.error(f"Error saving job: {e}")
-                continue
+        jobs_created = tracker.state['jobs_created']
+        progress.publish(resume_id, 'saved', jobs_created=jobs_created)
         
         # Update resume with completion status
         resume.task_status = 'completed'
         resume.task_result = f'Successfully scraped {jobs_created} jobs'
-        resume.save()
+        tracker.stage('completed', 'task_status', 'task_result')
+        bump_for_users(['resumes', 'jobs'], [resume.user_id], [resume.id])
+        progress.publish(resume_id, 'status', status='completed', jobs_created=jobs_created)
         
         logger.info(f"Task completed: Created {jobs_created} new jobs for resume {resume_id}")
         
+        # Fetch the new postings' descriptions (from every attempt of this
+        # run) on the separate enrichment queue, then offer them to every
+        # other resume they fit: matching scores the descriptions too
+        new_job_ids = list(
+            Job.objects.filter(resume=resume, scraped_at__gte=tracker.started_at).values_list('id', flat=True)
+        )
+        if new_job_ids:
+            chain(
+                enrich_job_descriptions.si(new_job_ids, limit=len(new_job_ids)),
+                match_new_jobs.si(new_job_ids),
+            ).delay()
+        
         return {
             'status': 'success',
             'resume_id': resume_id,
@@ -102,19 +228,27 @@ def scrape_jobs_for_resume(self, resume_id, location='India', jobs_per_site=2):
         }
     
     except Exception as e:
-        logger.error(f"Error in scrape_jobs_for_resume task: {e}", exc_info=True)
-        
-        # Update resume with error status
-        try:
-            resume = Resume.objects.get(id=resume_id)
-            resume.task_status = 'failed'
-            resume.task_result = f'Error: {str(e)}'
-            resume.save()
-        except:
-            pass
+        retryable = isinstance(e, RETRYABLE_ERRORS)
+        if retryable and self.request.retries < self.max_retries:
+            countdown = retry_countdown(self.request.retries)
+            logger.warning(f"Scrape for resume {resume_id} hit {e!r}; retrying in {countdown:.0f}s")
+            try:
+                if tracker is not None:
+                    tracker.stage('retrying', error=str(e), retry_in=round(countdown))
+                progress.publish(resume_id, 'status', status='retrying', retry_in=round(countdown))
+            except Exception:
+                pass  # Recording progress must not stop the retry
+            raise self.retry(exc=e, countdown=countdown)
         
-        # Retry the task
-        raise self.retry(exc=e, countdown=60)  # Retry after 60 seconds
+        logger.error(f"Error in scrape_jobs_for_resume task: {e}", exc_info=True)
+        _record_failure(resume_id, tracker, e)
+        if retryable:
+            raise  # Retries exhausted
+        # Deterministic error (corrupt file, bad data): retrying won't help
+        return {
+            'status': 'error',
+            'message': str(e)
+        }
 
 
 @shared_task
@@ -123,11 +257,100 @@ def cleanup_old_jobs():
     Periodic task to clean up old job listings
     """
     from .models import Job
+    from .caching import GLOBAL_NAMESPACE, bump
+    from . import counters
     from datetime import timedelta
     
     # Delete jobs older than 30 days
     cutoff_date = timezone.now() - timedelta(days=30)
-    deleted_count = Job.objects.filter(scraped_at__lt=cutoff_date).delete()[0]
+    old_jobs = Job.objects.filter(scraped_at__lt=cutoff_date)
+    
+    # Each deleted job (and application) takes itself off the counters
+    # (jobs.signals); batched so they are written once, not per job
+    with counters.batched():
+        deleted_count = old_jobs.delete()[1].get('jobs.Job', 0)
+    if deleted_count:
+        bump(GLOBAL_NAMESPACE)
     
     logger.info(f"Cleaned up {deleted_count} old jobs")
     return f"Deleted {deleted_count} old jobs"
+
+
+@shared_task
+def cleanup_stale_uploads():
+    """
+    Periodic task to drop chunked uploads abandoned for more than a day
+    """
+    from datetime import timedelta
+    from .models import ResumeUpload
+    from .uploads import discard_parts
+    
+    cutoff = timezone.now() - timedelta(days=1)
+    stale = ResumeUpload.objects.filter(resume__isnull=True, created_at__lt=cutoff)
+    count = 0
+    for upload in stale.iterator():
+        discard_parts(upload)
+        upload.delete()
+        count += 1
+    
+    logger.info(f"Cleaned up {count} abandoned uploads")
+    return f"Deleted {count} abandoned uploads"
+
+
+@shared_task
+def match_new_jobs(job_ids):
+    """
+    Match freshly scraped jobs against all stored resumes in one batch
+    """
+    from .matching import match_jobs_to_resumes
+    
+    stored = match_jobs_to_resumes(job_ids)
+    return f"Stored {stored} matches"
+
+
+@shared_task
+def enrich_job_descriptions(job_ids=None, limit=200):
+    """
+    Fetch posting detail pages and store cleaned descriptions
+    Routed to the 'enrichment' queue so it never delays search scrapes
+    """
+    from .enrichment import enrich_jobs
+    
+    enriched = enrich_jobs(job_ids=job_ids, limit=limit)
+    return f"Enriched {enriched} job links"
+
+
+@shared_task
+def report_queue_depth():
+    """
+    Periodic task to send the length of each Celery queue as a gauge
+    A queue that keeps growing needs more workers
+    """
+    from . import metrics
+    from .redis_client import get_redis
+    
+    depths = {}
+    client = get_redis()
+    for queue in {route['queue'] for route in settings.CELERY_TASK_ROUTES.values()} | {'interactive'}:
+        # With priority_steps, kombu keeps one list per priority: 'batch', 'batch:1', ...
+        names = [queue] + [f'{queue}:{step}' for step in settings.CELERY_BROKER_TRANSPORT_OPTIONS['priority_steps'] if step]
+        pipe = client.pipeline()
+        for name in names:
+            pipe.llen(name)
+        depths[queue] = sum(pipe.execute())
+        metrics.gauge('celery.queue_depth', depths[queue], queue=queue)
+    return depths
+
+
+@shared_task
+def reconcile_counters():
+    """
+    Periodic task to recount the denormalized counters from scratch
+    Fixes drift from writes that bypass signals (bulk deletes, raw SQL)
+    """
+    from . import counters
+    
+    changed = counters.reconcile()
+    if changed:
+        logger.warning(f"Reconciled {changed} drifted counters")
+    return f"Reconciled {changed} counters"
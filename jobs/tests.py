@@ -0,0 +1,565 @@
+import io
+import json
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+import requests
+from rest_framework.authtoken.models import Token
+
+from . import (
+    api_views, async_views, authentication, caching, compression, counters, dispatch, health, matching, replicas,
+    tasks, uploads,
+)
+from .middleware import HybridMiddleware, ReplicaRoutingMiddleware, RequestMetricsMiddleware
+from .models import Job, JobApplication, JobMatch, Resume, ResumeUpload
+
+# The tests run without a Redis server
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class TemporaryMediaMixin:
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class SaveStreamTests(TemporaryMediaMixin, SimpleTestCase):
+    def test_stores_hashes_and_counts(self):
+        content = b'%PDF-1.4 resume ' * 1000
+        name, digest, size = uploads.save_stream('resumes/cv.pdf', io.BytesIO(content))
+
+        self.assertEqual(size, len(content))
+        self.assertEqual(digest, uploads.hashlib.sha256(content).hexdigest())
+        with default_storage.open(name, 'rb') as stored:
+            self.assertEqual(stored.read(), content)
+
+    def test_stops_at_limit(self):
+        name, digest, size = uploads.save_stream('uploads/part', io.BytesIO(b'0123456789'), limit=4)
+
+        self.assertEqual(size, 4)
+        with default_storage.open(name, 'rb') as stored:
+            self.assertEqual(stored.read(), b'0123')
+
+    def test_reader_is_a_non_seekable_file_of_known_size(self):
+        # What S3Storage checks before uploading
+        content = File(uploads.HashingReader(io.BytesIO(b'0123456789'), limit=10))
+
+        self.assertFalse(content.closed)
+        self.assertFalse(content.seekable())
+        self.assertEqual(content.size, 10)
+
+
+class FinishUploadTests(TemporaryMediaMixin, TestCase):
+    def test_rejects_parts_that_dont_add_up(self):
+        user = User.objects.create_user('uploader')
+        upload = ResumeUpload.objects.create(user=user, filename='cv.pdf', size=10, received=10)
+        default_storage.save(f'uploads/{upload.id}/000000000000.part', io.BytesIO(b'01234567'))
+
+        with self.assertRaises(uploads.UploadError):
+            uploads.finish_upload(upload)
+
+        upload.refresh_from_db()
+        self.assertEqual(upload.received, 0)
+        self.assertEqual(default_storage.listdir('resumes')[1], [])  # The assembled file is gone
+
+
+class CompressionTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        settings_override = override_settings(COMPRESSION_DICTIONARY_DIR=self.directory)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        compression.available_dictionaries.cache_clear()
+        self.addCleanup(compression.available_dictionaries.cache_clear)
+
+    def test_round_trip(self):
+        short = 'Python developer'
+        long = 'We are looking for a software engineer / developer to join our team. ' * 20
+        self.assertEqual(compression.compress_text(short)[0], compression.FORMAT_RAW)
+        stored = compression.compress_text(long)
+        self.assertEqual(stored[:2], bytes([compression.FORMAT_DICT, compression.BUILTIN_DICTIONARY_VERSION]))
+        self.assertLess(len(stored), len(long) // 4)
+        for text in (short, long, ''):
+            self.assertEqual(compression.decompress_text(compression.compress_text(text)), text)
+        self.assertIsNone(compression.decompress_text(None))
+
+    def test_values_stay_readable_after_a_new_dictionary(self):
+        text = 'Skills required: Python, Django, REST APIs and PostgreSQL. Full time, remote friendly. ' * 10
+        old = compression.compress_text(text)
+
+        samples = [f'{text} Posting {index}' for index in range(5)]
+        with open(f'{self.directory}/v2.zdict', 'wb') as dictionary:
+            dictionary.write(compression.train_dictionary(samples))
+        compression.available_dictionaries.cache_clear()
+
+        new = compression.compress_text(text)
+        self.assertEqual(new[1], 2)
+        self.assertEqual(compression.decompress_text(old), text)
+        self.assertEqual(compression.decompress_text(new), text)
+
+        with self.assertRaises(ValueError):
+            compression.decompress_text(bytes([compression.FORMAT_DICT, 9]) + new[2:])
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class ResumeEventsTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='pw')
+        self.resume = Resume.objects.create(user=self.owner, file='resumes/cv.pdf', task_status='processing')
+        self.url = reverse('jobs:resume_events', args=[self.resume.id])
+
+    def test_only_the_owner_can_follow(self):
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        User.objects.create_user('other', password='pw')
+        self.client.login(username='other', password='pw')
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_sync_worker_gets_snapshot_to_poll(self):
+        self.client.login(username='owner', password='pw')
+        response = self.client.get(self.url)  # The test client is a single-threaded WSGI server
+
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.startswith('retry: '))
+        self.assertIn('"status": "processing"', body)
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class JobApiTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('reader')
+        self.headers = {'Authorization': f'Token {Token.objects.create(user=user).key}'}
+        resume = Resume.objects.create(user=user, file='resumes/cv.pdf')
+        Job.objects.bulk_create(
+            Job(resume=resume, title=f'Developer {index}', company='C', platform='LinkedIn',
+                link=f'https://example.com/{index}', location='India')
+            for index in range(3)
+        )
+
+    def test_wsgi_serves_the_drf_list(self):
+        self.assertIs(resolve('/api/jobs/').func.view_class, api_views.JobListAPIView)
+        response = self.client.get('/api/jobs/', headers=self.headers)
+        self.assertEqual(len(response.json()), 3)
+
+    def test_cached_token_gives_each_request_its_own_user(self):
+        key = self.headers['Authorization'].split()[1]
+        auth = authentication.CachedTokenAuthentication()
+        first, token = auth.authenticate_credentials(key)
+        first.first_name = 'changed by another request'
+        with self.assertNumQueries(0):
+            second, second_token = auth.authenticate_credentials(key)
+
+        self.assertIsNot(second, first)
+        self.assertEqual(second.first_name, '')
+        self.assertIs(second_token.user, second)
+        self.assertFalse(second._state.adding)
+
+    def test_token_cache_holds_no_secrets(self):
+        key = self.headers['Authorization'].split()[1]
+        auth = authentication.CachedTokenAuthentication()
+        auth.authenticate_credentials(key)
+        with self.assertNumQueries(0):
+            user, token = auth.authenticate_credentials(key)
+            self.assertEqual((user.username, token.key), ('reader', key))
+
+        cached = repr(authentication.cache.get(authentication._cache_key(key)))
+        self.assertNotIn(key, cached)
+        self.assertNotIn(user.password, cached)  # Deferred: loaded on demand
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                                           'LOCATION': 'redis://127.0.0.1:9/0'}})
+    def test_unreachable_cache_counts_as_a_miss(self):
+        with self.assertLogs('jobs', 'WARNING'):
+            for path in ('/', '/jobs/', '/dashboard/'):
+                self.assertEqual(self.client.get(path).status_code, 200, path)
+            response = self.client.get('/api/jobs/', headers=self.headers)
+        self.assertEqual(len(response.json()), 3)
+        self.assertNotIn('ETag', response)
+
+    def test_other_users_scrapes_keep_the_cached_list(self):
+        first = self.client.get('/api/jobs/', headers=self.headers)
+        other = Resume.objects.create(user=User.objects.create_user('other'), file='resumes/other.pdf')
+        caching.bump_for_users(['resumes', 'jobs'], [other.user_id], [other.id])
+
+        second = self.client.get('/api/jobs/', headers={**self.headers, 'If-None-Match': first['ETag']})
+        self.assertEqual(second.status_code, 304)
+
+    async def test_asgi_list_shares_the_drf_cache_entry(self):
+        drf = await self.async_client.get('/api/jobs/', headers=self.headers)
+        asgi = await async_views.job_list(AsyncRequestFactory().get('/api/jobs/', headers=self.headers))
+        self.assertEqual(asgi['ETag'], drf['ETag'])
+
+    def test_export_views_must_provide_a_queryset(self):
+        class Unfinished(api_views.ExportAPIView):
+            pass
+
+        with self.assertRaises(TypeError):
+            Unfinished()
+        api_views.JobExportAPIView()
+        api_views.ApplicationExportAPIView()
+
+    async def test_asgi_export_streams_asynchronously(self):
+        response = await self.async_client.get('/api/jobs/export/?fields=title', headers=self.headers)
+
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len([json.loads(line) for line in body.splitlines()]), 3)
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class GenerationCachingTests(TestCase):
+    def setUp(self):
+        caching.cache.clear()
+        resume = Resume.objects.create(file='resumes/cv.pdf')
+        Job.objects.create(resume=resume, title='Developer', company='C', platform='linkedin',
+                           link='https://example.com/1')
+
+    def test_pages_are_served_from_the_cache_until_a_bump(self):
+        first = self.client.get('/')
+        etag = first['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/').context['total_jobs'], 1)
+            not_modified = self.client.get('/', headers={'If-None-Match': etag})
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], etag)
+
+        caching.bump('jobs')
+        changed = self.client.get('/', headers={'If-None-Match': etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+
+    def test_writes_only_bump_their_namespaces(self):
+        request = RequestFactory().get('/api/jobs/')
+        request.user = AnonymousUser()
+        key = caching.view_cache_key(request, 'view', ['resume:1'])
+
+        caching.bump('resume:2', caching.user_namespace(1))
+        self.assertEqual(caching.view_cache_key(request, 'view', ['resume:1']), key)
+        caching.bump_for_users([], [], [1])
+        self.assertNotEqual(caching.view_cache_key(request, 'view', ['resume:1']), key)
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class MatchJobsTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner')
+        self.other = User.objects.create_user('other')
+        scraped_for = Resume.objects.create(user=self.owner, file='resumes/a.pdf', keywords_extracted='python')
+        self.resume = Resume.objects.create(user=self.other, file='resumes/b.pdf', keywords_extracted='python,django')
+        self.jobs = Job.objects.bulk_create(
+            Job(resume=scraped_for, title=f'Python Django developer {index}', company='C',
+                platform='linkedin', link=f'https://example.com/{index}')
+            for index in range(5)
+        )
+        # Each worker keeps its matrix between runs; start every test afresh
+        matching._shared = None
+        self.addCleanup(setattr, matching, '_shared', None)
+
+    def test_matches_point_at_the_scraped_jobs(self):
+        stored = matching.match_jobs_to_resumes([job.id for job in self.jobs])
+
+        self.assertEqual(stored, 5)
+        self.assertEqual(Job.objects.count(), 5)
+        self.assertEqual(set(Job.objects.filter(matching.jobs_of([self.resume.id]))), set(self.jobs))
+        self.assertEqual(len(api_views.filter_jobs(self.other, {})), 5)
+
+    def test_keeps_each_resumes_best_matches(self):
+        best = matching.best_per_resume([(job_id, 1, job_id / 10) for job_id in range(5)], limit=2)
+        self.assertEqual(sorted(best[1]), [(0.3, 3), (0.4, 4)])
+
+        matching.match_jobs_to_resumes([job.id for job in self.jobs], batch_size=2)
+        self.assertEqual(matching.trim_matches([self.resume.id], limit=3), 2)
+        self.assertEqual(JobMatch.objects.filter(resume=self.resume).count(), 3)
+
+    def test_each_job_goes_to_its_best_resumes(self):
+        matrix = matching.SkillMatrix(['django', 'flask', 'python', 'sql'])
+        for resume_id, keywords in [(1, ['python']), (2, ['python', 'django']), (3, ['python', 'django', 'sql']),
+                                    (4, ['flask']), (5, ['python', 'django', 'sql'])]:
+            matrix.add(resume_id, keywords)
+
+        matches = list(matrix.score_jobs([(10, {'python', 'django', 'sql'})], min_score=0.3, per_job=2,
+                                         exclude={10: 3}))
+        self.assertEqual(matches, [(10, 5, 1.0), (10, 2, 2 / 3)])
+
+    def test_shared_matrix_follows_keyword_changes(self):
+        job_ids = [job.id for job in self.jobs]
+        matching.match_jobs_to_resumes(job_ids)
+        JobMatch.objects.all().delete()
+
+        newcomer = Resume.objects.create(user=self.other, file='resumes/c.pdf', keywords_extracted='django, python',
+                                         keywords_updated_at=timezone.now())
+        self.resume.delete()
+        self.assertEqual(matching.match_jobs_to_resumes(job_ids), 5)
+
+        self.assertEqual(set(JobMatch.objects.values_list('resume_id', flat=True)), {newcomer.id})
+        self.assertEqual(len(matching._shared), 3)  # Refreshed, not rebuilt
+
+    def test_matched_users_keep_their_own_applications(self):
+        matching.match_jobs_to_resumes([job.id for job in self.jobs])
+        job = self.jobs[0]
+        headers = {'Authorization': f'Token {Token.objects.create(user=self.other).key}'}
+        response = self.client.post('/api/applications/', {'job': job.id, 'status': 'saved'}, headers=headers)
+        self.assertEqual(response.status_code, 201)
+
+        self.client.force_login(self.owner)
+        self.assertIsNone(self.client.get(reverse('jobs:job_detail', args=[job.id])).context['application'])
+        self.client.post(reverse('jobs:update_application_status', args=[job.id]), {'status': 'applied'})
+
+        self.assertEqual(
+            dict(JobApplication.objects.values_list('user__username', 'status')),
+            {'owner': 'applied', 'other': 'saved'},
+        )
+        self.assertEqual(self.client.get(reverse('jobs:job_detail', args=[job.id])).context['application'].user,
+                         self.owner)
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class StartScrapingTests(TestCase):
+    def setUp(self):
+        self.resume = Resume.objects.create(file='resumes/cv.pdf', task_status='completed')
+
+    def test_fast_worker_status_is_kept(self):
+        def run_at_once(**options):
+            Resume.objects.filter(id=self.resume.id).update(task_status='processing')
+            return mock.Mock(id=options['task_id'])
+
+        with mock.patch.object(dispatch, 'claim', side_effect=lambda resume_id, location, task_id: task_id), \
+                mock.patch('jobs.tasks.scrape_jobs_for_resume.apply_async', side_effect=run_at_once) as apply_async:
+            task = dispatch.start_scraping(self.resume)
+
+        self.resume.refresh_from_db()
+        self.assertEqual(self.resume.task_id, apply_async.call_args.kwargs['task_id'])
+        self.assertEqual(self.resume.task_id, task.id)
+        self.assertEqual(self.resume.task_status, 'processing')
+
+    def test_failed_dispatch_restores_the_previous_run(self):
+        with mock.patch.object(dispatch, 'claim', side_effect=lambda resume_id, location, task_id: task_id), \
+                mock.patch.object(dispatch, 'release'), \
+                mock.patch('jobs.tasks.scrape_jobs_for_resume.apply_async', side_effect=OSError('broker down')):
+            with self.assertRaises(OSError):
+                dispatch.start_scraping(self.resume)
+
+        self.resume.refresh_from_db()
+        self.assertEqual((self.resume.task_id, self.resume.task_status), (None, 'completed'))
+
+
+    def test_duplicate_restarts_a_run_that_lost_its_lock(self):
+        Resume.objects.filter(id=self.resume.id).update(task_status='processing')
+        self.resume.refresh_from_db()
+        with mock.patch.object(dispatch, 'start_scraping') as start_scraping:
+            with mock.patch.object(dispatch, 'in_flight', return_value=True):
+                self.assertFalse(dispatch.refresh_duplicate(self.resume))
+            with mock.patch.object(dispatch, 'in_flight', return_value=False):
+                self.assertTrue(dispatch.refresh_duplicate(self.resume))
+        start_scraping.assert_called_once()
+
+    def test_lock_outlives_a_redelivered_run(self):
+        visibility_timeout = settings.CELERY_BROKER_TRANSPORT_OPTIONS['visibility_timeout']
+        self.assertGreaterEqual(dispatch.lock_ttl(), visibility_timeout + settings.SCRAPE_TIME_LIMIT)
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class ScrapeRetryTests(TestCase):
+    def setUp(self):
+        self.resume = Resume.objects.create(file='resumes/cv.pdf', task_status='pending')
+
+    def scrape(self, error):
+        with mock.patch('jobs.scraper.JobScraperService', side_effect=error) as service, \
+                mock.patch.object(tasks, 'retry_countdown', return_value=0):
+            result = tasks.scrape_jobs_for_resume.apply(kwargs={'resume_id': self.resume.id})
+        self.resume.refresh_from_db()
+        self.assertEqual(self.resume.task_status, 'failed')
+        return result, service.call_count
+
+    def test_permanent_errors_fail_at_once(self):
+        result, attempts = self.scrape(ValueError('corrupt file'))
+        self.assertEqual(attempts, 1)
+        self.assertEqual(result.result['status'], 'error')
+
+    def test_transient_errors_are_retried(self):
+        result, attempts = self.scrape(requests.ConnectionError('platform down'))
+        self.assertEqual(attempts, settings.SCRAPE_MAX_RETRIES + 1)
+        self.assertIsInstance(result.result, requests.ConnectionError)
+
+    def test_countdown_backs_off_with_jitter(self):
+        for retries in range(8):
+            delay = min(tasks.RETRY_BACKOFF_MAX, tasks.RETRY_BACKOFF * 2 ** retries)
+            self.assertTrue(delay / 2 <= tasks.retry_countdown(retries) <= delay)
+        self.assertFalse(isinstance(ValueError(), tasks.RETRYABLE_ERRORS))
+
+
+class HybridMiddlewareTests(SimpleTestCase):
+    def test_subclasses_must_handle_both_modes(self):
+        class SyncOnly(HybridMiddleware):
+            def handle(self, request):
+                return self.get_response(request)
+
+        with self.assertRaises(TypeError):
+            SyncOnly(lambda request: HttpResponse())
+        RequestMetricsMiddleware(lambda request: HttpResponse())
+
+
+class ReplicaPinTests(SimpleTestCase):
+    def anonymous(self, method, path, cookies=None):
+        request = getattr(RequestFactory(), method)(path)
+        request.user = AnonymousUser()
+        request.COOKIES.update(cookies or {})
+        return request
+
+    @mock.patch.object(replicas, 'replicas', return_value=['replica1'])
+    def test_anonymous_writer_reads_own_write(self, _):
+        response = HttpResponse(status=302)
+        ReplicaRoutingMiddleware.pin_writer(self.anonymous('post', '/upload/'), response)
+        cookie = response.cookies[replicas.PIN_COOKIE]
+        self.assertEqual(cookie['max-age'], replicas.PIN_SECONDS)
+
+        redirected = self.anonymous('get', '/jobs/resume/1/', {cookie.key: cookie.value})
+        self.assertEqual(replicas.RequestReads(redirected).alias(), replicas.PRIMARY)
+        self.assertEqual(replicas.RequestReads(self.anonymous('get', '/jobs/')).alias(), 'replica1')
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class CounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('counted')
+        self.resume = Resume.objects.create(user=self.user, file='resumes/cv.pdf')
+        self.jobs = [
+            Job.objects.create(resume=self.resume, title=f'Developer {index}', company='C',
+                               platform='linkedin', link=f'https://example.com/{index}')
+            for index in range(3)
+        ]
+        JobApplication.objects.create(user=self.user, job=self.jobs[0], status='applied')
+
+    def assertCounts(self, **expected):
+        for scope in (counters.GLOBAL, counters.user_scope(self.user.id)):
+            self.assertEqual(counters.read(scope, expected), expected)
+        self.assertEqual(counters.reconcile(), 0)
+
+    def test_deletes_uncount_themselves(self):
+        self.jobs[2].delete()
+        self.assertCounts(jobs=2, applications=1)
+
+        Job.objects.filter(id=self.jobs[0].id).delete()
+        self.assertCounts(jobs=1, applications=0)
+
+        with counters.batched():
+            self.resume.delete()
+        self.assertCounts(jobs=0, resumes=0, applications=0)
+
+    def test_cleanup_old_jobs(self):
+        Job.objects.filter(id__in=[self.jobs[0].id, self.jobs[1].id]).update(scraped_at='2000-01-01T00:00Z')
+        tasks.cleanup_old_jobs()
+        self.assertCounts(jobs=1, resumes=1, applications=0)
+
+
+class FakeRedis:
+    """The few Redis commands PlatformHealth uses, in memory; pipelines run at once"""
+
+    def __init__(self):
+        self.data = {}
+        self.results = None
+
+    def pipeline(self):
+        self.results = []
+        return self
+
+    def execute(self):
+        results, self.results = self.results, None
+        return results
+
+    def _done(self, result):
+        if self.results is None:
+            return result
+        self.results.append(result)
+        return self
+
+    def exists(self, key):
+        return self._done(int(key in self.data))
+
+    def delete(self, *keys):
+        return self._done(sum(self.data.pop(key, None) is not None for key in keys))
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return self._done(None)
+        self.data[key] = value
+        return self._done(True)
+
+    def hget(self, key, field):
+        return self._done(self.data.get(key, {}).get(field))
+
+    def hgetall(self, key):
+        return self._done(dict(self.data.get(key, {})))
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        values = self.data.setdefault(key, {})
+        values.update(mapping or {field: value})
+        return self._done(len(mapping or [field]))
+
+    def hincrby(self, key, field, amount=1):
+        values = self.data.setdefault(key, {})
+        values[field] = int(values.get(field, 0)) + amount
+        return self._done(values[field])
+
+    def lpush(self, key, value):
+        self.data.setdefault(key, []).insert(0, value)
+        return self._done(len(self.data[key]))
+
+    def ltrim(self, key, start, end):
+        self.data[key] = self.data.get(key, [])[start:end + 1]
+        return self._done(True)
+
+    def lrange(self, key, start, end):
+        values = self.data.get(key, [])
+        return self._done(values[start:] if end == -1 else values[start:end + 1])
+
+    def ttl(self, key):
+        return self._done(health.COOLDOWN if key in self.data else -2)
+
+
+class PlatformHealthTests(SimpleTestCase):
+    def setUp(self):
+        self.health = health.PlatformHealth(FakeRedis())
+
+    def record(self, *outcomes):
+        for outcome in outcomes:
+            self.health.record('naukri', outcome, 0.1)
+
+    def test_only_errors_open_the_circuit(self):
+        self.record(*['no_results'] * health.FAILURE_THRESHOLD * 2)
+        self.assertTrue(self.health.allow('naukri'))
+
+        self.record(*['error'] * (health.FAILURE_THRESHOLD - 1), 'no_results', 'error')
+        self.assertTrue(self.health.allow('naukri'))
+        self.assertEqual(self.health.status(['naukri'])['naukri']['consecutive_failures'], 1)
+
+    def test_trips_and_recovers_through_one_trial(self):
+        self.record(*['error'] * health.FAILURE_THRESHOLD)
+        self.assertFalse(self.health.allow('naukri'))
+        self.assertEqual(self.health.status(['naukri'])['naukri']['state'], 'open')
+
+        self.health.client.delete(health._key('naukri', ':open'))  # Cooldown over
+        self.assertTrue(self.health.allow('naukri'))
+        self.assertFalse(self.health.allow('naukri'))  # One trial at a time
+        self.record('error')
+        self.assertFalse(self.health.allow('naukri'))
+
+        self.health.client.delete(health._key('naukri', ':open'))
+        self.assertTrue(self.health.allow('naukri'))
+        self.record('ok')
+        self.assertTrue(self.health.allow('naukri'))
+        self.assertEqual(self.health.status(['naukri'])['naukri']['state'], 'closed')
@@ -0,0 +1,185 @@
+"""
+Tracing
+Spans for one resume's journey: request -> Celery task -> parsing ->
+platform fetches -> database writes, linked by a trace id
+
+Context travels as a W3C traceparent ("00-<trace id>-<span id>-<flags>"):
+in the request header (RequestTracingMiddleware), in Celery message headers
+(jobs.signals) and in a context variable within a process. Threads started
+with contextvars.copy_context() (concurrent scraping) inherit it.
+
+Finished spans are appended to TRACING_FILE as JSON lines, one span per
+line, from every process; an OpenTelemetry Collector filelog receiver can
+ship them on. With TRACING_FILE unset, span ids still propagate but
+nothing is recorded.
+
+    python manage.py show_trace --resume 42    # span tree of a resume's last scrape
+"""
+import contextvars
+import json
+import logging
+import os
+import random
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar('current_span', default=None)
+
+
+class Span:
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], sampled: bool, attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.attributes = attributes
+        self.status = 'ok'
+        self.error = None
+        self.start = time.time()
+        self._started = time.monotonic()
+        self._token = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def fail(self, error: BaseException):
+        self.status = 'error'
+        self.error = f'{type(error).__name__}: {error}'
+
+    def as_dict(self, duration: float) -> dict:
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': round(self.start, 6),
+            'duration_ms': round(duration * 1000, 3),
+            'status': self.status,
+            'error': self.error,
+            'attributes': self.attributes,
+            'pid': os.getpid(),
+        }
+
+
+def parse_traceparent(value: Optional[str]):
+    """(trace id, parent span id, sampled) from a traceparent, or None if invalid"""
+    parts = (value or '').strip().split('-')
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16), int(parts[3], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2], bool(int(parts[3], 16) & 1)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def current_traceparent() -> Optional[str]:
+    span = _current.get()
+    return span.traceparent if span is not None else None
+
+
+def start_span(name: str, traceparent: Optional[str] = None, **attributes) -> Span:
+    """
+    Start a span and make it current; finish it with end_span()
+    The parent is the incoming traceparent if given, else the current span.
+    A span without either begins a new trace, sampled at TRACING_SAMPLE_RATE.
+    """
+    parent = parse_traceparent(traceparent) if traceparent else None
+    current = _current.get()
+    if parent is not None:
+        trace_id, parent_id, sampled = parent
+    elif current is not None:
+        trace_id, parent_id, sampled = current.trace_id, current.span_id, current.sampled
+    else:
+        trace_id, parent_id = secrets.token_hex(16), None
+        sampled = get_exporter() is not None and random.random() < sample_rate()
+    span = Span(name, trace_id, parent_id, sampled, attributes)
+    span._token = _current.set(span)
+    return span
+
+
+def end_span(span: Span):
+    duration = time.monotonic() - span._started
+    try:
+        _current.reset(span._token)
+    except ValueError:
+        # Ended in a different context than it started in (Celery signals)
+        _current.set(None)
+    exporter = get_exporter()
+    if span.sampled and exporter is not None:
+        exporter.export(span.as_dict(duration))
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """Child span of the current one around a block; exceptions mark it failed"""
+    current = start_span(name, **attributes)
+    try:
+        yield current
+    except BaseException as e:
+        current.fail(e)
+        raise
+    finally:
+        end_span(current)
+
+
+class FileExporter:
+    """Appends spans as JSON lines, one short O_APPEND write each, so processes can share a file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, record: dict):
+        line = json.dumps(record, default=str) + '\n'
+        try:
+            with self._lock, open(self.path, 'a', encoding='utf-8') as output:
+                output.write(line)
+        except OSError as e:
+            logger.warning(f"Could not write span to {self.path}: {e}")
+
+
+def _settings():
+    from django.conf import settings
+
+    if settings.configured:
+        return getattr(settings, 'TRACING_FILE', None), getattr(settings, 'TRACING_SAMPLE_RATE', 1.0)
+    return os.environ.get('TRACING_FILE'), float(os.environ.get('TRACING_SAMPLE_RATE', 1.0))
+
+
+@lru_cache(maxsize=None)
+def get_exporter() -> Optional[FileExporter]:
+    path = _settings()[0]
+    return FileExporter(path) if path else None
+
+
+@lru_cache(maxsize=None)
+def sample_rate() -> float:
+    return _settings()[1]
+
+
+def read_trace(path: str, trace_id: str) -> list:
+    """All recorded spans of one trace, in start order"""
+    spans = []
+    with open(path, encoding='utf-8') as source:
+        for line in source:
+            if trace_id in line:
+                record = json.loads(line)
+                if record['trace_id'] == trace_id:
+                    spans.append(record)
+    return sorted(spans, key=lambda record: record['start'])
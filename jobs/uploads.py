@@ -0,0 +1,258 @@
+"""
+Resume Uploads
+Stream resume files into the configured storage (see STORAGES in settings),
+hashing them on the way
+
+Small files arrive in one request and are stored with store_resume_file().
+Large or flaky uploads use the chunked API: each chunk is written as its own
+part object, so a request never holds more than one chunk and an interrupted
+upload resumes from ResumeUpload.received. On completion the parts are
+streamed, in order, into the final file and hashed in the same pass.
+Everything goes through the storage API, so it works the same on local
+disk and on S3-compatible stores.
+"""
+import hashlib
+from typing import Iterable, Tuple
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+from . import tracing
+
+ALLOWED_EXTENSIONS = ('.pdf', '.docx')
+MAX_UPLOAD_SIZE = 20 * 1024 * 1024   # Bytes; resumes are far smaller
+CHUNK_SIZE = 1024 * 1024             # Suggested chunk size for clients
+MAX_CHUNK_SIZE = 5 * 1024 * 1024     # Largest chunk accepted in one request
+READ_SIZE = 64 * 1024                # Bytes read from a stream at a time
+
+
+class UploadError(Exception):
+    """Upload request that can't be accepted; the message is safe to show"""
+
+
+class HashingReader:
+    """
+    Read-only, non-seekable file wrapper that hashes and counts what passes
+    through it
+
+    With limit set, reading stops after that many bytes (for request bodies,
+    which must not be read past Content-Length). size is the expected length
+    (given, the limit, or the source's own size) for storages that ask for
+    it up front; received counts what was actually read.
+    """
+
+    def __init__(self, source, limit: int = None, size: int = None):
+        self.source = source
+        self.limit = limit
+        self.size = size if size is not None else limit if limit is not None else getattr(source, 'size', None)
+        self.received = 0
+        self.closed = False
+        self._hash = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        if self.limit is not None:
+            remaining = self.limit - self.received
+            size = remaining if size is None or size < 0 else min(size, remaining)
+            if size <= 0:
+                return b''
+        data = self.source.read(size)
+        self._hash.update(data)
+        self.received += len(data)
+        return data
+
+    def seekable(self) -> bool:
+        # Storages (S3Storage) rewind seekable content before saving it
+        return False
+
+    def close(self):
+        self.closed = True
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+class _ConcatenatedParts:
+    """Read several stored objects one after another, opening each lazily"""
+
+    def __init__(self, names: Iterable[str], storage=None):
+        self.storage = storage or default_storage
+        self.names = iter(names)
+        self.current = None
+
+    def read(self, size: int = -1) -> bytes:
+        while True:
+            if self.current is None:
+                name = next(self.names, None)
+                if name is None:
+                    return b''
+                self.current = self.storage.open(name, 'rb')
+            data = self.current.read(size if size and size > 0 else READ_SIZE)
+            if data:
+                return data
+            self.current.close()
+            self.current = None
+
+
+def check_filename(filename: str):
+    if not filename.lower().endswith(ALLOWED_EXTENSIONS):
+        raise UploadError('Please upload a PDF or DOCX file')
+
+
+def resume_file_name(filename: str) -> str:
+    """Storage name for a new resume file, honouring Resume.file's upload_to"""
+    from .models import Resume
+    return Resume._meta.get_field('file').generate_filename(None, filename)
+
+
+def save_stream(name: str, stream, limit: int = None, size: int = None) -> Tuple[str, str, int]:
+    """
+    Write a stream to storage, returning (stored name, sha256, bytes written)
+    The storage may pick a different name if the requested one is taken.
+    size is the expected length, when neither limit nor the stream tells.
+    """
+    reader = HashingReader(stream, limit=limit, size=size)
+    with tracing.span('storage.save', file=name) as span:
+        stored_name = default_storage.save(name, File(reader, name=name))
+        span.set(bytes=reader.received)
+    return stored_name, reader.hexdigest(), reader.received
+
+
+def store_resume_file(uploaded_file) -> Tuple[str, str, int]:
+    """Store a file received in a single request (UploadedFile)"""
+    check_filename(uploaded_file.name)
+    return save_stream(resume_file_name(uploaded_file.name), uploaded_file)
+
+
+def find_duplicate(user, content_hash: str):
+    """The user's most recent resume with the same content, if any"""
+    from .models import Resume
+
+    # Anonymous uploads are never matched with each other
+    if user is None or not user.is_authenticated or not content_hash:
+        return None
+    return Resume.objects.filter(user=user, content_hash=content_hash).order_by('-uploaded_at').first()
+
+
+def create_resume(user, name: str, content_hash: str):
+    """
+    Resume for a freshly stored file, returning (resume, created)
+    If the user already uploaded identical content, that resume (with its
+    keywords and jobs) is returned instead and the new copy is deleted.
+    """
+    from .models import Resume
+
+    existing = find_duplicate(user, content_hash)
+    if existing is not None:
+        if existing.file.name != name:
+            default_storage.delete(name)
+        return existing, False
+    resume = Resume.objects.create(
+        user=user if user is not None and user.is_authenticated else None,
+        file=name,
+        content_hash=content_hash,
+        task_status='pending'
+    )
+    return resume, True
+
+
+# Chunked uploads
+
+def _part_name(upload, start: int) -> str:
+    return f'uploads/{upload.id}/{start:012d}.part'
+
+
+def _part_names(upload) -> list:
+    try:
+        directories, files = default_storage.listdir(f'uploads/{upload.id}')
+    except FileNotFoundError:
+        return []
+    # Zero-padded offsets sort in byte order
+    return [f'uploads/{upload.id}/{name}' for name in sorted(files) if name.endswith('.part')]
+
+
+def parse_content_range(header: str) -> Tuple[int, int, int]:
+    """'bytes 0-1048575/5242880' -> (start, end inclusive, total)"""
+    try:
+        unit, _, spec = header.strip().partition(' ')
+        byte_range, _, total = spec.partition('/')
+        start, _, end = byte_range.partition('-')
+        start, end, total = int(start), int(end), int(total)
+    except ValueError:
+        raise UploadError('Content-Range must look like "bytes <start>-<end>/<total>"')
+    if unit != 'bytes' or not 0 <= start <= end < total:
+        raise UploadError('Invalid Content-Range')
+    return start, end, total
+
+
+def begin_upload(user, filename: str, size: int):
+    from .models import ResumeUpload
+
+    check_filename(filename)
+    if not 0 < size <= MAX_UPLOAD_SIZE:
+        raise UploadError(f'File size must be between 1 byte and {MAX_UPLOAD_SIZE} bytes')
+    return ResumeUpload.objects.create(user=user, filename=filename, size=size)
+
+
+def write_chunk(upload, stream, content_range: str):
+    """
+    Store one chunk read from stream (a request body)
+
+    The chunk must start where the previous one ended. Clients that lose a
+    response re-read ResumeUpload.received and continue from there.
+    """
+    from .models import ResumeUpload
+
+    start, end, total = parse_content_range(content_range)
+    length = end - start + 1
+    if total != upload.size:
+        raise UploadError(f'Total size {total} does not match the announced size {upload.size}')
+    if length > MAX_CHUNK_SIZE:
+        raise UploadError(f'Chunks may be at most {MAX_CHUNK_SIZE} bytes')
+    if start != upload.received:
+        raise UploadError(f'Expected a chunk starting at byte {upload.received}')
+
+    name = _part_name(upload, start)
+    if default_storage.exists(name):
+        # Left over from a chunk whose write failed half way
+        default_storage.delete(name)
+    stored_name, digest, size = save_stream(name, stream, limit=length)
+    if size != length:
+        default_storage.delete(stored_name)
+        raise UploadError(f'Expected {length} bytes but received {size}')
+
+    # Only advance if nobody else stored this chunk in the meantime
+    advanced = ResumeUpload.objects.filter(pk=upload.pk, received=start).update(received=end + 1)
+    if not advanced:
+        default_storage.delete(stored_name)
+        raise UploadError('Another request already stored this chunk')
+    upload.received = end + 1
+    return upload
+
+
+def finish_upload(upload) -> Tuple[str, str, int]:
+    """
+    Join the parts into the final resume file, returning (name, sha256, size)
+    The parts are deleted afterwards. If they don't add up to the announced
+    size the file is discarded too and the upload starts over.
+    """
+    if not upload.is_complete:
+        raise UploadError(f'Upload incomplete: {upload.received} of {upload.size} bytes received')
+    from .models import ResumeUpload
+
+    parts = _part_names(upload)
+    stored_name, digest, size = save_stream(
+        resume_file_name(upload.filename), _ConcatenatedParts(parts), size=upload.size
+    )
+    discard_parts(upload, parts)
+    if size != upload.size:
+        # Parts lost or left over: the client has to send the file again
+        default_storage.delete(stored_name)
+        ResumeUpload.objects.filter(pk=upload.pk).update(received=0)
+        upload.received = 0
+        raise UploadError(f'Assembled {size} bytes but the upload announced {upload.size}; please upload it again')
+    return stored_name, digest, size
+
+
+def discard_parts(upload, parts: list = None):
+    for name in parts if parts is not None else _part_names(upload):
+        default_storage.delete(name)
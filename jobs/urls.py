@@ -18,6 +18,7 @@ urlpatterns = [
     path('upload/', views.upload_resume, name='upload_resume'),
     path('resumes/', views.resume_list, name='resume_list'),
     path('resumes/<int:resume_id>/rescrape/', views.rescrape_jobs, name='rescrape_jobs'),
+    path('resumes/<int:resume_id>/events/', views.resume_events, name='resume_events'),
     
     # Job listings
     path('jobs/', views.job_list, name='job_list'),
@@ -5,7 +5,7 @@ from django.contrib import messages
 from django.core.paginator import Paginator
 from django.db.models import Q
 from .models import Resume, Job, JobApplication
-from .tasks import scrape_jobs_for_resume
+from . import caching, counters, dispatch, matching, progress, uploads
 import logging
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
@@ -15,18 +15,35 @@ import os
 
 logger = logging.getLogger(__name__)
 
+SESSION_RESUMES = 'resume_ids'  # Resumes uploaded anonymously in this session
+SESSION_RESUMES_KEPT = 20       # Most recent of those remembered
 
+
+def owned_resumes(request):
+    """Resumes the visitor may follow: their own, or anonymous uploads from this session"""
+    if request.user.is_authenticated:
+        return Resume.objects.filter(user=request.user)
+    return Resume.objects.filter(user=None, id__in=request.session.get(SESSION_RESUMES, []))
+
+
+def remember_upload(request, resume):
+    if not request.user.is_authenticated:
+        request.session[SESSION_RESUMES] = [*request.session.get(SESSION_RESUMES, []), resume.id][-SESSION_RESUMES_KEPT:]
+
+
+@caching.cache_by_generation('jobs', 'resumes')
 def index(request):
     """Home page showing recent jobs"""
-    jobs = Job.objects.filter(is_active=True).select_related('resume')[:20]
-    resumes = Resume.objects.all()[:5]
+    def build_context():
+        totals = counters.read(counters.GLOBAL, [counters.JOBS, counters.RESUMES])
+        return {
+            'jobs': list(Job.objects.filter(is_active=True).select_related('resume').defer('description', 'resume__task_result')[:20]),
+            'resumes': list(Resume.objects.all()[:5]),
+            'total_jobs': totals[counters.JOBS],
+            'total_resumes': totals[counters.RESUMES],
+        }
     
-    context = {
-        'jobs': jobs,
-        'resumes': resumes,
-        'total_jobs': Job.objects.count(),
-        'total_resumes': Resume.objects.count(),
-    }
+    context = caching.cached_context(request, build_context)
     return render(request, 'jobs/index.html', context)
 
 
@@ -42,35 +59,35 @@ def upload_resume(request):
         location = request.POST.get('location', 'India')
         
         # Validate file type
-        if not resume_file.name.endswith(('.pdf', '.docx')):
-            messages.error(request, 'Please upload a PDF or DOCX file')
+        try:
+            uploads.check_filename(resume_file.name)
+        except uploads.UploadError as e:
+            messages.error(request, str(e))
             return redirect('jobs:upload_resume')
         
         try:
-            # Save resume
-            resume = Resume.objects.create(
-                file=resume_file,
-                task_status='pending'
-            )
+            # Stream the file to storage, hashing it on the way, then save resume
+            name, content_hash, size = uploads.store_resume_file(resume_file)
+            resume, created = uploads.create_resume(request.user, name, content_hash)
+            remember_upload(request, resume)
             
-            # Trigger Celery task for async job scraping
-            from .tasks import scrape_jobs_for_resume
-            task = scrape_jobs_for_resume.delay(
-                resume_id=resume.id,
-                location=location,
-                jobs_per_site=2
-            )
+            if not created:
+                # Same file as an earlier upload: reuse its keywords and jobs
+                message = 'You uploaded this resume before, so here are its jobs.'
+                if dispatch.refresh_duplicate(resume, location):
+                    message += ' Checking for new postings in the background.'
+                messages.info(request, message)
+                return redirect('jobs:job_list', resume_id=resume.id)
             
-            # Save task ID
-            resume.task_id = task.id
-            resume.save()
+            # Trigger Celery task for async job scraping
+            task = dispatch.start_scraping(resume, location, interactive=True)
             
             logger.info(f"Triggered job scraping task {task.id} for resume {resume.id}")
             
             messages.success(
                 request, 
                 'Resume uploaded successfully! Job scraping is in progress. '
-                'Refresh the page to see results.'
+                'New jobs will show up here when it finishes.'
             )
             return redirect('jobs:job_list', resume_id=resume.id)
         
@@ -83,34 +100,47 @@ def upload_resume(request):
 
 
 
+@caching.cache_by_generation('jobs', 'resumes', per_resume=True)
 def job_list(request, resume_id=None):
     """List all scraped jobs"""
-    jobs_query = Job.objects.filter(is_active=True).select_related('resume')
-    
-    if resume_id:
-        jobs_query = jobs_query.filter(resume_id=resume_id)
-        resume = get_object_or_404(Resume, id=resume_id)
-    else:
-        resume = None
-    
-    # Filter by platform
     platform = request.GET.get('platform')
-    if platform:
-        jobs_query = jobs_query.filter(platform=platform)
-    
-    # Search
     search = request.GET.get('search')
-    if search:
-        jobs_query = jobs_query.filter(title__icontains=search) | jobs_query.filter(company__icontains=search)
-    
-    # Pagination
-    paginator = Paginator(jobs_query, 10)
     page_number = request.GET.get('page', 1)
-    jobs = paginator.get_page(page_number)
+    
+    def build_context():
+        jobs_query = Job.objects.filter(is_active=True).select_related('resume').defer('description', 'resume__task_result')
+        
+        if resume_id:
+            jobs_query = jobs_query.filter(matching.jobs_of([resume_id]))
+            resume = get_object_or_404(Resume, id=resume_id)
+        else:
+            resume = None
+        
+        # Filter by platform
+        if platform:
+            jobs_query = jobs_query.filter(platform=platform)
+        
+        # Search
+        if search:
+            jobs_query = jobs_query.filter(title__icontains=search) | jobs_query.filter(company__icontains=search)
+        
+        # Pagination - keep only the current page's rows so the context can be cached
+        paginator = Paginator(jobs_query, 10)
+        page = paginator.get_page(page_number)
+        return {
+            'jobs': list(page.object_list),
+            'job_count': paginator.count,
+            'page_number': page.number,
+            'resume': resume,
+        }
+    
+    cached = caching.cached_context(request, build_context)
+    jobs = Paginator(range(cached['job_count']), 10).get_page(cached['page_number'])
+    jobs.object_list = cached['jobs']
     
     context = {
         'jobs': jobs,
-        'resume': resume,
+        'resume': cached['resume'],
         'platform': platform,
         'search': search,
     }
@@ -121,8 +151,11 @@ def job_detail(request, job_id):
     """View detailed job information"""
     job = get_object_or_404(Job.objects.select_related('resume'), id=job_id)
     
-    # Get or create application
-    application, created = JobApplication.objects.get_or_create(job=job)
+    # Application state is per user; the row is created on the first update,
+    # not by viewing (reads must not write: the cached pages wouldn't know)
+    application = None
+    if request.user.is_authenticated:
+        application = JobApplication.objects.filter(user=request.user, job=job).first()
     
     context = {
         'job': job,
@@ -133,9 +166,12 @@ def job_detail(request, job_id):
 
 @require_http_methods(["POST"])
 def update_application_status(request, job_id):
-    """Update job application status"""
+    """Update the visitor's application status for a job"""
+    if not request.user.is_authenticated:
+        messages.error(request, 'Please log in to track your applications')
+        return redirect('jobs:login')
     job = get_object_or_404(Job, id=job_id)
-    application, created = JobApplication.objects.get_or_create(job=job)
+    application, created = JobApplication.objects.get_or_create(user=request.user, job=job)
     
     status = request.POST.get('status')
     notes = request.POST.get('notes', '')
@@ -149,6 +185,7 @@ def update_application_status(request, job_id):
             application.applied_at = timezone.now()
         
         application.save()
+        caching.bump_for_users(['applications'], [request.user.pk])
         messages.success(request, 'Application status updated!')
     else:
         messages.error(request, 'Invalid status')
@@ -156,6 +193,12 @@ def update_application_status(request, job_id):
     return redirect('jobs:job_detail', job_id=job_id)
 
 
+def resume_events(request, resume_id):
+    """Server-sent events with the progress of a resume's scraping task"""
+    resume = get_object_or_404(owned_resumes(request).only('id'), id=resume_id)
+    return progress.stream_response(request, resume)
+
+
 def resume_list(request):
     """List all uploaded resumes"""
     resumes = Resume.objects.all()
@@ -166,28 +209,40 @@ def resume_list(request):
     return render(request, 'jobs/resume_list.html', context)
 
 
+@caching.cache_by_generation('jobs', 'resumes', 'applications')
 def dashboard(request):
     """Dashboard showing statistics"""
-    total_jobs = Job.objects.count()
-    total_resumes = Resume.objects.count()
-    total_applications = JobApplication.objects.count()
+    context = caching.cached_context(request, _dashboard_context)
+    return render(request, 'jobs/dashboard.html', context)
+
+
+def _dashboard_context():
+    """Counts and recent jobs shown on the dashboard"""
+    # All tallies come from the denormalized counters in a single query
+    platform_names = [f'{counters.JOBS}:{platform}' for platform, _ in Job.PLATFORM_CHOICES]
+    status_names = [f'{counters.APPLICATIONS}:{status}' for status, _ in JobApplication.STATUS_CHOICES]
+    totals = counters.read(
+        counters.GLOBAL,
+        [counters.JOBS, counters.RESUMES, counters.APPLICATIONS, *platform_names, *status_names],
+    )
+    total_jobs = totals[counters.JOBS]
+    total_resumes = totals[counters.RESUMES]
+    total_applications = totals[counters.APPLICATIONS]
     
     # Jobs by platform
     jobs_by_platform = {}
     for platform, name in Job.PLATFORM_CHOICES:
-        count = Job.objects.filter(platform=platform).count()
-        jobs_by_platform[name] = count
+        jobs_by_platform[name] = totals[f'{counters.JOBS}:{platform}']
     
     # Recent jobs
-    recent_jobs = Job.objects.filter(is_active=True).select_related('resume')[:5]
+    recent_jobs = list(Job.objects.filter(is_active=True).select_related('resume').defer('description', 'resume__task_result')[:5])
     
     # Application status breakdown
     application_stats = {}
     for status, label in JobApplication.STATUS_CHOICES:
-        count = JobApplication.objects.filter(status=status).count()
-        application_stats[label] = count
+        application_stats[label] = totals[f'{counters.APPLICATIONS}:{status}']
     
-    context = {
+    return {
         'total_jobs': total_jobs,
         'total_resumes': total_resumes,
         'total_applications': total_applications,
@@ -195,7 +250,6 @@ def dashboard(request):
         'recent_jobs': recent_jobs,
         'application_stats': application_stats,
     }
-    return render(request, 'jobs/dashboard.html', context)
 
 
 @require_http_methods(["POST"])
@@ -205,21 +259,15 @@ def rescrape_jobs(request, resume_id):
     location = request.POST.get('location', 'India')
     
     try:
-        # Trigger Celery task for async job scraping
-        from .tasks import scrape_jobs_for_resume
-        task = scrape_jobs_for_resume.delay(
-            resume_id=resume.id,
-            location=location,
-            jobs_per_site=2
-        )
+        # Trigger Celery task for async job scraping (or join the one running)
+        previous_task_id = resume.task_id
+        task = dispatch.start_scraping(resume, location)
         
-        # Update task status
-        resume.task_id = task.id
-        resume.task_status = 'pending'
-        resume.save()
-        
-        logger.info(f"Triggered re-scraping task {task.id} for resume {resume_id}")
-        messages.success(request, 'Re-scraping jobs in background. Refresh to see new results.')
+        if task.id == previous_task_id:
+            messages.info(request, 'This resume is already being scraped. New jobs will show up here when it finishes.')
+        else:
+            logger.info(f"Triggered re-scraping task {task.id} for resume {resume_id}")
+            messages.success(request, 'Re-scraping jobs in background. New jobs will show up here when it finishes.')
         
     except Exception as e:
         logger.error(f"Error re-scraping jobs: {e}")
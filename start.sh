@@ -14,5 +14,16 @@ python manage.py migrate --noinput
 echo "Collecting static files..."
 python manage.py collectstatic --noinput
 
+# SERVER_MODE=asgi serves core.asgi with uvicorn: async views and progress
+# streams then wait on the event loop instead of holding a worker each.
+# Both honour WEB_CONCURRENCY for the number of worker processes.
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+    echo "Starting uvicorn (ASGI)..."
+    exec uvicorn core.asgi:application --host 0.0.0.0 --port $PORT --workers ${WEB_CONCURRENCY:-1} \
+        --proxy-headers --forwarded-allow-ips '*' --log-level info
+fi
+
+# gunicorn reads WEB_CONCURRENCY itself; every worker thread holds its own
+# database connection (python manage.py db_connections checks the total)
 echo "Starting gunicorn..."
-gunicorn core.wsgi:application --bind 0.0.0.0:$PORT --log-level info
+gunicorn core.wsgi:application --bind 0.0.0.0:$PORT --threads ${GUNICORN_THREADS:-1} --log-level info
@@ -4,6 +4,7 @@ Test script for job scraper
 Run this to test the scraping functionality
 """
 
+import logging
 import sys
 import os
 
@@ -120,6 +121,7 @@ def print_summary(jobs):
         print(f"   Link: {job['link']}")
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
     print("scraping started......")
     try:
         # Test full service